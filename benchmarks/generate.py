@@ -0,0 +1,85 @@
+"""
+Synthetic log generator for the benchmarks.
+
+Lines look like the ones of ``tests/fixtures/log-example.log``::
+
+    [2010-04-24 07:51:54,393] DEBUG - [main] BulkOpsClient.main(): Execution begin.
+
+``density`` is the fraction of lines logged at ``MATCH_LEVEL``, the level the
+default benchmark pattern looks for. Output is deterministic for a given seed.
+"""
+
+import argparse
+import random
+import sys
+
+MATCH_LEVEL = 'ERROR'
+OTHER_LEVELS = ('DEBUG', ' INFO', ' WARN')
+
+DEFAULT_PATTERN = r'\] ERROR '
+
+_SOURCES = (
+    'BulkOpsClient.main()',
+    'SOAPImpRequestManager.sendImportCreateRequest()',
+    'SOAPImpRequestManager.sendImportGetStatusRequest()',
+    'BulkOpsClientUtils.getPassword()',
+    'ImportProcessor.run()',
+)
+
+_WORDS = (
+    'request', 'response', 'import', 'status', 'session', 'record', 'batch',
+    'loaded', 'sent', 'received', 'validation', 'PASSED', 'queued', 'retry',
+)
+
+
+def generate_lines(lines, density=0.01, line_length=120, seed=0):
+    """Yield ``lines`` log lines (newline included) of about ``line_length`` characters."""
+
+    rng = random.Random(seed)
+    seconds = 0
+
+    # a pool of message bodies keeps generation fast for millions of lines
+    bodies = []
+    for _ in range(256):
+        words = []
+        while sum(map(len, words)) + len(words) < line_length:
+            words.append(rng.choice(_WORDS))
+        bodies.append(' '.join(words))
+
+    for idx in range(lines):
+        if idx % 50 == 0:
+            seconds += 1
+
+        level = MATCH_LEVEL if rng.random() < density else rng.choice(OTHER_LEVELS)
+        prefix = '[2010-04-24 {:02}:{:02}:{:02},{:03}] {} - [main] {}: '.format(
+            seconds // 3600 % 24, seconds // 60 % 60, seconds % 60, idx % 1000, level, rng.choice(_SOURCES))
+
+        yield (prefix + rng.choice(bodies))[:max(line_length, len(prefix))] + '\n'
+
+
+def generate_log(lines, density=0.01, line_length=120, seed=0):
+    """Whole log as a single string, see ``generate_lines()``."""
+
+    return ''.join(generate_lines(lines, density, line_length, seed))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=10000)
+    parser.add_argument('--density', type=float, default=0.01)
+    parser.add_argument('--line-length', type=int, default=120)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='-', help="file to write, '-' for stdout")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', newline='\n')
+
+    try:
+        out.writelines(generate_lines(args.lines, args.density, args.line_length, args.seed))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+"""
+Filter benchmarks on synthetic logs.
+
+Run from the repository root::
+
+    python -m benchmarks.run --lines 10000 100000 1000000 --output bench.json
+    python -m benchmarks.run --lines 100000 --compare bench.json
+
+Matching, line indexing and fold planning only need the ``core`` package and
+always run. Fold and region application need the plugin module: they are timed
+for every ``FoldingTypes`` x ``HighlightTypes`` combination when the Sublime API
+is available, and reported as skipped otherwise. ``--headless`` runs them on
+the ``headless`` stand-in of the API, which also reports the number of editor
+API calls of each combination.
+"""
+
+import argparse
+import gc
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from core.enums import FoldingTypes
+from core.fold_plan import normalize_spans, plan_folds
+from core.line_index import LineIndex
+from core.patterns import PatternCache, find_spans
+
+from .generate import DEFAULT_PATTERN, generate_log
+
+PLUGIN_MODULE = 'File Filter.file_filter'
+
+# a regression is reported when a phase gets slower than this ratio
+REGRESSION_RATIO = 1.2
+
+
+def best_of(repeat, func, *args):
+    """``(seconds, result)`` of the fastest of ``repeat`` calls of ``func``."""
+
+    best = None
+    result = None
+
+    for _ in range(max(repeat, 1)):
+        gc.collect()
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, result
+
+
+def load_plugin(headless=False):
+    """The plugin module, ``None`` when the Sublime API is not available."""
+
+    if headless:
+        from headless import load_plugin as load_headless_plugin
+        return load_headless_plugin(ROOT)
+
+    try:
+        return importlib.import_module(PLUGIN_MODULE)
+    except ImportError:
+        return None
+
+
+def bench_core(text, pattern, repeat):
+    """Timings of the phases that do not need the editor, one entry per folding type."""
+
+    compiled = PatternCache().compile(pattern)
+
+    match_time, matches = best_of(repeat, find_spans, compiled, text)
+    index_time, line_index = best_of(repeat, LineIndex.from_text, text)
+
+    results = []
+
+    for folding_type in FoldingTypes:
+        plan_time, plan = best_of(repeat, plan_folds, matches, line_index.starts, line_index.size, folding_type, (2, 2))
+        normalize_time, folds = best_of(repeat, normalize_spans, plan)
+
+        results.append({
+            'folding_type': folding_type.name,
+            'matches': len(matches),
+            'folds': len(folds),
+            'seconds': {
+                'match': match_time,
+                'line_index': index_time,
+                'plan': plan_time,
+                'normalize': normalize_time,
+            },
+        })
+
+    return results
+
+
+def bench_apply(plugin, text, pattern, repeat):
+    """Fold and region application timings for every folding x highlight type."""
+
+    window = plugin.sublime.active_window()
+    view = window.new_file()
+    view.set_scratch(True)
+    view.run_command('append', {'characters': text})
+
+    results = []
+    calls = getattr(plugin.sublime, 'CALLS', None)
+
+    try:
+        command = plugin.FileFilter(window)
+        command.run()
+        command.set_regex(pattern)
+
+        # the plugin has its own copy of the core package: use its enum members
+        for folding_type in plugin.FoldingTypes:
+            command.set_folding_type(folding_type)
+            scan = command.scan(pattern)
+
+            for highlight_type in plugin.HighlightTypes:
+                command.set_highlight_type(highlight_type)
+
+                seconds = {'clear': None, 'fold': None, 'highlight': None}
+
+                for _ in range(max(repeat, 1)):
+                    timings = {}
+
+                    if calls is not None:
+                        calls.clear()
+
+                    start = time.perf_counter()
+                    command.clear()
+                    timings['clear'] = time.perf_counter() - start
+
+                    start = time.perf_counter()
+                    command.fold(scan.fold_plan)
+                    timings['fold'] = time.perf_counter() - start
+
+                    start = time.perf_counter()
+                    command.highlight(scan.matches)
+                    timings['highlight'] = time.perf_counter() - start
+
+                    for phase, elapsed in timings.items():
+                        seconds[phase] = elapsed if seconds[phase] is None else min(seconds[phase], elapsed)
+
+                results.append({
+                    'folding_type': folding_type.name,
+                    'highlight_type': highlight_type.name,
+                    'matches': len(scan.matches),
+                    'folds': command.fold_stats['folded'] if command.fold_stats else 0,
+                    'seconds': seconds,
+                    'api_calls': dict(calls) if calls is not None else None,
+                })
+
+        command.clear()
+    finally:
+        view.close()
+
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, density, line_length, pattern, repeat, seed=0, headless=False):
+    plugin = load_plugin(headless)
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'pattern': pattern,
+            'density': density,
+            'line_length': line_length,
+            'repeat': repeat,
+            'apply': plugin is not None,
+            'headless': headless,
+        },
+        'results': [],
+    }
+
+    for lines in sizes:
+        text = generate_log(lines, density, line_length, seed)
+
+        for entry in bench_core(text, pattern, repeat):
+            report['results'].append(dict(entry, lines=lines, chars=len(text), kind='core'))
+
+        if plugin is not None:
+            for entry in bench_apply(plugin, text, pattern, repeat):
+                report['results'].append(dict(entry, lines=lines, chars=len(text), kind='apply'))
+
+    return report
+
+
+def result_key(entry):
+    return entry['kind'], entry['lines'], entry['folding_type'], entry.get('highlight_type')
+
+
+def compare(report, baseline):
+    """``(key, phase, baseline seconds, seconds)`` of the phases slower than ``REGRESSION_RATIO``."""
+
+    previous = {result_key(entry): entry for entry in baseline['results']}
+    regressions = []
+
+    for entry in report['results']:
+        base = previous.get(result_key(entry))
+        if base is None:
+            continue
+
+        for phase, seconds in entry['seconds'].items():
+            base_seconds = base['seconds'].get(phase)
+            if seconds and base_seconds and seconds > base_seconds * REGRESSION_RATIO:
+                regressions.append((result_key(entry), phase, base_seconds, seconds))
+
+    return regressions
+
+
+def print_report(report, out=sys.stdout):
+    for entry in report['results']:
+        phases = ' '.join(f"{phase}={seconds * 1000:.1f}ms" for phase, seconds in entry['seconds'].items() if seconds is not None)
+        label = entry['folding_type'] + (f"/{entry['highlight_type']}" if 'highlight_type' in entry else '')
+        api_calls = f" api_calls={sum(entry['api_calls'].values())}" if entry.get('api_calls') else ''
+        out.write(f"{entry['kind']:5} {entry['lines']:>9} lines {label:30} matches={entry['matches']} folds={entry['folds']} {phases}{api_calls}\n")
+
+    if not report['meta']['apply']:
+        out.write("apply: skipped, the Sublime API is not available\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="File Filter benchmarks on synthetic logs")
+    parser.add_argument('--lines', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--density', type=float, default=0.01, help="fraction of matching lines")
+    parser.add_argument('--line-length', type=int, default=120)
+    parser.add_argument('--pattern', default=DEFAULT_PATTERN)
+    parser.add_argument('--repeat', type=int, default=3, help="best of N runs per phase")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    parser.add_argument('--compare', help="JSON results of a previous run to compare with")
+    parser.add_argument('--headless', action='store_true', help="time fold and region application on the headless API stand-in")
+    args = parser.parse_args(argv)
+
+    report = run(args.lines, args.density, args.line_length, args.pattern, args.repeat, args.seed, args.headless)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as out:
+            json.dump(report, out, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(report, json.load(baseline_file))
+
+        for key, phase, base_seconds, seconds in regressions:
+            print(f"regression {key} {phase}: {base_seconds * 1000:.1f}ms -> {seconds * 1000:.1f}ms")
+
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
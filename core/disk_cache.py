@@ -0,0 +1,195 @@
+"""
+Match and fold plan cache kept on disk across sessions.
+
+Entries are keyed by the file path, size and modification time plus the
+pattern, so a changed file never hits an old entry. Each entry is one file: a
+JSON header followed by the raw ``array`` bytes of the match offsets, the
+pattern indexes of a combined pattern and the fold plans computed so far. The
+directory is bounded by its total size, the least recently used entries are
+deleted first.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from array import array
+from itertools import chain
+
+from .match_cache import pack_matches, unpack_matches
+from .patterns import DEFAULT_FLAGS
+
+MAGIC = b'FFMC1\n'
+
+SUFFIX = '.ffmc'
+
+
+def _digest(*parts):
+    return hashlib.sha1('\0'.join(str(part) for part in parts).encode('utf-8', 'surrogatepass')).hexdigest()[:16]
+
+
+def _from_bytes(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    return values
+
+
+class DiskCache:
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def entry_path(self, path, size, mtime, pattern, flags=DEFAULT_FLAGS):
+        # the path digest comes first, so every entry of a file can be found from it
+        return os.path.join(self.directory, f"{_digest(path)}-{_digest(size, mtime)}-{_digest(pattern, flags)}{SUFFIX}")
+
+    def has(self, path, size, mtime, pattern, flags=DEFAULT_FLAGS):
+        return os.path.exists(self.entry_path(path, size, mtime, pattern, flags))
+
+    def get(self, path, size, mtime, pattern, flags=DEFAULT_FLAGS):
+        """``(matches, fold plans by plan key)`` of ``pattern`` over this file state, ``None`` if not cached."""
+
+        entry = self._read(self.entry_path(path, size, mtime, pattern, flags))
+
+        if entry is None:
+            return None
+
+        header, packed, plans = entry
+
+        if (header['path'], header['size'], header['mtime'], header['pattern'], header['flags']) != (path, size, mtime, pattern, flags):
+            return None
+
+        return unpack_matches(packed), {key: list(zip(spans[::2], spans[1::2])) for key, spans in plans.items()}
+
+    def put(self, path, size, mtime, pattern, matches, flags=DEFAULT_FLAGS, plan_key=None, fold_plan=None):
+        """Store ``matches``, and ``fold_plan`` under ``plan_key`` next to the plans already stored."""
+
+        entry_path = self.entry_path(path, size, mtime, pattern, flags)
+        plans = {}
+
+        existing = self._read(entry_path)
+        if existing is not None:
+            if plan_key is None or plan_key in existing[2]:
+                return
+            plans = existing[2]
+
+        if plan_key is not None:
+            plans[plan_key] = array('q', chain.from_iterable(fold_plan))
+
+        offsets, owners = pack_matches(matches)
+        header = {
+            'path': path, 'size': size, 'mtime': mtime, 'pattern': pattern, 'flags': flags,
+            'byteorder': sys.byteorder, 'count': len(matches), 'owners': owners is not None,
+            'plans': {key: len(spans) // 2 for key, spans in plans.items()},
+        }
+
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            self._drop_stale(entry_path)
+
+            temporary = f"{entry_path}.{threading.get_ident()}.tmp"
+            with open(temporary, 'wb') as file:
+                encoded = json.dumps(header).encode('utf-8')
+                file.write(MAGIC + len(encoded).to_bytes(4, 'little') + encoded)
+                file.write(offsets.tobytes())
+                if owners is not None:
+                    file.write(owners.tobytes())
+                for spans in plans.values():
+                    file.write(spans.tobytes())
+
+            os.replace(temporary, entry_path)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            for name in self._entries():
+                self._remove(os.path.join(self.directory, name))
+
+    def _read(self, entry_path):
+        try:
+            with open(entry_path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return None
+
+        if not data.startswith(MAGIC):
+            return None
+
+        try:
+            start = len(MAGIC) + 4
+            length = int.from_bytes(data[len(MAGIC):start], 'little')
+            header = json.loads(data[start:start + length].decode('utf-8'))
+            pos = start + length
+
+            if header['byteorder'] != sys.byteorder:
+                return None
+
+            offsets = _from_bytes('q', data[pos:pos + header['count'] * 16])
+            pos += header['count'] * 16
+
+            owners = None
+            if header['owners']:
+                owners = _from_bytes('H', data[pos:pos + header['count'] * 2])
+                pos += header['count'] * 2
+
+            plans = {}
+            for key, count in header['plans'].items():
+                plans[key] = _from_bytes('q', data[pos:pos + count * 16])
+                pos += count * 16
+        except (ValueError, KeyError, TypeError):
+            return None
+
+        # truncated or padded file
+        if pos != len(data):
+            return None
+
+        # least recently used entries are evicted first
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+        return header, (offsets, owners), plans
+
+    def _entries(self):
+        try:
+            return [name for name in os.listdir(self.directory) if name.endswith(SUFFIX)]
+        except OSError:
+            return []
+
+    def _drop_stale(self, entry_path):
+        # entries of an older state of the same file
+        name = os.path.basename(entry_path)
+        path_digest, state_digest = name.split('-')[:2]
+
+        for other in self._entries():
+            if other.startswith(path_digest + '-') and other.split('-')[1] != state_digest:
+                self._remove(os.path.join(self.directory, other))
+
+    def _evict(self):
+        entries = []
+
+        for name in self._entries():
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for mtime, size, name in entries)
+
+        for mtime, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(os.path.join(self.directory, name))
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
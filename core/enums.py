@@ -0,0 +1,39 @@
+from enum import Enum
+
+class MyEnum(Enum):
+
+    @classmethod
+    def all_members(cls):
+        return [member for member in cls]
+
+    @classmethod
+    def all_values(cls):
+        return [member._value_ for member in cls]
+
+class TupleEnum(MyEnum):
+
+    def __new__(cls, description, value):
+        obj = object.__new__(cls)
+
+        obj._value_ = value
+        obj.description = description
+
+        return obj
+
+    @classmethod
+    def all_values(cls):
+        return [member.value for member in cls]
+
+    @classmethod
+    def all_descriptions(cls):
+        return [member.description for member in cls]
+
+
+class FoldingTypes(MyEnum):
+
+    line = 'Line'
+    match_only = 'Match only'
+    before_only = 'Fold before'
+    after_only = 'Fold after'
+    context = 'Context lines'
+    highlight_only = 'Highlight only'
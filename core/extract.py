@@ -0,0 +1,85 @@
+"""
+Extraction of the shown rows of a buffer into another buffer.
+
+The extracted text is produced in chunks so it can be appended to the output
+view piece by piece. Alongside, ``array('q')`` of the source offset of every
+output line maps the output back to the source buffer.
+"""
+
+from array import array
+
+# source offset of the separator lines put between non adjacent blocks
+NO_SOURCE = -1
+
+SEPARATOR = '--\n'
+
+
+def extract_chunks(text, intervals, starts, chunk_size=1 << 20, separator=None):
+    """
+    Yield ``(chunk, sources)`` for the rows of ``intervals``: about ``chunk_size``
+    characters of text, every line ending with a newline, and the offset in
+    ``text`` where each of its lines starts. ``separator`` lines are inserted
+    between blocks of rows that are not adjacent.
+    """
+
+    pieces = []
+    sources = array('q')
+    pending = 0
+    previous_row = None
+
+    for first_row, last_row in intervals:
+
+        # the empty row after a trailing newline has no text to extract
+        if last_row == len(starts) - 1 and starts[last_row] == len(text):
+            last_row -= 1
+
+        if last_row < first_row:
+            continue
+
+        if separator and previous_row is not None and first_row > previous_row + 1:
+            pieces.append(separator)
+            sources.append(NO_SOURCE)
+            pending += len(separator)
+
+        begin = starts[first_row]
+        end = starts[last_row + 1] if last_row + 1 < len(starts) else len(text)
+        piece = text[begin:end]
+
+        if not piece.endswith('\n'):
+            piece += '\n'
+
+        pieces.append(piece)
+        sources.extend(starts[first_row:last_row + 1])
+        pending += len(piece)
+        previous_row = last_row
+
+        if pending >= chunk_size:
+            yield ''.join(pieces), sources
+            pieces = []
+            sources = array('q')
+            pending = 0
+
+    if pieces:
+        yield ''.join(pieces), sources
+
+
+def source_of(sources, row):
+    """
+    Source offset of output line ``row``. Separator lines map to the next
+    extracted line, or to the previous one at the end of the output.
+    """
+
+    if not sources:
+        return None
+
+    row = min(max(row, 0), len(sources) - 1)
+
+    for idx in range(row, len(sources)):
+        if sources[idx] != NO_SOURCE:
+            return sources[idx]
+
+    for idx in range(row, -1, -1):
+        if sources[idx] != NO_SOURCE:
+            return sources[idx]
+
+    return None
@@ -0,0 +1,106 @@
+"""
+Per-line field values, the log level by default, for instant value filters.
+
+An extractor regex is matched once from the start of every line, its first
+group being the line's value. For each distinct value the index keeps the row
+intervals holding it and the offsets of its occurrences, in flat
+``array('q')``. A line without a value belongs to the line above, like the
+continuation lines of a stack trace. Showing a set of values is then a merge
+of their interval lists, with no regex scan.
+"""
+
+import re
+from array import array
+from bisect import bisect_left
+from heapq import merge
+
+DEFAULT_PATTERN = r'[^\n]*?\b(TRACE|DEBUG|INFO|WARN|WARNING|ERROR|FATAL|CRITICAL|TRC|DBG|INF|WRN|ERR|FTL)\b'
+
+
+def compile_extractor(pattern):
+    """``pattern`` matched from a line start only. Raises ``re.error``, or ``ValueError`` without a group."""
+
+    compiled = re.compile(f"^(?:{pattern})", re.MULTILINE)
+
+    if compiled.groups < 1:
+        raise ValueError(f"/{pattern}/ has no group to extract the value")
+
+    return compiled
+
+
+class FieldIndex:
+
+    def __init__(self, intervals, offsets, size, pattern=DEFAULT_PATTERN, change_count=None):
+        self.intervals = intervals
+        self.offsets = offsets
+        self.size = size
+        self.pattern = pattern
+        self.change_count = change_count
+
+    @classmethod
+    def from_text(cls, text, starts, pattern=DEFAULT_PATTERN, change_count=None):
+        intervals = {}
+        offsets = {}
+        current = None
+        run_first = 0
+        row = 0
+
+        for found in compile_extractor(pattern).finditer(text):
+            value = found.group(1)
+
+            # a line without a value belongs to the line above
+            if not value:
+                continue
+
+            # rows are only looked up where the value changes, matches start on a line start
+            if value != current:
+                row = bisect_left(starts, found.start(), row)
+
+                if current is not None:
+                    intervals[current].extend((run_first, row - 1))
+
+                if value not in offsets:
+                    offsets[value] = array('q')
+                    intervals[value] = array('q')
+
+                current, run_first = value, row
+                add_offset = offsets[value].append
+
+            add_offset(found.start(1))
+
+        if current is not None:
+            intervals[current].extend((run_first, len(starts) - 1))
+
+        return cls(intervals, offsets, len(text), pattern, change_count)
+
+    def values(self):
+        return sorted(self.intervals)
+
+    def line_count(self, value):
+        """Number of lines holding ``value``, the lines without a value included."""
+
+        intervals = self.intervals.get(value, ())
+
+        return sum(intervals[1::2]) - sum(intervals[::2]) + len(intervals) // 2
+
+    def rows_of(self, values):
+        """Sorted, merged row intervals of the lines holding one of ``values``."""
+
+        result = []
+
+        for first_row, last_row in merge(*(zip(self.intervals[value][::2], self.intervals[value][1::2]) for value in values if value in self.intervals)):
+            if result and first_row == result[-1][1] + 1:
+                result[-1] = (result[-1][0], last_row)
+            else:
+                result.append((first_row, last_row))
+
+        return result
+
+    def spans_of(self, values):
+        """Sorted ``(begin, end)`` of the occurrences of ``values``."""
+
+        def spans(value):
+            length = len(value)
+            return ((offset, offset + length) for offset in self.offsets[value])
+
+        return list(merge(*[spans(value) for value in values if value in self.offsets]))
@@ -0,0 +1,74 @@
+"""
+Scan of files that are not open in the editor.
+
+The file is read through ``mmap`` and searched with a bytes pattern one line
+aligned chunk at a time, so at most one chunk is copied into Python memory.
+"""
+
+import re
+
+from .patterns import DEFAULT_FLAGS
+
+
+def bytes_pattern(pattern, cache, flags=DEFAULT_FLAGS):
+    """
+    ``pattern`` compiled through ``cache`` (a ``PatternCache``) for UTF-8 bytes.
+    ``\\w``, ``\\d`` and the like only match ASCII on bytes. Raises ``re.error``.
+    """
+
+    return cache.compile(pattern.encode('utf-8'), flags & ~re.UNICODE)
+
+
+def matching_lines(data, compiled, chunk_size=4194304, start=0, end=None):
+    """
+    Yield ``(row, line)`` for every line of ``data`` (bytes or an mmap) touched by
+    a match of the bytes pattern ``compiled``, rows counted from ``start`` and
+    lines without their newline. ``data`` is searched in chunks of about
+    ``chunk_size`` bytes ending on a newline, so a match cannot span chunks.
+    """
+
+    if end is None:
+        end = len(data)
+
+    chunk_size = max(chunk_size, 1)
+    row = 0
+    begin = start
+
+    while begin < end:
+        stop = begin + chunk_size
+
+        if stop >= end:
+            stop = end
+        else:
+            newline = data.find(b'\n', stop - 1, end)
+            stop = end if newline < 0 else newline + 1
+
+        chunk = data[begin:stop]
+        counted = 0
+        shown_to = 0
+
+        for match in compiled.finditer(chunk):
+            first = max(chunk.rfind(b'\n', 0, match.start()) + 1, shown_to)
+            last = chunk.find(b'\n', max(match.end() - 1, match.start()))
+            last = len(chunk) if last < 0 else last + 1
+
+            # on lines already yielded for a previous match
+            if first >= last:
+                continue
+
+            row += chunk.count(b'\n', counted, first)
+            pos = first
+
+            while pos < last:
+                newline = chunk.find(b'\n', pos, last)
+                line_end = last if newline < 0 else newline
+
+                yield row, chunk[pos:line_end]
+
+                row += newline >= 0
+                pos = line_end + 1
+
+            counted = shown_to = last
+
+        row += chunk.count(b'\n', counted)
+        begin = stop
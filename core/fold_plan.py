@@ -0,0 +1,150 @@
+"""
+Fold planning, decoupled from the Sublime API.
+
+The planner works on plain integers: match offsets as ``(begin, end)`` pairs and
+a sorted table with the offset where each line starts. It returns the list of
+``(a, b)`` spans that ``FileFilter.apply()`` hands over to ``view.fold()``.
+"""
+
+from .enums import FoldingTypes
+from .line_filter import rows_of_spans
+from .line_index import full_line
+
+
+def _span(spans, a, b):
+    # equivalent of the former FileFilter.fold_span(): empty or inverted spans are dropped
+    if b > a:
+        spans.append((a, b))
+
+
+def plan_folds(matches, starts, size, folding_type, context=(0, 0)):
+    """
+    Compute the fold spans for ``matches`` according to ``folding_type``.
+
+    ``matches`` is a sorted sequence of ``(begin, end)`` pairs, ``starts`` the line
+    start offsets of the buffer and ``size`` the buffer size. ``context`` is the
+    ``(before, after)`` number of lines kept around matches by ``FoldingTypes.context``.
+    """
+
+    if folding_type is FoldingTypes.highlight_only or not matches:
+        return []
+
+    if folding_type is FoldingTypes.context:
+        return plan_row_folds(rows_of_spans(matches, starts, *context), starts, size)
+
+    spans = []
+
+    # gaps between matches (plus buffer start and end) are the fold candidates
+    ends = [0] + [m[1] for m in matches]
+    begins = [m[0] for m in matches] + [size]
+    last_idx = len(matches)
+
+    for idx, (begin, end) in enumerate(zip(ends, begins)):
+
+        if end <= begin:
+            continue
+
+        is_first = idx == 0
+        is_last = idx == last_idx
+
+        a = full_line(starts, size, begin)
+        b = full_line(starts, size, end)
+        same_line = a == b
+
+        # first / middle / last pieces of the gap
+        if same_line:
+            first = (begin, begin)
+            middle = (begin, end)
+            last = (end, end)
+        else:
+            first = (begin, a[1])
+            middle = (a[1], b[0])
+            last = (b[0], end)
+
+        if folding_type is FoldingTypes.match_only:
+
+            if is_first or not same_line:
+                _span(spans, first[0], middle[1] - 1)
+                _span(spans, last[0], last[1])
+            else:
+                _span(spans, middle[0], middle[1])
+
+        elif folding_type is FoldingTypes.line:
+
+            if is_first:
+                _span(spans, first[0], middle[1] - 1)
+            if is_last and not same_line:
+                _span(spans, middle[0], last[1])
+            elif not same_line:
+                _span(spans, middle[0] - 1, middle[1] - 1)
+
+        elif folding_type is FoldingTypes.before_only:
+
+            if is_first:
+                _span(spans, first[0], last[1])
+            elif not same_line:
+                _span(spans, middle[0], last[1])
+
+        elif folding_type is FoldingTypes.after_only:
+
+            if is_last:
+                _span(spans, begin, end)
+            else:
+                _span(spans, first[0], middle[1] - 1)
+
+    return spans
+
+
+def normalize_spans(spans):
+    """Sort ``spans``, drop the empty ones and merge the ones that overlap or touch."""
+
+    merged = []
+
+    for a, b in sorted(spans):
+
+        if b <= a:
+            continue
+
+        if merged and a <= merged[-1][1]:
+            if b > merged[-1][1]:
+                merged[-1] = (merged[-1][0], b)
+        else:
+            merged.append((a, b))
+
+    return merged
+
+
+def diff_spans(old, new):
+    """
+    ``(removed, added)``: the spans of the normalized ``old`` that are not in the
+    normalized ``new``, and the other way round.
+    """
+
+    old_set = set(old)
+    new_set = set(new)
+
+    return [span for span in old if span not in new_set], [span for span in new if span not in old_set]
+
+
+def plan_row_folds(intervals, starts, size):
+    """
+    Fold every line outside the sorted row ``intervals``, leaving the same
+    layout as ``FoldingTypes.line`` around the shown lines.
+    """
+
+    spans = []
+    previous_row = None
+
+    for first_row, last_row in intervals:
+
+        if previous_row is None:
+            _span(spans, 0, starts[first_row] - 1)
+        else:
+            _span(spans, starts[previous_row + 1] - 1, starts[first_row] - 1)
+
+        previous_row = last_row
+
+    if previous_row is not None and previous_row + 1 < len(starts):
+        _span(spans, starts[previous_row + 1], size)
+
+    return spans
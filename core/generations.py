@@ -0,0 +1,32 @@
+"""
+Per-key generation tokens used to discard stale background work.
+
+Every new request for a key gets a fresh token; work carrying an older token
+is dropped as soon as it checks ``is_current()``.
+"""
+
+import threading
+
+
+class Generations:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = {}
+
+    def next(self, key):
+        with self._lock:
+            token = self._current.get(key, 0) + 1
+            self._current[key] = token
+
+            return token
+
+    def cancel(self, key):
+        self.next(key)
+
+    def is_current(self, key, token):
+        return self._current.get(key) == token
+
+    def discard(self, key):
+        with self._lock:
+            self._current.pop(key, None)
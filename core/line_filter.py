@@ -0,0 +1,189 @@
+"""
+Line oriented filtering: which rows of the buffer are shown.
+
+Rows are kept as sorted ``(first_row, last_row)`` intervals so that filters
+showing most of a large file never need one entry per line.
+"""
+
+from bisect import bisect_left, bisect_right
+
+
+def rows_of_spans(spans, starts, before=0, after=0):
+    """
+    Sorted, merged row intervals touched by ``spans`` (sorted ``(begin, end, ...)``
+    tuples), each widened by ``before`` and ``after`` rows of context.
+    """
+
+    intervals = []
+    max_row = len(starts) - 1
+
+    for span in spans:
+        first_row = max(bisect_right(starts, span[0]) - 1 - before, 0)
+        last_row = min(bisect_right(starts, max(span[1] - 1, span[0])) - 1 + after, max_row)
+
+        if intervals and first_row <= intervals[-1][1] + 1:
+            if last_row > intervals[-1][1]:
+                intervals[-1] = (intervals[-1][0], last_row)
+        else:
+            intervals.append((first_row, last_row))
+
+    return intervals
+
+
+def expand_rows(intervals, before, after, row_count):
+    """Widen sorted row ``intervals`` by ``before`` and ``after`` rows, merging the overlaps."""
+
+    result = []
+
+    for first_row, last_row in intervals:
+        first_row = max(first_row - before, 0)
+        last_row = min(last_row + after, row_count - 1)
+
+        if result and first_row <= result[-1][1] + 1:
+            if last_row > result[-1][1]:
+                result[-1] = (result[-1][0], last_row)
+        else:
+            result.append((first_row, last_row))
+
+    return result
+
+
+def subtract_rows(intervals, removed, row_count):
+    """
+    Row intervals of ``intervals`` without the rows of ``removed``. ``intervals``
+    set to ``None`` stands for every row of the buffer.
+    """
+
+    if intervals is None:
+        intervals = [(0, row_count - 1)] if row_count else []
+
+    result = []
+    idx = 0
+
+    for first_row, last_row in intervals:
+
+        # skip removed intervals entirely before this one
+        while idx < len(removed) and removed[idx][1] < first_row:
+            idx += 1
+
+        cursor = first_row
+        probe = idx
+
+        while probe < len(removed) and removed[probe][0] <= last_row:
+            if removed[probe][0] > cursor:
+                result.append((cursor, removed[probe][0] - 1))
+            cursor = max(cursor, removed[probe][1] + 1)
+            probe += 1
+
+        if cursor <= last_row:
+            result.append((cursor, last_row))
+
+    return result
+
+
+def intersect_rows(intervals, other, row_count):
+    """Rows of both ``intervals`` and ``other``."""
+
+    return subtract_rows(intervals, subtract_rows(None, other, row_count), row_count)
+
+
+def spans_in_rows(spans, intervals, starts):
+    """The ``spans`` starting on a row of ``intervals``."""
+
+    result = []
+    idx = 0
+
+    for span in spans:
+        row = bisect_right(starts, span[0]) - 1
+
+        while idx < len(intervals) and intervals[idx][1] < row:
+            idx += 1
+
+        if idx == len(intervals):
+            break
+
+        if intervals[idx][0] <= row:
+            result.append(span)
+
+    return result
+
+
+def select_rows(include_spans, exclude_spans, starts, include_rows=None):
+    """
+    Rows shown by an include / exclude filter: rows touched by an include match
+    (every row when ``include_spans`` is ``None``), or the ``include_rows``
+    intervals when given (holding every include match), and by no exclude match.
+    Returns the row intervals and the include matches on those rows.
+    """
+
+    excluded = rows_of_spans(exclude_spans, starts)
+
+    if include_spans is None:
+        return subtract_rows(include_rows, excluded, len(starts)), []
+
+    if include_rows is None:
+        include_rows = rows_of_spans(include_spans, starts)
+
+    if not excluded:
+        return include_rows, include_spans
+
+    intervals = subtract_rows(include_rows, excluded, len(starts))
+
+    return intervals, spans_in_rows(include_spans, intervals, starts)
+
+
+def exclude_rows(text, starts, intervals, spans, search):
+    """
+    Row ``intervals`` without the lines where ``search(text, begin, end)`` finds
+    a match, and the ``spans`` left on them. Like a query, the exclude regex is
+    tested in place on the included lines only, in one pass over their rows.
+    """
+
+    result = []
+    row_count = len(starts)
+
+    for first_row, last_row in intervals:
+        for row in range(first_row, last_row + 1):
+            end = starts[row + 1] - 1 if row + 1 < row_count else len(text)
+
+            if search(text, starts[row], end) is not None:
+                continue
+
+            if result and result[-1][1] == row - 1:
+                result[-1] = (result[-1][0], row)
+            else:
+                result.append((row, row))
+
+    return result, spans_in_rows(spans, result, starts)
+
+
+def clip_rows(intervals, first_row, last_row):
+    """
+    Row ``intervals`` cut to the rows from ``first_row`` to ``last_row``.
+    ``intervals`` set to ``None`` stands for every row of the buffer.
+    """
+
+    if intervals is None:
+        return [(first_row, last_row)] if first_row <= last_row else []
+
+    result = []
+
+    # the interval before the first one starting in the window may reach into it
+    start = max(bisect_left(intervals, (first_row,)) - 1, 0)
+
+    for first, last in intervals[start:]:
+        if first > last_row:
+            break
+
+        first, last = max(first, first_row), min(last, last_row)
+
+        if first <= last:
+            result.append((first, last))
+
+    return result
+
+
+def spans_between(spans, begin, end):
+    """The sorted ``spans`` starting from ``begin`` and before ``end``, found by binary search."""
+
+    return spans[bisect_left(spans, (begin,)):bisect_left(spans, (end,))]
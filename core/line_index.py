@@ -0,0 +1,82 @@
+"""
+Line start offsets of a buffer, kept in a compact ``array('q')``.
+
+Lookups are done with ``bisect`` so the fold planner never needs to ask the
+editor for ``full_line()``. The index is patched from text change events
+instead of being rebuilt on every edit.
+"""
+
+from array import array
+from bisect import bisect_right
+from itertools import accumulate, repeat
+from operator import add
+
+
+def line_starts(text):
+    """Offsets where each line of ``text`` starts (always begins with 0)."""
+
+    parts = text.split('\n')
+    parts.pop()
+
+    return array('q', accumulate(map(add, map(len, parts), repeat(1)), initial=0))
+
+
+def full_line(starts, size, point):
+    """Same as ``view.full_line(point)``: the line holding ``point``, newline included."""
+
+    idx = bisect_right(starts, point) - 1
+    begin = starts[idx]
+    end = starts[idx + 1] if idx + 1 < len(starts) else size
+
+    return begin, end
+
+
+class LineIndex:
+
+    def __init__(self, starts, size, change_count=None):
+        self.starts = starts
+        self.size = size
+        self.change_count = change_count
+
+    @classmethod
+    def from_text(cls, text, change_count=None):
+        return cls(line_starts(text), len(text), change_count)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def row_of(self, point):
+        return bisect_right(self.starts, point) - 1
+
+    def full_line(self, point):
+        return full_line(self.starts, self.size, point)
+
+    def line_region(self, row):
+        """``(begin, end)`` of line ``row``, newline excluded."""
+
+        begin = self.starts[row]
+        end = self.starts[row + 1] - 1 if row + 1 < len(self.starts) else self.size
+
+        return begin, end
+
+    def replace(self, begin, end, text):
+        """Patch the index after ``[begin, end)`` was replaced by ``text``."""
+
+        starts = self.starts
+        delta = len(text) - (end - begin)
+
+        # line starts whose preceding newline was inside the replaced range are gone
+        lo = bisect_right(starts, begin)
+        hi = bisect_right(starts, end)
+
+        inserted = line_starts(text)
+        inserted.pop(0)
+
+        if lo == hi and not inserted and not delta:
+            return
+
+        patch = array('q', map(add, inserted, repeat(begin)))
+        patch.extend(map(add, starts[hi:], repeat(delta)))
+        starts[lo:] = patch
+
+        self.size += delta
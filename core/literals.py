@@ -0,0 +1,181 @@
+"""
+Cheaper searches for simple patterns.
+
+A pattern that is a plain string is searched with ``str.find()``. Other
+patterns that cannot match a newline and have no anchors or lookarounds are
+prefiltered: the regex only runs on the lines containing a literal that every
+match contains. Both give exactly the matches of ``finditer()``.
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:
+    import sre_parse
+    import sre_constants
+
+# ``literal``: the string matched by a plain string pattern, searched case
+# insensitively with ``ignore_case``; ``required``: a string every match contains
+MatchPlan = namedtuple('MatchPlan', ['literal', 'ignore_case', 'required'])
+
+NO_PLAN = MatchPlan(None, False, None)
+
+_LITERAL = sre_constants.LITERAL
+_NEWLINE = ord('\n')
+
+_REPEATS = tuple(getattr(sre_constants, name) for name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT') if hasattr(sre_constants, name))
+
+# character classes that never contain a newline
+_LINE_CATEGORIES = (sre_constants.CATEGORY_DIGIT, sre_constants.CATEGORY_WORD, sre_constants.CATEGORY_NOT_SPACE)
+
+
+@lru_cache(maxsize=256)
+def match_plan(pattern, flags=0):
+    """How to search the str ``pattern`` compiled with ``flags``, ``NO_PLAN`` for the regex engine alone."""
+
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return NO_PLAN
+
+    flags = parsed.state.flags
+    ignore_case = bool(flags & re.IGNORECASE)
+
+    if len(parsed) and all(op is _LITERAL for op, av in parsed):
+        literal = ''.join(chr(av) for op, av in parsed)
+
+        # case folding of non ASCII text does not map one character to one character
+        if not ignore_case or literal.isascii():
+            return MatchPlan(literal, ignore_case, None)
+
+        return NO_PLAN
+
+    if ignore_case or not _within_line(list(parsed), flags):
+        return NO_PLAN
+
+    required = max(_literal_runs(list(parsed)), key=len, default="")
+
+    return MatchPlan(None, False, required) if required else NO_PLAN
+
+
+def find_literal(literal, text, pos, endpos, ignore_case=False):
+    """``(begin, end)`` of the non overlapping occurrences of ``literal`` in ``text[pos:endpos]``."""
+
+    if ignore_case:
+        # only for ASCII text, where lower() keeps every offset
+        text, offset = text[pos:endpos].lower(), pos
+        literal = literal.lower()
+        pos, endpos = 0, len(text)
+    else:
+        offset = 0
+
+    spans = []
+    size = len(literal)
+    found = text.find(literal, pos, endpos)
+
+    while found >= 0:
+        spans.append((found + offset, found + size + offset))
+        found = text.find(literal, found + size, endpos)
+
+    return spans
+
+
+def find_prefiltered(compiled, required, text, pos, endpos):
+    """
+    Spans of the matches of ``compiled`` in ``text[pos:endpos]``, searching only
+    the lines that contain ``required``. ``compiled`` must not match newlines.
+    """
+
+    spans = []
+    found = text.find(required, pos, endpos)
+
+    while found >= 0:
+        line_begin = max(text.rfind('\n', pos, found) + 1, pos)
+        line_end = text.find('\n', found, endpos)
+        line_end = endpos if line_end < 0 else line_end
+
+        spans.extend(m.span() for m in compiled.finditer(text, line_begin, line_end))
+
+        found = text.find(required, line_end, endpos)
+
+    return spans
+
+
+def _within_line(items, flags):
+    # True when the parsed items cannot match a newline and use no anchor, lookaround or backreference
+    for op, av in items:
+        if op is _LITERAL:
+            if av == _NEWLINE:
+                return False
+        elif op is sre_constants.NOT_LITERAL:
+            if av != _NEWLINE:
+                return False
+        elif op is sre_constants.ANY:
+            if flags & re.DOTALL:
+                return False
+        elif op is sre_constants.IN:
+            if not _class_within_line(av):
+                return False
+        elif op in _REPEATS:
+            if not _within_line(list(av[2]), flags):
+                return False
+        elif op is sre_constants.SUBPATTERN:
+            group, add_flags, del_flags, items = av
+            if not _within_line(list(items), (flags | add_flags) & ~del_flags):
+                return False
+        elif op is sre_constants.BRANCH:
+            if not all(_within_line(list(branch), flags) for branch in av[1]):
+                return False
+        else:
+            return False
+
+    return True
+
+
+def _class_within_line(items):
+    for op, av in items:
+        if op is _LITERAL:
+            if av == _NEWLINE:
+                return False
+        elif op is sre_constants.RANGE:
+            if av[0] <= _NEWLINE <= av[1]:
+                return False
+        elif op is sre_constants.CATEGORY:
+            if av not in _LINE_CATEGORIES:
+                return False
+        else:
+            return False
+
+    return True
+
+
+def _literal_runs(items):
+    # strings matched by consecutive literals of the top level sequence, groups included
+    runs = []
+    run = []
+
+    for op, av in items:
+        if op is _LITERAL:
+            run.append(chr(av))
+            continue
+
+        if op is sre_constants.SUBPATTERN and not av[1] and not av[2]:
+            inner = _literal_runs(list(av[3]))
+            if len(inner) == 1 and all(sub_op is _LITERAL for sub_op, sub_av in av[3]):
+                run.append(inner[0])
+                continue
+            runs.append(''.join(run))
+            runs.extend(inner)
+            run = []
+            continue
+
+        runs.append(''.join(run))
+        run = []
+
+    runs.append(''.join(run))
+
+    return [run for run in runs if run]
@@ -0,0 +1,79 @@
+"""Small thread-safe LRU mapping shared by the plugin caches."""
+
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    ``maxsize`` bounds the number of items, or their total weight when a
+    ``weigh(value)`` function is given.
+    """
+
+    def __init__(self, maxsize=128, weigh=None):
+        self.maxsize = maxsize
+        self._weigh = weigh
+        self._weights = {}
+        self._total = 0
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    @property
+    def total(self):
+        """Number of items, or their total weight."""
+
+        return self._total
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._items.move_to_end(key)
+            except KeyError:
+                return default
+
+            return self._items[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._remove(key)
+            self._items[key] = value
+            self._weights[key] = self._weigh(value) if self._weigh else 1
+            self._total += self._weights[key]
+            self._evict()
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._remove(key, default)
+
+    def keys(self):
+        with self._lock:
+            return list(self._items)
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._weights.clear()
+            self._total = 0
+
+    def _remove(self, key, default=None):
+        if key not in self._items:
+            return default
+
+        self._total -= self._weights.pop(key)
+        return self._items.pop(key)
+
+    def _evict(self):
+        while self._items and self._total > max(self.maxsize, 0):
+            key, _ = self._items.popitem(last=False)
+            self._total -= self._weights.pop(key)
@@ -0,0 +1,126 @@
+"""
+Match results of a pattern over a buffer state.
+
+Entries are keyed by ``(buffer id, change count, pattern, flags)``, so an edit
+invalidates them by itself. The row intervals selected by a query are kept
+under ``(buffer id, change count, query, ROWS)``. Offsets are packed in ``array('q')`` (plus one
+``array('H')`` with the pattern indexes of a combined pattern) instead of
+lists of tuples, and the cache is bounded by the total number of matches.
+"""
+
+import threading
+from array import array
+from itertools import chain
+
+from .lru import LRUCache
+from .patterns import DEFAULT_FLAGS
+
+
+def pack_matches(matches):
+    """Compact form of ``(begin, end)`` or ``(begin, end, pattern index)`` matches."""
+
+    if matches and len(matches[0]) > 2:
+        offsets = array('q', chain.from_iterable((m[0], m[1]) for m in matches))
+        return offsets, array('H', [m[2] for m in matches])
+
+    return array('q', chain.from_iterable(matches)), None
+
+
+def unpack_matches(packed):
+    """New list of the matches packed by ``pack_matches()``."""
+
+    offsets, owners = packed
+    spans = iter(offsets)
+
+    if owners is None:
+        return list(zip(spans, spans))
+
+    return list(zip(spans, spans, owners))
+
+
+# last item of the keys of query row intervals, in place of the regex flags
+ROWS = 'rows'
+
+
+def _weight(packed):
+    return len(packed[0]) // 2 + 1
+
+
+class MatchCache:
+
+    def __init__(self, max_matches=2000000):
+        self._cache = LRUCache(max_matches, weigh=_weight)
+        self._lock = threading.Lock()
+        # keys of each buffer, to drop the entries of older buffer states
+        self._keys = {}
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __contains__(self, key):
+        return key in self._cache
+
+    @property
+    def total(self):
+        """Number of cached matches (plus one per entry)."""
+
+        return self._cache.total
+
+    def has(self, buffer_id, change_count, pattern, flags=DEFAULT_FLAGS):
+        return (buffer_id, change_count, pattern, flags) in self._cache
+
+    def get(self, buffer_id, change_count, pattern, flags=DEFAULT_FLAGS):
+        """Matches of ``pattern`` for this buffer state, ``None`` if not cached."""
+
+        packed = self._cache.get((buffer_id, change_count, pattern, flags))
+
+        return None if packed is None else unpack_matches(packed)
+
+    def count(self, buffer_id, change_count, pattern, flags=DEFAULT_FLAGS):
+        """Number of matches of ``pattern`` for this buffer state, ``None`` if not cached."""
+
+        packed = self._cache.get((buffer_id, change_count, pattern, flags))
+
+        return None if packed is None else len(packed[0]) // 2
+
+    def get_rows(self, buffer_id, change_count, query):
+        """``(first row, last row)`` intervals selected by ``query`` for this buffer state, ``None`` if not cached."""
+
+        packed = self._cache.get((buffer_id, change_count, query, ROWS))
+
+        return None if packed is None else unpack_matches(packed)
+
+    def put(self, buffer_id, change_count, pattern, matches, flags=DEFAULT_FLAGS):
+        self._put((buffer_id, change_count, pattern, flags), matches)
+
+    def put_rows(self, buffer_id, change_count, query, intervals):
+        self._put((buffer_id, change_count, query, ROWS), intervals)
+
+    def _put(self, key, matches):
+        buffer_id, change_count = key[:2]
+
+        with self._lock:
+            keys = self._keys.setdefault(buffer_id, set())
+
+            for stale in [k for k in keys if k[1] != change_count]:
+                self._cache.pop(stale)
+                keys.discard(stale)
+
+            keys.add(key)
+
+        self._cache.put(key, pack_matches(matches))
+
+    def discard(self, buffer_id):
+        """Forget every entry of ``buffer_id``."""
+
+        with self._lock:
+            for key in self._keys.pop(buffer_id, ()):
+                self._cache.pop(key)
+
+    def resize(self, max_matches):
+        self._cache.resize(max_matches)
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+            self._cache.clear()
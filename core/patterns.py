@@ -0,0 +1,176 @@
+"""
+Compiled pattern cache.
+
+Patterns are compiled once per ``(pattern, flags)`` and kept in a shared LRU.
+Invalid patterns are cached too, so a bad expression is reported without
+being recompiled on every keystroke.
+"""
+
+import re
+
+from .literals import find_literal, find_prefiltered, match_plan
+from .lru import LRUCache
+
+# Sublime's own find_all() matches ^ and $ at line boundaries
+DEFAULT_FLAGS = re.MULTILINE
+
+# name prefix of the groups wrapping each pattern of a combined pattern
+MULTI_GROUP_PREFIX = 'file_filter_pattern_'
+
+_LEADING_FLAGS = re.compile(r'((?:\(\?[aiLmsux]+\))+)(.*)', re.DOTALL)
+
+
+class PatternCache:
+
+    def __init__(self, maxsize=128):
+        self._cache = LRUCache(maxsize)
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __contains__(self, key):
+        return key in self._cache
+
+    def compile(self, pattern, flags=DEFAULT_FLAGS):
+        """Compiled ``pattern``. Raises ``re.error`` if the pattern is invalid."""
+
+        key = (pattern, flags)
+        compiled = self._cache.get(key)
+
+        if compiled is None:
+            try:
+                compiled = re.compile(pattern, flags)
+            except re.error as e:
+                compiled = e
+
+            self._cache.put(key, compiled)
+
+        if isinstance(compiled, re.error):
+            raise compiled
+
+        return compiled
+
+    def validate(self, pattern, flags=DEFAULT_FLAGS):
+        """``None`` if ``pattern`` compiles, the ``re.error`` otherwise."""
+
+        try:
+            self.compile(pattern, flags)
+        except re.error as e:
+            return e
+
+        return None
+
+    def resize(self, maxsize):
+        self._cache.resize(maxsize)
+
+    def clear(self):
+        self._cache.clear()
+
+
+def find_spans(compiled, text, pos=0, endpos=None, offset=0):
+    """
+    ``(begin, end)`` of every match of ``compiled`` in ``text[pos:endpos]``, moved
+    by ``offset``. Matches of a combined pattern are ``(begin, end, pattern index)``.
+    """
+
+    if endpos is None:
+        endpos = len(text)
+
+    owners = pattern_owners(compiled)
+
+    if owners is not None:
+        return [(m.start() + offset, m.end() + offset, owners[m.lastindex]) for m in compiled.finditer(text, pos, endpos)]
+
+    plan = match_plan(compiled.pattern, compiled.flags) if isinstance(compiled.pattern, str) else None
+
+    if plan and plan.literal is not None and (not plan.ignore_case or text.isascii()):
+        spans = find_literal(plan.literal, text, pos, endpos, plan.ignore_case)
+    elif plan and plan.required is not None:
+        spans = find_prefiltered(compiled, plan.required, text, pos, endpos)
+    elif offset:
+        return [(m.start() + offset, m.end() + offset) for m in compiled.finditer(text, pos, endpos)]
+    else:
+        return [m.span() for m in compiled.finditer(text, pos, endpos)]
+
+    if offset:
+        return [(begin + offset, end + offset) for begin, end in spans]
+
+    return spans
+
+
+def combine_patterns(patterns):
+    """
+    One alternation matching any of ``patterns``, each wrapped in a named group so
+    a match can be traced back to its pattern. Raises ``re.error`` for an invalid pattern.
+    """
+
+    parts = []
+    groups_before = 0
+
+    for idx, pattern in enumerate(patterns):
+        groups = re.compile(pattern).groups
+        pattern = _shift_group_references(_scope_leading_flags(pattern), groups_before + 1)
+
+        parts.append(f"(?P<{MULTI_GROUP_PREFIX}{idx}>{pattern})")
+        groups_before += groups + 1
+
+    return '|'.join(parts)
+
+
+def pattern_owners(compiled):
+    """Group number -> pattern index for a combined pattern, ``None`` for a plain one."""
+
+    owners = {group: int(name[len(MULTI_GROUP_PREFIX):]) for name, group in compiled.groupindex.items() if name.startswith(MULTI_GROUP_PREFIX)}
+
+    return owners or None
+
+
+def _scope_leading_flags(pattern):
+    # "(?i)abc" only means "whole pattern" at the start, inside the alternation it becomes "(?i:abc)"
+    found = _LEADING_FLAGS.fullmatch(pattern)
+
+    if found is None:
+        return pattern
+
+    flags = ''.join(sorted(set(re.sub(r'[(?)]', '', found.group(1)))))
+
+    return f"(?{flags}:{found.group(2)})"
+
+
+def _shift_group_references(pattern, shift):
+    # numbered backreferences (\1) must follow the groups added in front of the pattern
+    out = []
+    idx = 0
+    size = len(pattern)
+    class_start = None
+
+    while idx < size:
+        char = pattern[idx]
+
+        if char == '\\' and idx + 1 < size:
+            digits = idx + 1
+            while digits < size and digits < idx + 4 and pattern[digits].isdigit():
+                digits += 1
+
+            number = pattern[idx + 1:digits]
+            is_octal = len(number) == 3 and all(d in '01234567' for d in number)
+
+            if class_start is None and number and number[0] != '0' and not is_octal:
+                number = number[:2]
+                out.append(f"\\{int(number) + shift}")
+                idx += 1 + len(number)
+                continue
+
+            out.append(pattern[idx:idx + 2])
+            idx += 2
+            continue
+
+        if class_start is None and char == '[':
+            class_start = idx
+        elif class_start is not None and char == ']' and idx > class_start + 1 and pattern[class_start + 1:idx] != '^':
+            class_start = None
+
+        out.append(char)
+        idx += 1
+
+    return ''.join(out)
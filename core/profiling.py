@@ -0,0 +1,165 @@
+"""
+Per-run profiling of the filter: phase durations, counters and editor API calls.
+
+Profiling is off by default. Instrumented code always goes through a profile
+object, and ``NULL_PROFILE`` makes every instrumentation point a no-op method
+call, so nothing is timed or formatted unless profiling is enabled.
+"""
+
+import threading
+import time
+from collections import Counter, deque
+
+
+class _Phase:
+
+    __slots__ = ['profile', 'name', 'started']
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        phases = self.profile.phases
+        phases[self.name] = phases.get(self.name, 0.0) + time.perf_counter() - self.started
+        return False
+
+
+class RunProfile:
+    """Measurements of a single filter run. Repeated phases add up."""
+
+    enabled = True
+
+    def __init__(self, kind, label=""):
+        self.kind = kind
+        self.label = label
+        self.started = time.perf_counter()
+        self.timestamp = time.time()
+        self.total = None
+        self.phases = {}
+        self.counts = {}
+        self.api_calls = Counter()
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def count(self, name, value=1):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+
+class _NullPhase:
+
+    __slots__ = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class _NullProfile:
+
+    enabled = False
+
+    _phase = _NullPhase()
+
+    def phase(self, name):
+        return self._phase
+
+    def count(self, name, value=1):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_PROFILE = _NullProfile()
+
+
+class ProfileHistory:
+    """Last ``size`` run profiles of each key (a view id)."""
+
+    def __init__(self, size=10):
+        self._lock = threading.Lock()
+        self._size = max(size, 1)
+        self._runs = {}
+
+    def add(self, key, profile):
+        with self._lock:
+            runs = self._runs.get(key)
+            if runs is None:
+                runs = self._runs[key] = deque(maxlen=self._size)
+            runs.append(profile)
+
+    def runs(self, key):
+        """Profiles of ``key``, newest first."""
+
+        with self._lock:
+            return list(reversed(self._runs.get(key, ())))
+
+    def discard(self, key):
+        with self._lock:
+            self._runs.pop(key, None)
+
+    def resize(self, size):
+        with self._lock:
+            self._size = max(size, 1)
+            self._runs = {key: deque(runs, maxlen=self._size) for key, runs in self._runs.items()}
+
+
+class CountingProxy:
+    """Stand-in for ``target`` that counts the calls of its methods in ``calls``."""
+
+    __slots__ = ['_target', '_calls', '_prefix']
+
+    def __init__(self, target, calls):
+        self._target = target
+        self._calls = calls
+        self._prefix = type(target).__name__ + '.'
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+
+        if not callable(attr):
+            return attr
+
+        calls = self._calls
+        key = self._prefix + name
+
+        def counted(*args, **kwargs):
+            calls[key] += 1
+            return attr(*args, **kwargs)
+
+        return counted
+
+
+def format_runs(runs, title):
+    """Report of the ``runs`` profiles, newest first, as text."""
+
+    lines = [title, ""]
+
+    for idx, profile in enumerate(runs, 1):
+        total = f"{profile.total * 1000:.1f} ms" if profile.total is not None else "unfinished"
+        counts = ", ".join(f"{value} {name}" for name, value in profile.counts.items())
+        started = time.strftime('%H:%M:%S', time.localtime(profile.timestamp))
+
+        lines.append(f"#{idx} {started} {profile.kind} {profile.label}: {total}" + (f", {counts}" if counts else ""))
+
+        for name, seconds in profile.phases.items():
+            lines.append(f"    {name:<12} {seconds * 1000:9.2f} ms")
+
+        if profile.api_calls:
+            calls = ", ".join(f"{name} {value}" for name, value in profile.api_calls.most_common())
+            lines.append(f"    api calls    {sum(profile.api_calls.values()):6d}    {calls}")
+
+        lines.append("")
+
+    return "\n".join(lines)
@@ -0,0 +1,253 @@
+"""
+Boolean line queries.
+
+A query is typed in the regex prompt after a ``?``, like
+``?ERROR AND (db OR cache) AND NOT retry``. Terms are bare words or "quoted
+strings", searched as plain substrings, and /regular expressions/. Terms are
+combined with ``AND`` (also implied between adjacent terms), ``OR``, ``NOT``
+and parentheses.
+
+A query is compiled to nested closures testing a line of the text in place.
+Operands are ordered cheapest first (substrings before regexes) and
+evaluation stops as soon as the result is known. When the query requires a
+substring, only the lines containing it are evaluated.
+"""
+
+import re
+from bisect import bisect_right
+
+from .literals import match_plan
+
+QUERY_PREFIX = '?'
+
+_TOKEN = re.compile(r'''\s*(?:(?P<open>\()|(?P<close>\))|"(?P<quoted>(?:[^"\\]|\\.)*)"|/(?P<regex>(?:[^/\\]|\\.)*)/|(?P<word>[^\s()"]+))''')
+
+_KEYWORDS = ('AND', 'OR', 'NOT')
+
+# evaluation cost of each kind of node, cheapest first
+_COSTS = {'literal': 0, 'not': 1, 'and': 2, 'or': 2, 'regex': 3}
+
+
+class QueryError(ValueError):
+    pass
+
+
+def is_query(pattern):
+    return bool(pattern) and pattern.startswith(QUERY_PREFIX)
+
+
+def tokenize(query):
+    """``(kind, value, position)`` tokens of ``query`` (without the prefix)."""
+
+    tokens = []
+    pos = 0
+    query = query.rstrip()
+
+    while pos < len(query):
+        found = _TOKEN.match(query, pos)
+
+        if found is None or found.end() == pos:
+            raise QueryError(f"unexpected '{query[pos:].strip()[:10]}' at position {pos}")
+
+        kind = found.lastgroup
+        value = found.group(kind)
+        start = found.start(kind)
+
+        if kind == 'quoted':
+            kind, value = 'literal', re.sub(r'\\(.)', r'\1', value)
+        elif kind == 'regex':
+            value = value.replace('\\/', '/')
+        elif kind == 'word':
+            kind, value = (value.lower(), value) if value in _KEYWORDS else ('literal', value)
+
+        tokens.append((kind, value, start))
+        pos = found.end()
+
+    return tokens
+
+
+def parse_query(query):
+    """
+    Syntax tree of ``query``: ``('literal', str)``, ``('regex', str)``,
+    ``('not', node)``, ``('and', [nodes])`` or ``('or', [nodes])``.
+    Raises ``QueryError``.
+    """
+
+    if is_query(query):
+        query = query[len(QUERY_PREFIX):]
+
+    tokens = tokenize(query)
+    pos = 0
+
+    def peek():
+        return tokens[pos][0] if pos < len(tokens) else None
+
+    def take(kind):
+        nonlocal pos
+        if peek() != kind:
+            where = f"at position {tokens[pos][2]}" if pos < len(tokens) else "at the end"
+            raise QueryError(f"expected {kind} {where}")
+        pos += 1
+        return tokens[pos - 1][1]
+
+    def parse_or():
+        nodes = [parse_and()]
+        while peek() == 'or':
+            take('or')
+            nodes.append(parse_and())
+        return nodes[0] if len(nodes) == 1 else ('or', nodes)
+
+    def parse_and():
+        nodes = [parse_not()]
+        while peek() in ('and', 'not', 'open', 'literal', 'regex'):
+            if peek() == 'and':
+                take('and')
+            nodes.append(parse_not())
+        return nodes[0] if len(nodes) == 1 else ('and', nodes)
+
+    def parse_not():
+        if peek() == 'not':
+            take('not')
+            return ('not', parse_not())
+        return parse_term()
+
+    def parse_term():
+        kind = peek()
+        if kind == 'open':
+            take('open')
+            node = parse_or()
+            take('close')
+            return node
+        if kind == 'literal':
+            return ('literal', take('literal'))
+        if kind == 'regex':
+            return ('regex', take('regex'))
+        raise QueryError(f"expected a term {'at position %d' % tokens[pos][2] if pos < len(tokens) else 'at the end'}")
+
+    if not tokens:
+        raise QueryError("empty query")
+
+    node = parse_or()
+
+    if pos < len(tokens):
+        raise QueryError(f"unexpected '{tokens[pos][1]}' at position {tokens[pos][2]}")
+
+    return node
+
+
+class Query:
+    """
+    Compiled query. ``compile_regex(pattern)`` compiles the regex terms, so they
+    can go through a pattern cache. Raises ``QueryError`` or ``re.error``.
+    """
+
+    def __init__(self, query, compile_regex=re.compile):
+        self.query = query
+        self.tree = parse_query(query)
+        self._compile_regex = compile_regex
+        self._terms = []
+        self.test = self._compile(self.tree, positive=True)
+        self.anchor = self._anchor(self.tree)
+
+    def _compile(self, node, positive):
+        kind = node[0]
+
+        if kind == 'literal':
+            literal = node[1]
+            if positive:
+                self._terms.append(node)
+            return lambda text, begin, end: text.find(literal, begin, end) >= 0
+
+        if kind == 'regex':
+            compiled = self._compile_regex(node[1])
+            search = compiled.search
+            if positive:
+                self._terms.append((kind, compiled))
+            return lambda text, begin, end: search(text, begin, end) is not None
+
+        if kind == 'not':
+            test = self._compile(node[1], not positive)
+            return lambda text, begin, end: not test(text, begin, end)
+
+        tests = [self._compile(child, positive) for child in sorted(node[1], key=lambda child: _COSTS[child[0]])]
+
+        if kind == 'and':
+            def test_all(text, begin, end):
+                for test in tests:
+                    if not test(text, begin, end):
+                        return False
+                return True
+            return test_all
+
+        def test_any(text, begin, end):
+            for test in tests:
+                if test(text, begin, end):
+                    return True
+            return False
+        return test_any
+
+    @staticmethod
+    def _anchor(node):
+        # longest substring every matching line contains, regex terms included
+        literals = []
+
+        for kind, value in node[1] if node[0] == 'and' else [node]:
+            if kind == 'literal':
+                literals.append(value)
+            elif kind == 'regex':
+                plan = match_plan(value)
+                literals.append(plan.required or (plan.literal if not plan.ignore_case else None) or "")
+
+        return max(literals, key=len, default="") or None
+
+    def spans(self, text, begin, end):
+        """Sorted ``(begin, end)`` of the occurrences of the positive terms in ``text[begin:end]``."""
+
+        spans = set()
+
+        for kind, term in self._terms:
+            if kind == 'literal':
+                if not term:
+                    continue
+                found = text.find(term, begin, end)
+                while found >= 0:
+                    spans.add((found, found + len(term)))
+                    found = text.find(term, found + len(term), end)
+            else:
+                spans.update(m.span() for m in term.finditer(text, begin, end) if m.end() > m.start())
+
+        return sorted(spans)
+
+    def select(self, text, starts):
+        """Row intervals of the lines of ``text`` matching the query, and the spans of their terms."""
+
+        intervals = []
+        spans = []
+        row_count = len(starts)
+        test = self.test
+
+        def line_end(row):
+            return starts[row + 1] - 1 if row + 1 < row_count else len(text)
+
+        def add(row, begin, end):
+            if intervals and intervals[-1][1] == row - 1:
+                intervals[-1] = (intervals[-1][0], row)
+            else:
+                intervals.append((row, row))
+            spans.extend(self.spans(text, begin, end))
+
+        if self.anchor:
+            found = text.find(self.anchor)
+            while found >= 0:
+                row = bisect_right(starts, found) - 1
+                begin, end = starts[row], line_end(row)
+                if test(text, begin, end):
+                    add(row, begin, end)
+                found = text.find(self.anchor, end)
+        else:
+            for row in range(row_count):
+                begin, end = starts[row], line_end(row)
+                if test(text, begin, end):
+                    add(row, begin, end)
+
+        return intervals, spans
@@ -0,0 +1,26 @@
+"""Line aligned chunking of a text snapshot for incremental scans."""
+
+
+def line_chunks(text, chunk_size, start=0, end=None):
+    """
+    Yield ``(begin, end)`` ranges of about ``chunk_size`` characters covering
+    ``text[start:end]``. Every range but the last ends right after a newline.
+    """
+
+    if end is None:
+        end = len(text)
+
+    chunk_size = max(chunk_size, 1)
+    begin = start
+
+    while begin < end:
+        stop = begin + chunk_size
+
+        if stop >= end:
+            stop = end
+        else:
+            newline = text.find('\n', stop - 1, end)
+            stop = end if newline < 0 else newline + 1
+
+        yield begin, stop
+        begin = stop
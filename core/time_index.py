@@ -0,0 +1,149 @@
+"""
+Per-line timestamps for time window filters.
+
+The timestamp leading a line (``2010-04-24 00:00:01,000``, optionally in
+brackets, with a ``T`` separator or a ``.`` before the fraction) is parsed once
+into a sortable integer ``YYYYMMDDhhmmssfff``, to the millisecond. Only the lines carrying one
+are stored, in two ``array('q')`` of line start offsets and times: a line
+without a timestamp belongs to the previous one. Times are kept non-decreasing
+(a line older than the one before it keeps the newer time), so the boundaries
+of a window are found with two binary searches.
+"""
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+_TIME = r'(\d\d)(?::(\d\d)(?::(\d\d)(?:[.,](\d{1,3})\d*)?)?)?'
+
+_TIMESTAMP = r'\[?(\d{4})-(\d\d)-(\d\d)[ T](\d\d):(\d\d):(\d\d)(?:[.,](\d{1,3}))?'
+
+TIMESTAMP = re.compile(_TIMESTAMP)
+
+# starting with a literal newline lets the regex engine jump from line to line
+_LINE_TIMESTAMP = re.compile(r'\n' + _TIMESTAMP)
+
+# a full or partial timestamp, or a time of day alone
+_BOUND = re.compile(r'\[?(?:(\d{4})(?:-(\d\d)(?:-(\d\d)(?:[ T]+' + _TIME + r')?)?)?|' + _TIME + r')\]?')
+
+# separates the two bounds of a range: "from .. to", "from - to" or "from to to"
+_RANGE_SEPARATOR = re.compile(r'\s*\.\.\s*|\s+(?:-|to)\s+')
+
+# the missing fields of a lower and of an upper bound
+_LOWER = ('0000', '01', '01', '00', '00', '00', '000')
+_UPPER = ('9999', '12', '31', '23', '59', '59', '999')
+
+
+def time_value(fields, upper=False):
+    """Sortable time of the ``(year, month, day, hour, minute, second, fraction)`` strings, missing fields set to ``None``."""
+
+    padding = _UPPER if upper else _LOWER
+    fraction = fields[6]
+
+    if fraction is not None:
+        fraction = fraction.ljust(3, padding[6][0])
+
+    return int(''.join(field if field is not None else pad for field, pad in zip(fields[:6] + (fraction,), padding)))
+
+
+def parse_bound(text, upper=False, date=None):
+    """
+    Time of a range bound, ``None`` when ``text`` is blank. Missing fields are the
+    start of the period (``2010-04-24 10`` is 10:00:00) or its end when ``upper``.
+    A time of day alone needs ``date``, a ``(year, month, day)`` tuple.
+    Raises ``ValueError``.
+    """
+
+    text = text.strip()
+
+    if not text:
+        return None
+
+    found = _BOUND.fullmatch(text)
+
+    if found is None:
+        raise ValueError(f"'{text}' is not a timestamp")
+
+    groups = found.groups()
+
+    if groups[0] is not None:
+        return time_value(groups[:7], upper)
+
+    if date is None:
+        raise ValueError(f"'{text}' needs a date")
+
+    return time_value(tuple(date) + groups[7:], upper)
+
+
+def split_range(text):
+    """``(from, to)`` texts of a ``from .. to`` range, either side may be blank; a single time is its own range."""
+
+    parts = _RANGE_SEPARATOR.split(text.strip(), maxsplit=1)
+
+    return (parts[0], parts[0]) if len(parts) == 1 else (parts[0], parts[1])
+
+
+class TimeIndex:
+
+    def __init__(self, offsets, times, size, change_count=None):
+        self.offsets = offsets
+        self.times = times
+        self.size = size
+        self.change_count = change_count
+
+    @classmethod
+    def from_text(cls, text, change_count=None):
+        first = TIMESTAMP.match(text)
+        stamps = ([first] if first else []) + list(_LINE_TIMESTAMP.finditer(text))
+
+        # matches after the first line start on the newline before the timestamp
+        offsets = array('q', [stamp.start() + (stamp is not first) for stamp in stamps])
+
+        # the fraction is the last field: padding the digits pads it to milliseconds
+        times = array('q', accumulate((int(''.join(stamp.groups('')).ljust(17, '0')) for stamp in stamps), max))
+
+        return cls(offsets, times, len(text), change_count)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def first_date(self):
+        """``(year, month, day)`` of the first timestamp, ``None`` when there is none."""
+
+        if not self.times:
+            return None
+
+        digits = str(self.times[0])
+
+        return digits[:4], digits[4:6], digits[6:8]
+
+    def bounds(self, since, until):
+        """
+        Times of the ``since`` and ``until`` range texts, times of day taken on the
+        date of the first timestamp. Raises ``ValueError``.
+        """
+
+        # without timestamps no line is in a bounded window, whatever the date
+        date = self.first_date() or ('0000', '01', '01')
+
+        return parse_bound(since, False, date), parse_bound(until, True, date)
+
+    def window(self, since, until):
+        """
+        ``(begin, end)`` offsets of the lines timed from ``since`` to ``until``
+        (inclusive times, ``None`` for an open end), ``end`` being the start of the
+        first line after the window. ``None`` when no line is in the window.
+        Lines before the first timestamp are only in windows open on the left.
+        """
+
+        first = bisect_left(self.times, since) if since is not None else 0
+        last = bisect_right(self.times, until) if until is not None else len(self.times)
+
+        if first >= last:
+            return None
+
+        begin = self.offsets[first] if since is not None else 0
+        end = self.offsets[last] if last < len(self.offsets) else self.size
+
+        return begin, end
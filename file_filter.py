@@ -1,48 +1,34 @@
 import sys
+import os
 import re
+import mmap
+import time
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 
 import logging
 import sublime
 import sublime_plugin
 
-from enum import Enum
-
-class MyEnum(Enum):
-
-    @classmethod
-    def all_members(cls):
-        return [member for member in cls]
-
-    @classmethod
-    def all_values(cls):
-        return [member._value_ for member in cls]
-
-class TupleEnum(MyEnum):
-
-    def __new__(cls, description, value):
-        obj = object.__new__(cls)
-
-        obj._value_ = value
-        obj.description = description
-
-        return obj
-
-    @classmethod
-    def all_values(cls):
-        return [member.value for member in cls]
-
-    @classmethod
-    def all_descriptions(cls):
-        return [member.description for member in cls]
-
-
-class FoldingTypes(MyEnum):
-
-    line = 'Line'
-    match_only = 'Match only'
-    before_only = 'Fold before'
-    after_only = 'Fold after'
-    highlight_only = 'Highlight only'
+from .core.enums import MyEnum, TupleEnum, FoldingTypes
+from .core.disk_cache import DiskCache
+from .core.extract import SEPARATOR, extract_chunks, source_of
+from .core.field_index import DEFAULT_PATTERN as DEFAULT_FIELD_PATTERN, FieldIndex, compile_extractor
+from .core.file_scan import bytes_pattern, matching_lines
+from .core.fold_plan import diff_spans, normalize_spans, plan_folds, plan_row_folds
+from .core.generations import Generations
+from .core.line_filter import clip_rows, exclude_rows, expand_rows, intersect_rows, rows_of_spans, select_rows, spans_between, spans_in_rows
+from .core.line_index import LineIndex
+from .core.match_cache import MatchCache
+from .core.patterns import PatternCache, combine_patterns, find_spans
+from .core.profiling import NULL_PROFILE, CountingProxy, ProfileHistory, RunProfile, format_runs
+from .core.query import Query, QueryError, is_query
+from .core.scanner import line_chunks
+from .core.time_index import TimeIndex, parse_bound, split_range
 
 class HighlightTypes(TupleEnum):
 
@@ -91,8 +77,15 @@ SETTING_FILE_SETTINGS_NAME = 'file_filter.sublime-settings'
 ##
 VIEW_SETTINGS_IS_FILTER_ACTIVE = 'file_filter.view_settings.is_filter_active'
 VIEW_SETTINGS_CURRENT_REGEX = 'file_filter.view_settings.current_regex'
+VIEW_SETTINGS_CURRENT_REGEX_LIST = 'file_filter.view_settings.current_regex_list'
+VIEW_SETTINGS_CURRENT_EXCLUDE_REGEX = 'file_filter.view_settings.current_exclude_regex'
 VIEW_SETTINGS_CURRENT_FOLDING_TYPE = 'file_filter.view_settings.current_folding_type'
 VIEW_SETTINGS_CURRENT_HIGHLIGHT_TYPE = 'file_filter.view_settings.current_highlight_type'
+VIEW_SETTINGS_FOLLOW = 'file_filter.view_settings.follow'
+VIEW_SETTINGS_CONTEXT_LINES = 'file_filter.view_settings.context_lines'
+VIEW_SETTINGS_EXTRACT_SOURCE = 'file_filter.view_settings.extract_source'
+VIEW_SETTINGS_TIME_RANGE = 'file_filter.view_settings.time_range'
+VIEW_SETTINGS_FIELD_VALUES = 'file_filter.view_settings.field_values'
 
 
 VIEW_SETTINGS_STATUS_BAR_REGEX = 'file_filter.view_settings.status_bar.regex'
@@ -102,10 +95,437 @@ VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES = 'file_filter.view_settings.status_bar.t
 VIEW_SETTINGS_HIGHLIGHTED_REGIONS = 'file_filter.view_settings.highlighted_regions'
     
 KEY_MAP_CONTEXT_KEY_CLEAR = "file_filter.keymaps_context.clear"
+KEY_MAP_CONTEXT_KEY_EXTRACT = "file_filter.keymaps_context.extract"
 
 SETTING_OBSERVER_KEY = "cc362837-008e-4a24-8bc2-b32c8d455c21"
 SETTINGS = None
 
+# line start index of each buffer, keyed by buffer_id
+LINE_INDEXES = {}
+
+# line timestamps of each buffer, keyed by buffer_id
+TIME_INDEXES = {}
+
+# line field values (log levels) of each buffer, keyed by buffer_id
+FIELD_INDEXES = {}
+
+# lowest position edited since the last scan, keyed by buffer_id
+EDITED_FROM = {}
+
+
+# compiled patterns shared by all views, keyed by (pattern, flags)
+PATTERNS = PatternCache()
+
+# matches of the last filters of each buffer, keyed by (buffer_id, change_count, pattern, flags)
+MATCHES = MatchCache()
+
+# matches and fold plans of unmodified files kept across sessions; None while disabled
+DISK_CACHE = None
+
+
+def current_line_index(view):
+    """Line index of the view's buffer, ``None`` when it is missing or stale."""
+
+    index = LINE_INDEXES.get(view.buffer_id())
+
+    if index is None or index.change_count != view.change_count() or index.size != view.size():
+        return None
+
+    return index
+
+
+def get_line_index(view, text=None):
+    """Line index of the view's buffer, (re)built only when it is missing or stale."""
+
+    index = current_line_index(view)
+
+    if index is None:
+        if text is None:
+            text = view.substr(sublime.Region(0, view.size()))
+
+        index = LineIndex.from_text(text, view.change_count())
+        LINE_INDEXES[view.buffer_id()] = index
+
+    return index
+
+
+def current_time_index(view):
+    """Time index of the view's buffer, ``None`` when it is missing or stale."""
+
+    index = TIME_INDEXES.get(view.buffer_id())
+
+    if index is None or index.change_count != view.change_count() or index.size != view.size():
+        return None
+
+    return index
+
+
+def get_time_index(view, text=None):
+    """Time index of the view's buffer, (re)built only when it is missing or stale."""
+
+    index = current_time_index(view)
+
+    if index is None:
+        if text is None:
+            text = view.substr(sublime.Region(0, view.size()))
+
+        index = TimeIndex.from_text(text, view.change_count())
+        TIME_INDEXES[view.buffer_id()] = index
+
+    return index
+
+
+def field_pattern():
+    return SETTINGS.get('field_index', {}).get('pattern') or DEFAULT_FIELD_PATTERN
+
+
+def current_field_index(view):
+    """Field index of the view's buffer, ``None`` when it is missing, stale or built with another pattern."""
+
+    index = FIELD_INDEXES.get(view.buffer_id())
+
+    if index is None or index.change_count != view.change_count() or index.size != view.size() or index.pattern != field_pattern():
+        return None
+
+    return index
+
+
+def get_field_index(view, text, starts):
+    """Field index of the view's buffer, (re)built only when it is missing or stale."""
+
+    index = current_field_index(view)
+
+    if index is None:
+        index = FieldIndex.from_text(text, starts, field_pattern(), view.change_count())
+        FIELD_INDEXES[view.buffer_id()] = index
+
+    return index
+
+
+def watch_viewport(view, delay):
+    """
+    Poll the viewport of ``view`` every ``delay`` ms and redraw its highlights when
+    the visible region leaves the highlighted window. Stops once the view's
+    highlights no longer follow the viewport.
+    """
+
+    view_id = view.id()
+    generation = VIEWPORT_GENERATIONS.next(view_id)
+
+    def poll():
+        if not VIEWPORT_GENERATIONS.is_current(view_id, generation) or not view.is_valid():
+            return
+
+        window = VIEWPORT_WINDOWS.get(view_id)
+
+        if window is None:
+            return
+
+        visible = view.visible_region()
+
+        if (visible.begin() < window[0] or visible.end() > window[1]) and view.window():
+            view.window().run_command('file_filter_refresh', {'view_id': view_id, 'viewport': True})
+
+        sublime.set_timeout(poll, delay)
+
+    sublime.set_timeout(poll, delay)
+
+
+class TextSnapshot:
+    """
+    Text of a view's buffer, read on first use, and the matches of patterns over
+    it, served from ``MATCHES`` while the buffer keeps the same change count.
+    """
+
+    def __init__(self, view, profile=NULL_PROFILE):
+        self.view = view
+        self.profile = profile
+        self.buffer_id = view.buffer_id()
+        self.change_count = view.change_count()
+        self.cacheable = True
+        self._text = None
+        self._file_state = None
+        self._disk_entries = {}
+
+    @property
+    def text(self):
+        if self._text is None:
+            with self.profile.phase('substr'):
+                self._text = self.view.substr(sublime.Region(0, self.view.size()))
+
+            # off the main thread the buffer may have changed in between
+            self.cacheable = self.view.change_count() == self.change_count
+
+        return self._text
+
+    def matches(self, pattern, cancelled=None):
+        """
+        Matches of ``pattern``. With a ``cancelled()`` callable the text is matched
+        in line aligned chunks and ``None`` is returned once it returns ``True``.
+        """
+
+        with self.profile.phase('match'):
+            matches = MATCHES.get(self.buffer_id, self.change_count, pattern)
+
+        if matches is None:
+            with self.profile.phase('disk_cache'):
+                entry = self.disk_entry(pattern)
+
+            if entry is not None:
+                matches = entry[0]
+                MATCHES.put(self.buffer_id, self.change_count, pattern, matches)
+
+        if matches is None and is_query(pattern):
+            matches = self.query_rows(pattern)[1]
+
+        if matches is None:
+            text = self.text
+
+            with self.profile.phase('match'):
+                if cancelled is None:
+                    matches = find_spans(PATTERNS.compile(pattern), text)
+                else:
+                    matches = self.matches_in_chunks(PATTERNS.compile(pattern), cancelled)
+
+            if matches is None:
+                return None
+
+            if self.cacheable:
+                MATCHES.put(self.buffer_id, self.change_count, pattern, matches)
+                self.store(pattern, matches)
+
+        return matches
+
+    def query_rows(self, query):
+        """
+        Row intervals of the lines matching the ``?`` ``query`` and the spans of its
+        terms, served from ``MATCHES`` like the matches of a regex.
+        """
+
+        with self.profile.phase('match'):
+            intervals = MATCHES.get_rows(self.buffer_id, self.change_count, query)
+            spans = MATCHES.get(self.buffer_id, self.change_count, query) if intervals is not None else None
+
+        if spans is None:
+            starts = self.line_index().starts
+
+            with self.profile.phase('match'):
+                intervals, spans = Query(query, PATTERNS.compile).select(self.text, starts)
+
+            if self.cacheable:
+                MATCHES.put_rows(self.buffer_id, self.change_count, query, intervals)
+                MATCHES.put(self.buffer_id, self.change_count, query, spans)
+
+        return intervals, spans
+
+    def matches_in_chunks(self, compiled, cancelled):
+        matches = []
+
+        for begin, end in line_chunks(self.text, SETTINGS.get('background_scan', {}).get('chunk_size', 1000000)):
+            if cancelled():
+                return None
+
+            matches.extend(find_spans(compiled, self.text, begin, end))
+
+        return matches
+
+    def file_state(self):
+        """``(path, size, mtime)`` of the file shown unmodified by the view, ``None`` when the disk cache does not apply."""
+
+        if self._file_state is None:
+            self._file_state = False
+            path = self.view.file_name()
+
+            if DISK_CACHE is not None and path and not self.view.is_dirty() and not self.view.is_loading() \
+                    and self.view.size() >= SETTINGS.get('disk_cache', {}).get('min_size', 5000000):
+                try:
+                    stat = os.stat(path)
+                    self._file_state = (path, stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    pass
+
+        return self._file_state or None
+
+    def disk_entry(self, pattern):
+        """``(matches, fold plans by plan key)`` of ``pattern`` from ``DISK_CACHE``, ``None`` on a miss."""
+
+        if pattern not in self._disk_entries:
+            state = self.file_state()
+            self._disk_entries[pattern] = DISK_CACHE.get(*state, pattern) if state else None
+
+        return self._disk_entries[pattern]
+
+    def on_disk(self, pattern):
+        state = self.file_state()
+
+        return bool(state) and DISK_CACHE.has(*state, pattern)
+
+    def fold_plan(self, pattern, plan_key):
+        entry = self.disk_entry(pattern) if self.file_state() else None
+
+        return None if entry is None else entry[1].get(plan_key)
+
+    def store(self, pattern, matches, plan_key=None, fold_plan=None):
+        """Write ``matches`` (and ``fold_plan``) to ``DISK_CACHE`` on the async thread."""
+
+        state = self.file_state()
+
+        if state and self.cacheable:
+            sublime.set_timeout_async(partial(DISK_CACHE.put, *state, pattern, matches, plan_key=plan_key, fold_plan=fold_plan), 0)
+
+    def line_index(self):
+        with self.profile.phase('line_index'):
+            return current_line_index(self.view) or get_line_index(self.view, self.text)
+
+    def time_index(self):
+        with self.profile.phase('time_index'):
+            return current_time_index(self.view) or get_time_index(self.view, self.text)
+
+    def field_index(self):
+        index = current_field_index(self.view)
+
+        if index is None:
+            starts = self.line_index().starts
+
+            with self.profile.phase('field_index'):
+                index = get_field_index(self.view, self.text, starts)
+
+        return index
+
+    def time_window(self, since, until):
+        """``(begin, end)`` offsets of the lines timed from ``since`` to ``until`` (range texts), ``None`` when empty."""
+
+        index = self.time_index()
+
+        return index.window(*index.bounds(since, until))
+
+
+def prefetch_scan(view, regex, exclude_regex=""):
+    """
+    Read the view's text and cache its line index and the matches of ``regex``,
+    so that applying the filter does not scan again. Safe to run on worker
+    threads. Returns the number of ``regex`` matches on the lines matching no
+    ``exclude_regex``.
+    """
+
+    snapshot = TextSnapshot(view)
+    matches = snapshot.matches(regex)
+    starts = snapshot.line_index().starts
+
+    if exclude_regex:
+        _, matches = exclude_rows(snapshot.text, starts, rows_of_spans(matches, starts), matches, PATTERNS.compile(exclude_regex).search)
+
+    return len(matches)
+
+
+def load_diagnostics_settings():
+    """Apply the ``log_level`` and ``profiling`` settings."""
+
+    global PROFILING_ENABLED
+
+    level = logging.getLevelName(str(SETTINGS.get('log_level', 'error')).upper())
+    level = level if isinstance(level, int) else LOGGING_LEVEL
+
+    for name in [LOGGER.name] + [name for name in logging.root.manager.loggerDict if name.startswith(LOGGER.name + '.')]:
+        logging.getLogger(name).setLevel(level)
+
+    profiling_settings = SETTINGS.get('profiling', {})
+    PROFILING_ENABLED = bool(profiling_settings.get('enabled', False))
+    PROFILES.resize(profiling_settings.get('history_size', 10))
+
+
+def load_disk_cache_settings():
+    """Create, resize or drop ``DISK_CACHE`` according to the ``disk_cache`` settings."""
+
+    global DISK_CACHE
+
+    disk_cache_settings = SETTINGS.get('disk_cache', {})
+
+    if not disk_cache_settings.get('enabled', False):
+        DISK_CACHE = None
+        return
+
+    max_bytes = int(disk_cache_settings.get('max_size_mb', 256) * 1024 * 1024)
+
+    if DISK_CACHE is None:
+        DISK_CACHE = DiskCache(os.path.join(sublime.cache_path(), 'File Filter', 'matches'), max_bytes)
+    else:
+        DISK_CACHE.max_bytes = max_bytes
+
+
+def pattern_error(pattern):
+    """``None`` if ``pattern``, a regex or a ``?`` query, is valid, the error otherwise."""
+
+    if is_query(pattern):
+        try:
+            Query(pattern, PATTERNS.compile)
+        except (QueryError, re.error) as e:
+            return e
+        return None
+
+    return PATTERNS.validate(pattern)
+
+
+def precompile_regex_list():
+    """Compile the settings ``regex_list`` so quick panel entries apply without compiling."""
+
+    PATTERNS.resize(SETTINGS.get('pattern_cache_size', 128))
+
+    for description, regex in SETTINGS.get('regex_list', []):
+        error = pattern_error(regex)
+        if error is not None:
+            LOGGER.error("regex_list entry '%s' /%s/ is not valid: %s", description, regex, error)
+
+
+# outcome of FileFilter.scan(): the regex, its matches as (begin, end) pairs, the fold spans,
+# the line boundary up to which the buffer was fully scanned, for a scan cut short by a
+# background_scan limit the limit that stopped it, for a line filtered scan the row intervals
+# of the shown lines, and the FileFilter.line_filter() it was made with
+ScanResult = namedtuple('ScanResult', ['regex', 'matches', 'fold_plan', 'scanned_to', 'stopped', 'rows', 'line_filter'], defaults=(None, None, None))
+
+# scan tokens keyed by view id; a scan is only applied while its token is the newest one
+SCAN_GENERATIONS = Generations()
+
+# last scan applied to each view, keyed by view id
+APPLIED_SCANS = {}
+
+# ids of the views with a background scan in progress
+BACKGROUND_SCANS = set()
+
+# number of per pattern highlight keys used by each view, keyed by view id
+MULTI_HIGHLIGHT_KEYS = {}
+
+# regions of the views highlighting all their matches, by region key, keyed by view id;
+# follow mode adds the regions of the appended matches to them
+HIGHLIGHTED_REGIONS = {}
+
+# scopes cycled through by the per pattern highlights of a multi filter
+MULTI_HIGHLIGHT_SCOPES = ['region.redish', 'region.orangish', 'region.yellowish', 'region.greenish', 'region.cyanish', 'region.bluish', 'region.purplish', 'region.pinkish']
+
+# pending follow refreshes keyed by view id
+FOLLOW_GENERATIONS = Generations()
+
+# profiles of the last runs of each view, keyed by view id; filled only when profiling is enabled
+PROFILES = ProfileHistory()
+PROFILING_ENABLED = False
+
+PROFILE_PANEL_NAME = 'file_filter_profile'
+
+SUMMARY_PANEL_NAME = 'file_filter_summary'
+
+# quick panels counting the matches of the regex_list entries, keyed by view id;
+# counting stops once the panel of its token is closed
+QUICK_PANEL_GENERATIONS = Generations()
+
+# (begin, end) of the highlighted part of the views whose highlights follow the viewport, keyed by view id
+VIEWPORT_WINDOWS = {}
+
+# viewport watchers keyed by view id; only the newest one of a view keeps polling
+VIEWPORT_GENERATIONS = Generations()
+
+# source offset of each line of the extract views, keyed by extract view id
+EXTRACTS = {}
+
 
 
 ##
@@ -117,7 +537,12 @@ def plugin_loaded() -> None:
     SETTINGS = sublime.load_settings(SETTING_FILE_SETTINGS_NAME)
     SETTINGS.add_on_change(SETTING_OBSERVER_KEY, settings_changed)
 
-    LOGGER.info(f"plugin loaded with settings {SETTINGS}")
+    load_diagnostics_settings()
+    precompile_regex_list()
+    MATCHES.resize(SETTINGS.get('match_cache_size', 2000000))
+    load_disk_cache_settings()
+
+    LOGGER.info("plugin loaded with settings %s", SETTINGS)
 
 def plugin_unloaded() -> None:
 
@@ -130,8 +555,15 @@ def plugin_unloaded() -> None:
 
 
 def settings_changed() -> None:
+    global SETTINGS
     SETTINGS = sublime.load_settings(SETTING_FILE_SETTINGS_NAME)
-    LOGGER.info(f"settings reloaded {SETTINGS}")
+
+    load_diagnostics_settings()
+    precompile_regex_list()
+    MATCHES.resize(SETTINGS.get('match_cache_size', 2000000))
+    load_disk_cache_settings()
+
+    LOGGER.info("settings reloaded %s", SETTINGS)
 
 
 class FileFilter(sublime_plugin.WindowCommand):
@@ -142,17 +574,23 @@ class FileFilter(sublime_plugin.WindowCommand):
         
         self.log = logging.getLogger(f"FileFilter.{self.__class__.__name__}")
 
-        self.log.setLevel(LOGGING_LEVEL)
+        self.log.setLevel(LOGGER.level)
         if not LOGGER.handlers:
             self.log.addHandler(STREAM_HANDLER)
         
         self.regex = None
+        self.regex_list = []
+        self.exclude_regex = None
+        self.time_range = None
+        self.field_values = None
 
         self.folding_type = None
         self.highlight_type = None
         
         
         self.regex_prompt_input_panel = None
+        self.fold_stats = None
+        self.profile = NULL_PROFILE
         
         SETTINGS.add_on_change(SETTING_OBSERVER_KEY, self.on_settings_change)
         self.on_settings_change()
@@ -164,20 +602,26 @@ class FileFilter(sublime_plugin.WindowCommand):
     def run(self):
         self.log.info("entered")
 
-        self.view = self.window.active_view()
+        self.load_view_state(self.window.active_view())
+        
+        self.set_folding_type(SETTINGS.get('default_folding_style', FoldingTypes.line.name))
+        self.set_highlight_type(SETTINGS.get('default_highlight_style', HighlightTypes.solid.name))
+
+
+    def load_view_state(self, view):
+        self.view = view
 
         view_settings = self.view.settings()
         self.regex = view_settings.get(VIEW_SETTINGS_CURRENT_REGEX, "")
+        self.regex_list = view_settings.get(VIEW_SETTINGS_CURRENT_REGEX_LIST, [])
+        self.exclude_regex = view_settings.get(VIEW_SETTINGS_CURRENT_EXCLUDE_REGEX, "")
+        self.time_range = view_settings.get(VIEW_SETTINGS_TIME_RANGE)
+        self.field_values = view_settings.get(VIEW_SETTINGS_FIELD_VALUES)
         self.folding_type = FoldingTypes[view_settings.get(VIEW_SETTINGS_CURRENT_FOLDING_TYPE, FoldingTypes.line.name)]
         self.highlight_type = HighlightTypes[view_settings.get(VIEW_SETTINGS_CURRENT_HIGHLIGHT_TYPE, HighlightTypes.solid.name)]
 
-        
-        self.set_folding_type(SETTINGS.get('default_folding_style', FoldingTypes.line.name))
-        self.set_highlight_type(SETTINGS.get('default_highlight_style', HighlightTypes.solid.name))
-
-
     def command_prompt_regex(self, regex=None):
-        self.log.debug(self.get_state(regex))
+        self.log_state(regex)
     
         def on_input_done(regex):
             self.set_regex(regex)
@@ -186,11 +630,10 @@ class FileFilter(sublime_plugin.WindowCommand):
         def on_input_change(regex):
             self.erase_status_bar()
             if  SETTINGS.get('expression_prompt', {}).get('refresh_on_change', False):
-                self.set_regex(regex)
-                self.apply()
+                self.live_apply(regex)
             
         self.regex_prompt_input_panel =  self.window.show_input_panel(
-            "Enter regex:"
+            "Enter regex or ?query:"
             , regex or self.regex or ""
             , on_input_done # on_done
             , on_input_change # on_change
@@ -198,7 +641,7 @@ class FileFilter(sublime_plugin.WindowCommand):
         )
 
     def command_quick_panel(self, regex):
-        self.log.debug(self.get_state(regex))
+        self.log_state(regex)
         
         if regex == ReservedRegexListOptions.CLEAR.value:
             self.clear()
@@ -214,10 +657,12 @@ class FileFilter(sublime_plugin.WindowCommand):
 
     def command_set_folding_type(self, folding_type):
         self.set_folding_type(folding_type)
-        self.apply()
+
+        if not self.refold():
+            self.apply()
 
     def set_folding_type(self, folding_type):
-        self.log.debug(self.get_state(folding_type))
+        self.log_state(folding_type)
 
         try:
             self.folding_type = FoldingTypes[folding_type] if isinstance(folding_type, str) else folding_type
@@ -228,11 +673,26 @@ class FileFilter(sublime_plugin.WindowCommand):
         self.view.settings().set(VIEW_SETTINGS_CURRENT_FOLDING_TYPE, self.folding_type.name)
 
     def command_set_highlight_type(self, highlight_type):
-        set_highlight_type(highlight_type)
-        self.apply()
+        self.set_highlight_type(highlight_type)
+
+        if not self.rehighlight():
+            self.apply()
+
+    def context_lines(self):
+        """``(before, after)`` lines shown around matches by ``FoldingTypes.context``."""
+
+        context_settings = SETTINGS.get('context_lines', {})
+        default = [context_settings.get('before', 2), context_settings.get('after', 2)]
+
+        before, after = self.view.settings().get(VIEW_SETTINGS_CONTEXT_LINES, default)
+
+        return max(int(before), 0), max(int(after), 0)
+
+    def set_context_lines(self, before, after):
+        self.view.settings().set(VIEW_SETTINGS_CONTEXT_LINES, [before, after])
 
     def set_highlight_type(self, highlight_type):
-        self.log.debug(self.get_state(highlight_type))
+        self.log_state(highlight_type)
         
         try:
             self.highlight_type = HighlightTypes[highlight_type] if isinstance(highlight_type, str) else highlight_type
@@ -243,7 +703,10 @@ class FileFilter(sublime_plugin.WindowCommand):
         self.view.settings().set(VIEW_SETTINGS_CURRENT_HIGHLIGHT_TYPE, self.highlight_type.name)
 
     def set_regex(self, regex = ""):
-        self.log.debug(self.get_state(regex))
+        self.log_state(regex)
+
+        self.regex_list = []
+        self.view.settings().erase(VIEW_SETTINGS_CURRENT_REGEX_LIST)
 
         if not regex:
             self.view.settings().erase(VIEW_SETTINGS_CURRENT_REGEX)
@@ -255,200 +718,1068 @@ class FileFilter(sublime_plugin.WindowCommand):
         if hasattr(self, 'input_panel') and self.input_panel is not None:
             self.input_panel.close()
 
+    def set_exclude_regex(self, regex=""):
+        """Lines matching ``regex`` are folded away whatever the include regex matches."""
 
-    def apply(self):
-        self.log.debug(self.get_state())
-        
-        if not self.regex:
-            return
+        self.log_state(regex)
 
-        self.clear()
+        self.exclude_regex = regex
 
-        self.view.settings().set(VIEW_SETTINGS_IS_FILTER_ACTIVE, True)
+        if regex:
+            self.view.settings().set(VIEW_SETTINGS_CURRENT_EXCLUDE_REGEX, regex)
+        else:
+            self.view.settings().erase(VIEW_SETTINGS_CURRENT_EXCLUDE_REGEX)
 
-        view_size = self.view.size()
+    def set_time_range(self, since="", until=""):
+        """Only lines timed from ``since`` to ``until`` are shown, whatever the regex matches. Blank bounds are open."""
 
-        matches_regions = self.view.find_all(self.regex)
-        total_matches_regions = len(matches_regions)
+        self.log_state((since, until))
 
-        status_bar_settings = SETTINGS.get('status_bar', {})
+        self.time_range = [since, until] if since or until else None
 
-        self.view.set_status(key=VIEW_SETTINGS_STATUS_BAR_REGEX, value=f'File Filter /{self.regex}/ ')
+        if self.time_range:
+            self.view.settings().set(VIEW_SETTINGS_TIME_RANGE, self.time_range)
+        else:
+            self.view.settings().erase(VIEW_SETTINGS_TIME_RANGE)
 
-        if status_bar_settings.get('show_current_folding_style', True):
-            self.view.set_status(key=VIEW_SETTINGS_STATUS_BAR_FOLDING_STYLE, value=f"Folding Style: '{self.folding_type.value}'")
+    def set_field_values(self, values=()):
+        """Only lines holding one of the field ``values`` (log levels by default) are shown, whatever the regex matches."""
 
-        if status_bar_settings.get('show_current_highlight_style', True):
-            self.view.set_status(key=VIEW_SETTINGS_STATUS_BAR_HIGHLIGHT_STYLE, value=f"Highlight Style: '{self.highlight_type.description}'")
+        self.log_state(values)
 
+        self.field_values = list(values) or None
 
-        if status_bar_settings.get('show_total_matches', True):
-            if(total_matches_regions == 0):
-                self.view.set_status(
-                    key=VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES,
-                    value= f' Total Matches {total_matches_regions}' if total_matches_regions > 0 else f"No Matches Regions with /{self.regex})/"
-                )
+        if self.field_values:
+            self.view.settings().set(VIEW_SETTINGS_FIELD_VALUES, self.field_values)
+        else:
+            self.view.settings().erase(VIEW_SETTINGS_FIELD_VALUES)
 
-        if self.folding_type is not FoldingTypes.highlight_only and total_matches_regions > 0:
+    def line_filtered(self):
+        """Whether an exclude regex, time range or field values restrict the lines shown on top of the regex."""
 
-            temp_fold_regions = [sublime.Region(0, 0)] + matches_regions + [sublime.Region(view_size, view_size)]
-            fold_regions = [ sublime.Region(prev.end(), curr.begin()) for prev, curr in zip(temp_fold_regions, temp_fold_regions[1:])]
-            
-            first_fold = fold_regions[0]
-            last_fold = fold_regions[-1]
-            
-            self.log.debug(fold_regions)
+        return bool(self.exclude_regex or self.time_range or self.field_values)
 
-            # fold lines with no match
-            for fold in fold_regions:
+    def line_filter(self):
+        """The exclude regex, time range and field values restricting the lines shown."""
 
-                self.log.debug(f'.current fold: {fold}.')
-                if fold == first_fold :
-                    self.log.debug(f'is first fold')
-                if fold == last_fold :
-                    self.log.debug(f'is last fold')
+        return (self.exclude_regex, self.time_range, self.field_values)
 
-                if fold.size() <= 0 or fold.begin() >= fold.end():
-                    self.log.debug(f'Invalidfold size. continue..')
-                    continue
+    def set_regex_list(self, patterns):
+        """Filter with several patterns at once, combined into a single regex scanned in one pass."""
 
-                a = self.view.full_line(fold.begin())
-                b = self.view.full_line(fold.end())
+        self.log_state(patterns)
 
-                self.log.debug(f'line a: {a}, line b:{b}')
+        for pattern in patterns:
+            if not self.validate_regex(pattern):
+                return False
 
-                if a == b:
-                    self.log.debug(f'a == b. same line')
-                    first = sublime.Region(fold.begin(), fold.begin())
-                    middle = fold
-                    last = sublime.Region(fold.end(),fold.end()) 
-                else:
-                    first = sublime.Region(fold.begin(), a.end())
-                    middle = sublime.Region(a.end(),b.begin())
-                    last = sublime.Region(b.begin(),fold.end())  
+            if is_query(pattern):
+                self.view.set_status(key=VIEW_SETTINGS_STATUS_BAR_REGEX, value=f"File Filter {pattern} queries cannot be combined")
+                return False
 
-                self.log.debug(f'first {first}, middle {middle}, last {last}')
+        self.set_regex(combine_patterns(patterns) if patterns else "")
 
-                if self.folding_type == FoldingTypes.match_only:
+        self.regex_list = list(patterns)
+        self.view.settings().set(VIEW_SETTINGS_CURRENT_REGEX_LIST, self.regex_list)
 
-                    if fold is first_fold:
-                        self.fold_span([first, middle], remove_last_char=True)
-                        self.fold_span(last)
-                    elif a == b:
-                        self.fold_span([middle], remove_last_char=False)
-                    else:
-                        self.fold_span([first,middle], remove_last_char=True)
-                        self.fold_span(last)
+        return True
 
-                elif self.folding_type is FoldingTypes.line:
 
-                    if fold is first_fold:
-                        self.fold_span([first, middle], remove_last_char=True)
-                    if fold is last_fold and a!=b:
-                        self.fold_span([middle, last])
-                    elif a != b:
-                        middle.a = middle.a - 1
-                        self.fold_span([middle], remove_last_char=True)
+    def apply(self):
+        self.log_state()
+        
+        if not self.regex and not self.line_filtered():
+            return
 
+        # a pending live scan must not overwrite this result
+        SCAN_GENERATIONS.cancel(self.view.id())
 
-                elif self.folding_type is FoldingTypes.before_only:
+        if self.regex and not self.validate_regex(self.regex):
+            return
 
-                    if fold is first_fold:
-                        self.fold_span([first, last], remove_last_char=False)
-                    elif a != b:
-                        self.fold_span([middle, last], remove_last_char=False)
-                    else:
-                        self.fold_span([last], remove_last_char=False)
+        if self.exclude_regex and not self.validate_regex(self.exclude_regex):
+            return
 
-                elif self.folding_type is FoldingTypes.after_only:
+        if self.line_filtered() or is_query(self.regex):
+            if self.scans_in_background():
+                self.apply_lines_in_background()
+                return
 
-                    if fold is last_fold:
-                        self.fold_span(fold)
-                    else:
-                        self.fold_span([first, middle], remove_last_char=True)
+        # cached matches are applied right away, whatever the buffer size
+        elif self.scans_in_background() \
+                and not MATCHES.has(self.view.buffer_id(), self.view.change_count(), self.regex) \
+                and not TextSnapshot(self.view).on_disk(self.regex):
+            self.apply_in_background()
+            return
 
-        if self.highlight_type is not HighlightTypes.none:
-            self.view.add_regions(
-                VIEW_SETTINGS_HIGHLIGHTED_REGIONS  # Key for the highlighted regions
-                , matches_regions  # List of regions to highlight
-                , 'highlight'  # Scope name (use a predefined or custom scope)
-                , ''  # No icon
-                , self.highlight_type.value
-            )
+        with self.profiled('apply'):
+            self.apply_scan(self.scan(self.regex))
 
+    def scans_in_background(self):
+        """Whether the view is large enough (``background_scan.min_size``) to be scanned off the main thread."""
 
-    def clear(self, unfold_regions=True, remove_highlights=True, center_viewport_on_carret=False):
+        return self.view.size() >= SETTINGS.get('background_scan', {}).get('min_size', 5000000)
 
-        self.log.debug(self.get_state())
+    def reapply(self):
+        """
+        Apply the filter after one of its settings changed: only the folds and
+        highlights that differ from the applied scan are redrawn, if there is one.
+        """
 
-        if unfold_regions == True:
-            self.view.unfold(sublime.Region(0, self.view.size()))
-            
-        if remove_highlights == True:
-            self.view.erase_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS)
+        if not self.regex and not self.line_filtered():
+            self.clear()
+        elif self.refold():
+            self.rehighlight()
+        else:
+            self.apply()
 
-        #center view at coursor position
-        if center_viewport_on_carret == True:
-            self.view.show_at_center(sublime.Region(0,0) if len(self.view.sel()) == 0 else self.view.sel()[0].begin(), False)
-        
-        self.erase_status_bar()
-        self.view.settings().erase(VIEW_SETTINGS_IS_FILTER_ACTIVE)
+    def after_indexing(self, current_index, build_index, callback):
+        """
+        Run ``callback`` once the view's index is built: right away when
+        ``current_index(view)`` is up to date, else after ``build_index(snapshot)``
+        ran on the async thread.
+        """
 
-    def fold_span(self, source, remove_last_char=False):
-        
-        if type(source) is list:
-            a = min([ r.a for r in source])
-            b = max([ r.b for r in source]) - (1 if remove_last_char else 0)
-        else:
-            a = source.a
-            b = source.b - (1 if remove_last_char else 0)
+        view = self.view
 
-        if b <= a:
-            self.log.debug(f"from {source} NOT folding {(a, b)}, remove_last_char: {remove_last_char}")
-            return False
-        
-        self.log.debug(f"from {source} folding {(a, b)}, remove_last_char: {remove_last_char}")
+        if current_index(view) is not None:
+            callback()
+            return
 
-        return self.view.fold(sublime.Region(a, b))
+        def on_index_built():
+            if view.is_valid():
+                callback()
 
+        def run_build():
+            build_index(TextSnapshot(view))
+            sublime.set_timeout(on_index_built, 0)
 
-    def get_state(self, args=None):
-        pad = 0
-        args = str("" if not args else args)
-        folding_type = str(self.folding_type or "") if not self.folding_type else self.folding_type.name
-        highlight_type = str(self.highlight_type or "") if not self.highlight_type else self.highlight_type.name
-        regex = '\"\"' if self.regex is not None and len(self.regex) == 0 else self.regex
+        sublime.status_message("File Filter: indexing...")
+        sublime.set_timeout_async(run_build, 0)
 
-        return f'args: {args:^{pad}}, folding_type: {folding_type:^{pad}}, highlight_type: {highlight_type:^{pad}}, regex: {regex:^{pad}}'
+    @contextmanager
+    def profiled(self, kind, profile=None, finish=True):
+        """
+        Record the phases and editor API calls of the block in ``profile`` (a new
+        run of ``kind`` by default) and add it to the view history on ``finish``.
+        Does nothing while profiling is disabled.
+        """
 
+        if self.profile.enabled:
+            # nested in a profiled block, which already records this one
+            yield self.profile
+            return
 
-    def on_settings_change(self):
-        self.log.debug(f"Settings changed")
-        
-        self.REGEX_OPTIONS_LIST = [[r.description, r.value] for r in ReservedRegexListOptions.all_members()] + SETTINGS.get('regex_list', [])
-        self.log.info(f"Settings changed")
+        if profile is None:
+            profile = RunProfile(kind, self.describe_patterns(self.regex)) if PROFILING_ENABLED else NULL_PROFILE
 
-    def set_status_bar(self):
+        if not profile.enabled:
+            yield profile
+            return
 
-        self.view.set_status(key=VIEW_SETTINGS_STATUS_BAR_REGEX, value=f"File Filter: /{self.regex}/")
+        view = self.view
+        self.profile = profile
+        self.view = CountingProxy(view, profile.api_calls)
 
-        if status_bar_settings.get('show_current_folding_style', True):
-            self.view.set_status(key=VIEW_SETTINGS_STATUS_BAR_FOLDING_STYLE, value=f"Folding Style: '{self.folding_type.value}'")
+        try:
+            yield profile
+        finally:
+            self.view = view
+            self.profile = NULL_PROFILE
 
-        if status_bar_settings.get('show_current_highlight_style', True):
-            self.view.set_status(key=VIEW_SETTINGS_STATUS_BAR_HIGHLIGHT_STYLE, value=f"Highlight Style: '{self.highlight_type.description}'")
+            if finish:
+                profile.finish()
+                PROFILES.add(view.id(), profile)
 
+    def live_apply(self, regex):
+        """
+        Debounced filtering while typing: the scan runs on the async thread after
+        ``expression_prompt.refresh_delay_ms`` and only the newest one is applied.
+        """
 
-        if status_bar_settings.get('show_total_matches', True):
-            if(total_matches_regions == 0):
-                self.view.set_status(
-                    key=VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES,
-                    value= f' Total Matches {total_matches_regions}' if total_matches_regions > 0 else f"No Matches Regions with /{self.regex})/"
-                )
+        view_id = self.view.id()
+        generation = SCAN_GENERATIONS.next(view_id)
 
-    def erase_status_bar(self):
-        
-        self.view.erase_status(key=VIEW_SETTINGS_STATUS_BAR_REGEX)
+        if not regex:
+            self.clear()
+            return
+
+        if not self.validate_regex(regex):
+            return
+
+        profile = RunProfile('live', self.describe_patterns(regex)) if PROFILING_ENABLED else NULL_PROFILE
+
+        def on_scan_done(scan):
+            if SCAN_GENERATIONS.is_current(view_id, generation):
+                self.set_regex(scan.regex)
+
+                with self.profiled('live', profile):
+                    self.apply_scan(scan)
+
+        def run_scan():
+            if not SCAN_GENERATIONS.is_current(view_id, generation):
+                return
+
+            scan = self.scan(regex, profile)
+
+            if SCAN_GENERATIONS.is_current(view_id, generation):
+                sublime.set_timeout(lambda: on_scan_done(scan), 0)
+
+        delay = SETTINGS.get('expression_prompt', {}).get('refresh_delay_ms', 250)
+        sublime.set_timeout_async(run_scan, delay)
+
+    def validate_regex(self, regex):
+        """Compile ``regex`` (or a ``?`` query) through the pattern cache; errors go to the status bar."""
+
+        error = pattern_error(regex)
+
+        if error is not None:
+            self.clear()
+            message = f"{regex} invalid query" if is_query(regex) else f"/{regex}/ invalid regex"
+            self.view.set_status(key=VIEW_SETTINGS_STATUS_BAR_REGEX, value=f"File Filter {message}: {error}")
+            return False
+
+        return True
+
+    def scan(self, regex, profile=None):
+        """
+        Find the matches of ``regex`` and plan the folds. Does not touch the view state.
+        Phases are recorded in ``profile``, the profile of the current run by default.
+        """
+
+        profile = profile or self.profile
+        snapshot = TextSnapshot(self.view, profile)
+
+        if self.line_filtered() or is_query(regex):
+            return self.scan_lines(regex, snapshot, profile)
+
+        matches = snapshot.matches(regex)
+        line_index = snapshot.line_index()
+        fold_plan = []
+
+        if self.folding_type is not FoldingTypes.highlight_only and matches:
+            context = self.context_lines()
+            plan_key = f"{self.folding_type.name}:{context[0]}:{context[1]}" if self.folding_type is FoldingTypes.context else self.folding_type.name
+            fold_plan = snapshot.fold_plan(regex, plan_key)
+
+            if fold_plan is None:
+                with profile.phase('plan'):
+                    fold_plan = self.plan(matches, None, line_index)
+
+                snapshot.store(regex, matches, plan_key, fold_plan)
+
+        # the last line start is where the last complete line ends
+        return ScanResult(regex, matches, fold_plan, line_index.starts[-1], line_filter=self.line_filter())
+
+    def scan_lines(self, regex, snapshot, profile=NULL_PROFILE):
+        """
+        Exclude, query, time range and field value modes: show the lines of
+        ``select_lines()``, folded line by line.
+        """
+
+        intervals, matches = self.select_lines(snapshot, regex, self.exclude_regex, self.time_range, self.field_values)
+        line_index = snapshot.line_index()
+
+        with profile.phase('plan'):
+            fold_plan = self.plan(matches, intervals, line_index)
+
+        return ScanResult(regex, matches, fold_plan, line_index.starts[-1], rows=intervals, line_filter=self.line_filter())
+
+    def plan(self, matches, rows, line_index):
+        """
+        Fold plan of the current folding type: around ``matches``, or showing the
+        ``rows`` intervals of a line filtered scan when they are given.
+        """
+
+        if self.folding_type is FoldingTypes.highlight_only:
+            return []
+
+        if rows is None:
+            return plan_folds(matches, line_index.starts, line_index.size, self.folding_type, self.context_lines()) if matches else []
+
+        if self.folding_type is FoldingTypes.context:
+            rows = expand_rows(rows, *self.context_lines(), len(line_index))
+
+        return plan_row_folds(rows, line_index.starts, line_index.size) if rows else []
+
+    def select_lines(self, snapshot, regex, exclude_regex, time_range=None, field_values=None, cancelled=None):
+        """
+        Row intervals of the lines matching ``regex`` (every line when empty) or the
+        ``?`` query, holding one of ``field_values``, in the ``time_range`` and
+        matching no ``exclude_regex``, and the include matches on those rows.
+        ``None`` once ``cancelled()`` returns ``True`` while matching ``regex``.
+        """
+
+        include_rows = None
+
+        if is_query(regex):
+            include_rows, include_spans = snapshot.query_rows(regex)
+        else:
+            include_spans = snapshot.matches(regex, cancelled) if regex else None
+
+            if regex and include_spans is None:
+                return None
+
+        if field_values:
+            include_rows, include_spans = self.clip_to_field_values(snapshot, field_values, include_rows, include_spans)
+
+        if time_range:
+            include_rows, include_spans = self.clip_to_time_range(snapshot, time_range, include_rows, include_spans)
+
+        line_index = snapshot.line_index()
+
+        # the included lines are tested against the exclude regex in the same pass over their rows
+        if exclude_regex and include_spans is not None:
+            if include_rows is None:
+                include_rows = rows_of_spans(include_spans, line_index.starts)
+
+            with snapshot.profile.phase('exclude'):
+                return exclude_rows(snapshot.text, line_index.starts, include_rows, include_spans, PATTERNS.compile(exclude_regex).search)
+
+        exclude_spans = snapshot.matches(exclude_regex) if exclude_regex else []
+
+        with snapshot.profile.phase('plan'):
+            return select_rows(include_spans, exclude_spans, line_index.starts, include_rows)
+
+    def clip_to_field_values(self, snapshot, field_values, include_rows, include_spans):
+        """
+        ``include_rows`` and ``include_spans`` cut to the lines holding one of
+        ``field_values``: a merge of their row intervals in the field index.
+        """
+
+        index = snapshot.field_index()
+        line_index = snapshot.line_index()
+
+        with snapshot.profile.phase('field_values'):
+            field_rows = index.rows_of(field_values)
+
+            # without a regex the field values themselves are highlighted
+            if include_rows is None and include_spans is None:
+                return field_rows, index.spans_of(field_values)
+
+            if include_rows is not None:
+                include_rows = intersect_rows(include_rows, field_rows, len(line_index))
+
+            include_spans = spans_in_rows(include_spans, field_rows if include_rows is None else include_rows, line_index.starts)
+
+        return include_rows, include_spans
+
+    def clip_to_time_range(self, snapshot, time_range, include_rows, include_spans):
+        """
+        ``include_rows`` and ``include_spans`` cut to the lines of the ``(since, until)``
+        ``time_range``: two binary searches in the time index, then in the rows and spans.
+        """
+
+        window = snapshot.time_window(*time_range)
+        line_index = snapshot.line_index()
+
+        if window is None:
+            return [], []
+
+        with snapshot.profile.phase('time_window'):
+            begin, end = window
+
+            if include_spans is not None:
+                include_spans = spans_between(include_spans, begin, end)
+
+            # rows of the regex matches are found from the cut spans
+            if include_rows is not None or include_spans is None:
+                include_rows = clip_rows(include_rows, line_index.row_of(begin), line_index.row_of(end - 1))
+
+        return include_rows, include_spans
+
+    def extract(self, before=0, after=0):
+        """
+        Copy the lines shown by the filter, with ``before`` and ``after`` lines of
+        context, to a new scratch view instead of folding the source view. The
+        matching runs on the async thread and the text is appended in chunks of
+        ``extract.chunk_size`` characters, recording the source offset of every
+        output line in ``EXTRACTS``.
+        """
+
+        self.log_state((before, after))
+
+        if not self.regex and not self.line_filtered():
+            sublime.status_message("File Filter: no filter to extract")
+            return
+
+        if self.regex and not self.validate_regex(self.regex):
+            return
+
+        if self.exclude_regex and not self.validate_regex(self.exclude_regex):
+            return
+
+        source = self.view
+        regex, exclude_regex, time_range, field_values = self.regex, self.exclude_regex, self.time_range, self.field_values
+        profile = RunProfile('extract', self.describe_patterns(regex)) if PROFILING_ENABLED else NULL_PROFILE
+
+        output = self.window.new_file()
+        output.set_scratch(True)
+        output.set_read_only(True)
+        output.set_name(f"Filter: {self.describe_patterns(regex)}")
+        output.settings().set(VIEW_SETTINGS_EXTRACT_SOURCE, source.id())
+        EXTRACTS[output.id()] = array('q')
+
+        chunk_size = SETTINGS.get('extract', {}).get('chunk_size', 1048576)
+        separator = SEPARATOR if before or after else None
+
+        def append_next(chunks):
+            sources = EXTRACTS.get(output.id())
+
+            if sources is None or not output.is_valid():
+                return
+
+            chunk = next(chunks, None)
+
+            if chunk is None:
+                profile.count('lines', len(sources))
+                profile.finish()
+                if profile.enabled:
+                    PROFILES.add(source.id(), profile)
+                sublime.status_message(f"File Filter: extracted {len(sources)} lines")
+                return
+
+            with profile.phase('append'):
+                output.run_command('append', {'characters': chunk[0], 'force': True, 'scroll_to_end': False})
+                sources.extend(chunk[1])
+
+            sublime.set_timeout(lambda: append_next(chunks), 0)
+
+        def run_extract():
+            snapshot = TextSnapshot(source, profile)
+            intervals, starts = self.extract_rows(snapshot, regex, exclude_regex, before, after, time_range, field_values)
+
+            # cut before leaving the async thread, edits would shift the line starts
+            with profile.phase('extract'):
+                chunks = iter(list(extract_chunks(snapshot.text, intervals, starts, chunk_size, separator)))
+
+            sublime.set_timeout(lambda: append_next(chunks), 0)
+
+        sublime.set_timeout_async(run_extract, 0)
+
+    def extract_rows(self, snapshot, regex, exclude_regex, before, after, time_range=None, field_values=None):
+        """Row intervals of ``snapshot`` shown by the filter, widened by the context lines, and the line starts."""
+
+        line_index = snapshot.line_index()
+
+        if exclude_regex or time_range or field_values or is_query(regex):
+            intervals, _ = self.select_lines(snapshot, regex, exclude_regex, time_range, field_values)
+
+            with snapshot.profile.phase('plan'):
+                intervals = expand_rows(intervals, before, after, len(line_index)) if before or after else intervals
+        else:
+            matches = snapshot.matches(regex)
+
+            with snapshot.profile.phase('plan'):
+                intervals = rows_of_spans(matches, line_index.starts, before, after)
+
+        return intervals, line_index.starts
+
+    def apply_scan(self, scan):
+        """Execute ``scan`` on the view: status bar, folds and highlights."""
+
+        profile = self.profile
+
+        with profile.phase('clear'):
+            self.clear()
+
+        self.view.settings().set(VIEW_SETTINGS_IS_FILTER_ACTIVE, True)
+
+        with profile.phase('status_bar'):
+            self.set_status_bar(scan.regex, len(scan.matches))
+
+        with profile.phase('fold'):
+            folds = self.fold(scan.fold_plan) if scan.fold_plan else []
+
+        with profile.phase('highlight'):
+            self.highlight(scan.matches)
+
+        profile.count('matches', len(scan.matches))
+        profile.count('folds', len(folds))
+
+        APPLIED_SCANS[self.view.id()] = scan._replace(fold_plan=folds)
+        EDITED_FROM.pop(self.view.buffer_id(), None)
+
+    def reusable_scan(self):
+        """Scan applied to the view if it is complete and the buffer was not edited since, else ``None``."""
+
+        applied = APPLIED_SCANS.get(self.view.id())
+
+        if applied is None or applied.regex != self.regex or self.view.id() in BACKGROUND_SCANS or self.view.buffer_id() in EDITED_FROM:
+            return None
+
+        # a scan stopped by a background_scan limit is applied again, under the same limits
+        if applied.stopped:
+            return None
+
+        return applied
+
+    def refold(self):
+        """
+        Move the applied scan to the current folding type: the folds are planned
+        from its matches or rows, and only the folds that differ from the applied
+        ones are unfolded or folded. ``False`` when there is no applied scan to
+        start from.
+        """
+
+        applied = self.reusable_scan()
+
+        if applied is None:
+            return False
+
+        line_filter_changed = applied.line_filter != self.line_filter()
+
+        if line_filter_changed and self.scans_in_background():
+            # the lines shown changed with the line filter: they are selected again, off the main thread
+            self.apply_lines_in_background(refresh=True)
+            return True
+
+        with self.profiled('refold') as profile:
+            if line_filter_changed:
+                scan = self.scan(applied.regex)
+                fold_plan = scan.fold_plan
+            else:
+                # planned from the applied matches or rows: the text is not matched again
+                scan = applied
+
+                with profile.phase('plan'):
+                    fold_plan = self.plan(applied.matches, applied.rows, get_line_index(self.view))
+
+            with profile.phase('fold'):
+                folds = self.refold_spans(applied.fold_plan, fold_plan)
+
+            with profile.phase('status_bar'):
+                self.set_status_bar(scan.regex, len(scan.matches))
+
+            profile.count('folds', len(folds))
+
+            APPLIED_SCANS[self.view.id()] = scan._replace(fold_plan=folds)
+
+        return True
+
+    def rehighlight(self):
+        """
+        Redraw the highlights of the applied scan with the current highlight type,
+        leaving the folds alone. ``False`` when there is no applied scan.
+        """
+
+        applied = self.reusable_scan()
+
+        if applied is None:
+            return False
+
+        with self.profiled('rehighlight') as profile:
+            with profile.phase('highlight'):
+                self.erase_highlights()
+                self.highlight(applied.matches)
+
+            with profile.phase('status_bar'):
+                self.set_status_bar(applied.regex, len(applied.matches))
+
+        return True
+
+    def apply_appended(self):
+        """
+        Follow mode: scan only the text after the last fully scanned line and
+        extend the folds and highlights of the applied scan.
+        """
+
+        self.log_state()
+
+        if self.view.id() in BACKGROUND_SCANS:
+            # appended text is picked up once the running scan is applied
+            return
+
+        applied = APPLIED_SCANS.get(self.view.id())
+        edited_from = EDITED_FROM.pop(self.view.buffer_id(), None)
+
+        if applied is None or applied.regex != self.regex or (edited_from is not None and edited_from < applied.scanned_to):
+            self.apply()
+            return
+
+        if self.line_filtered() or is_query(self.regex):
+            # the lines are selected again off the main thread, the applied folds stay until then
+            self.apply_lines_in_background(refresh=True)
+            return
+
+        if applied.stopped:
+            # a stopped scan is not extended past its limit
+            return
+
+        with self.profiled('follow') as profile:
+            scan_from = applied.scanned_to
+
+            with profile.phase('substr'):
+                size = self.view.size()
+                text = self.view.substr(sublime.Region(scan_from, size))
+
+            # the unterminated last line is scanned again, drop what it matched before
+            matches = applied.matches
+            while matches and matches[-1][0] >= scan_from:
+                matches.pop()
+
+            anchor = matches[-1] if matches else None
+
+            with profile.phase('match'):
+                new_matches = find_spans(PATTERNS.compile(self.regex), text, offset=scan_from)
+
+            matches.extend(new_matches)
+
+            with profile.phase('fold'):
+                folds = self.extend_folds(applied.fold_plan, anchor, new_matches, size)
+
+            if new_matches:
+                with profile.phase('highlight'):
+                    self.highlight_appended(matches, new_matches)
+                    self.set_status_bar(self.regex, len(matches))
+
+            profile.count('matches', len(new_matches))
+
+            APPLIED_SCANS[self.view.id()] = applied._replace(matches=matches, fold_plan=folds, scanned_to=scan_from + text.rfind('\n') + 1)
+
+    def apply_in_background(self):
+        """
+        Scan a large buffer on the async thread in line aligned chunks. Folds are
+        applied after every chunk, progress is shown in the status bar and the scan
+        stops when cancelled (clear) or when ``background_scan`` limits are hit.
+        """
+
+        view = self.view
+        view_id = view.id()
+        regex = self.regex
+        generation = SCAN_GENERATIONS.next(view_id)
+
+        scan_settings = SETTINGS.get('background_scan', {})
+        chunk_size = scan_settings.get('chunk_size', 1000000)
+        max_matches = scan_settings.get('max_matches', 0)
+        max_seconds = scan_settings.get('max_seconds', 0)
+
+        # the run spans several main thread blocks: it is recorded once the scan completes
+        profile = RunProfile('background', self.describe_patterns(regex)) if PROFILING_ENABLED else NULL_PROFILE
+        snapshot = TextSnapshot(view, profile)
+
+        with self.profiled('background', profile, finish=False):
+            with profile.phase('clear'):
+                self.clear()
+
+            self.view.settings().set(VIEW_SETTINGS_IS_FILTER_ACTIVE, True)
+            self.set_status_bar(regex, 0, progress=0)
+
+        BACKGROUND_SCANS.add(view_id)
+
+        line_filter = self.line_filter()
+        matches = []
+        folds = []
+
+        def on_chunk(new_matches, end, progress, scanned_to, stopped):
+            nonlocal folds
+
+            if not SCAN_GENERATIONS.is_current(view_id, generation):
+                return
+
+            self.load_view_state(view)
+
+            with self.profiled('background', profile, finish=scanned_to is not None):
+                anchor = matches[-1] if matches else None
+                matches.extend(new_matches)
+
+                with profile.phase('fold'):
+                    folds = self.extend_folds(folds, anchor, new_matches, end)
+
+                if scanned_to is None:
+                    self.set_status_bar(regex, len(matches), progress=progress)
+                    return
+
+                BACKGROUND_SCANS.discard(view_id)
+
+                self.set_status_bar(regex, len(matches), stopped=stopped)
+
+                with profile.phase('highlight'):
+                    self.highlight(matches)
+
+                profile.count('matches', len(matches))
+                profile.count('folds', len(folds))
+
+                if not stopped and snapshot.cacheable:
+                    MATCHES.put(snapshot.buffer_id, snapshot.change_count, regex, matches)
+                    snapshot.store(regex, matches)
+
+                APPLIED_SCANS[view_id] = ScanResult(regex, matches, folds, scanned_to, stopped, line_filter=line_filter)
+                EDITED_FROM.pop(view.buffer_id(), None)
+
+        def run_scan():
+            text = snapshot.text
+            compiled = PATTERNS.compile(regex)
+
+            with profile.phase('line_index'):
+                get_line_index(view, text)
+
+            started = time.perf_counter()
+            total_matches = 0
+
+            for begin, end in line_chunks(text, chunk_size):
+
+                if not SCAN_GENERATIONS.is_current(view_id, generation):
+                    return
+
+                with profile.phase('match'):
+                    chunk_matches = find_spans(compiled, text, begin, end)
+
+                stopped = None
+
+                if max_matches and total_matches + len(chunk_matches) >= max_matches:
+                    chunk_matches = chunk_matches[:max_matches - total_matches]
+                    stopped = f"{max_matches} matches limit"
+
+                    # the text after the line of the last kept match is not scanned
+                    newline = text.find('\n', max(chunk_matches[-1][1] - 1, chunk_matches[-1][0]))
+                    end = len(text) if newline < 0 else newline + 1
+                elif max_seconds and time.perf_counter() - started > max_seconds:
+                    stopped = f"{max_seconds}s time limit"
+
+                total_matches += len(chunk_matches)
+
+                if stopped or end == len(text):
+                    scanned_to = end if stopped and end < len(text) else text.rfind('\n') + 1
+                    sublime.set_timeout(partial(on_chunk, chunk_matches, end, 100, scanned_to, stopped), 0)
+                    return
+
+                sublime.set_timeout(partial(on_chunk, chunk_matches, end, end * 100 // len(text), None, None), 0)
+
+        sublime.set_timeout_async(run_scan, 0)
+
+    def apply_lines_in_background(self, refresh=False):
+        """
+        Select the lines of a line filtered or query scan on the async thread, then
+        apply it. Escape (clear) or a newer scan drops it. With ``refresh`` the
+        applied scan stays in place meanwhile, and only the folds that differ from
+        it are redrawn.
+        """
+
+        view = self.view
+        view_id = view.id()
+        regex, exclude_regex, time_range, field_values = self.regex, self.exclude_regex, self.time_range, self.field_values
+        line_filter = self.line_filter()
+        generation = SCAN_GENERATIONS.next(view_id)
+        is_current = lambda: SCAN_GENERATIONS.is_current(view_id, generation)
+
+        # the run spans several main thread blocks: it is recorded once the scan is applied
+        profile = RunProfile('background', self.describe_patterns(regex)) if PROFILING_ENABLED else NULL_PROFILE
+        snapshot = TextSnapshot(view, profile)
+
+        if not refresh or view_id not in APPLIED_SCANS:
+            refresh = False
+
+            with self.profiled('background', profile, finish=False):
+                with profile.phase('clear'):
+                    self.clear()
+
+                self.view.settings().set(VIEW_SETTINGS_IS_FILTER_ACTIVE, True)
+                self.set_status_bar(regex, 0, progress=0)
+
+        BACKGROUND_SCANS.add(view_id)
+
+        def on_selected(intervals, matches, line_index):
+            if not is_current() or not view.is_valid():
+                return
+
+            BACKGROUND_SCANS.discard(view_id)
+            self.load_view_state(view)
+
+            with self.profiled('background', profile):
+                with profile.phase('plan'):
+                    scan = ScanResult(regex, matches, self.plan(matches, intervals, line_index), line_index.starts[-1], rows=intervals, line_filter=line_filter)
+
+                applied = APPLIED_SCANS.get(view_id) if refresh else None
+
+                if applied is None:
+                    self.apply_scan(scan)
+                    return
+
+                with profile.phase('fold'):
+                    folds = self.refold_spans(applied.fold_plan, scan.fold_plan)
+
+                with profile.phase('highlight'):
+                    self.erase_highlights()
+                    self.highlight(scan.matches)
+
+                with profile.phase('status_bar'):
+                    self.set_status_bar(regex, len(scan.matches))
+
+                profile.count('matches', len(scan.matches))
+                profile.count('folds', len(folds))
+
+                APPLIED_SCANS[view_id] = scan._replace(fold_plan=folds)
+                EDITED_FROM.pop(view.buffer_id(), None)
+
+        def run_select():
+            if not is_current():
+                return
+
+            selected = self.select_lines(snapshot, regex, exclude_regex, time_range, field_values, cancelled=lambda: not is_current())
+
+            if selected is not None and is_current():
+                sublime.set_timeout(partial(on_selected, *selected, snapshot.line_index()), 0)
+
+        sublime.set_timeout_async(run_select, 0)
+
+    def extend_folds(self, folds, anchor, new_matches, end):
+        """
+        Replace the ``folds`` after ``anchor`` (the last match already folded around)
+        with the plan for ``new_matches``, ``end`` being where the scanned text stops.
+        ``folds`` is extended in place and returned.
+        """
+
+        # folds up to the last already known match stay as they are: folds are
+        # sorted, only the tail planned around the anchor is dropped, in place
+        folds_from = anchor[1] if anchor else 0
+
+        while folds and folds[-1][0] >= folds_from:
+            folds.pop()
+
+        if self.folding_type is FoldingTypes.highlight_only or not (anchor or new_matches):
+            return folds
+
+        line_index = get_line_index(self.view)
+
+        with self.profile.phase('plan'):
+            tail_plan = plan_folds(([anchor] if anchor else []) + new_matches, line_index.starts, end, self.folding_type, self.context_lines())
+
+        self.view.unfold(sublime.Region(folds_from, end))
+
+        folds.extend(self.fold([span for span in tail_plan if span[0] >= folds_from]))
+
+        return folds
+
+    def highlight(self, matches):
+        if self.highlight_type is HighlightTypes.none:
+            return
+
+        viewport_settings = SETTINGS.get('viewport_highlight', {})
+        min_matches = viewport_settings.get('min_matches', 200000)
+
+        if min_matches and len(matches) >= min_matches:
+            HIGHLIGHTED_REGIONS.pop(self.view.id(), None)
+            self.highlight_viewport(matches)
+            watch_viewport(self.view, viewport_settings.get('refresh_delay_ms', 100))
+            return
+
+        if VIEWPORT_WINDOWS.pop(self.view.id(), None) is not None:
+            VIEWPORT_GENERATIONS.cancel(self.view.id())
+
+        HIGHLIGHTED_REGIONS[self.view.id()] = self.draw_highlights(matches)
+
+    def highlight_appended(self, matches, new_matches):
+        """
+        Follow mode: highlight ``new_matches``, appended to ``matches``, without
+        building the regions of the matches highlighted before again.
+        """
+
+        drawn = HIGHLIGHTED_REGIONS.get(self.view.id())
+        min_matches = SETTINGS.get('viewport_highlight', {}).get('min_matches', 200000)
+
+        if drawn is None or self.highlight_type is HighlightTypes.none or (min_matches and len(matches) >= min_matches):
+            self.highlight(matches)
+            return
+
+        self.draw_highlights(new_matches, drawn)
+
+    def highlight_viewport(self, matches):
+        """Highlight only the ``matches`` of the visible lines, plus ``viewport_highlight.margin_lines``."""
+
+        margin = SETTINGS.get('viewport_highlight', {}).get('margin_lines', 200)
+        line_index = get_line_index(self.view)
+        visible = self.view.visible_region()
+
+        first_row = max(line_index.row_of(visible.begin()) - margin, 0)
+        last_row = line_index.row_of(visible.end()) + margin + 1
+
+        begin = line_index.starts[first_row]
+        end = line_index.starts[last_row] if last_row < len(line_index) else line_index.size
+
+        # matches are sorted: (begin,) sorts before every match starting at begin
+        lo = bisect_left(matches, (begin,))
+        hi = bisect_left(matches, (end,), lo)
+
+        VIEWPORT_WINDOWS[self.view.id()] = (begin, end)
+        self.draw_highlights(matches[lo:hi])
+
+    def draw_highlights(self, matches, drawn=None):
+        """
+        Draw the regions of ``matches`` after the regions ``drawn`` before, by
+        region key, and return the regions of every key.
+        """
+
+        drawn = {} if drawn is None else drawn
+
+        if self.regex_list:
+            self.highlight_per_pattern(matches, drawn)
+            return drawn
+
+        regions = drawn.setdefault(VIEW_SETTINGS_HIGHLIGHTED_REGIONS, [])
+        regions.extend(sublime.Region(m[0], m[1]) for m in matches)
+
+        self.view.add_regions(
+            VIEW_SETTINGS_HIGHLIGHTED_REGIONS  # Key for the highlighted regions
+            , regions  # List of regions to highlight
+            , 'highlight'  # Scope name (use a predefined or custom scope)
+            , ''  # No icon
+            , self.highlight_type.value
+        )
+
+        return drawn
+
+    def highlight_per_pattern(self, matches, drawn):
+        # matches of a combined pattern carry the index of the pattern as third item
+        keys = [f"{VIEW_SETTINGS_HIGHLIGHTED_REGIONS}.{idx}" for idx in range(len(self.regex_list))]
+        new_regions = [[] for _ in keys]
+        for a, b, idx in matches:
+            new_regions[idx].append(sublime.Region(a, b))
+
+        scopes = SETTINGS.get('multi_filter_scopes', MULTI_HIGHLIGHT_SCOPES) or ['highlight']
+
+        for idx, key in enumerate(keys):
+            # keys drawn before without new regions are left as they are
+            if key in drawn and not new_regions[idx]:
+                continue
+
+            pattern_regions = drawn.setdefault(key, [])
+            pattern_regions.extend(new_regions[idx])
+
+            self.view.add_regions(
+                key
+                , pattern_regions
+                , scopes[idx % len(scopes)]
+                , ''
+                , self.highlight_type.value
+            )
+
+        MULTI_HIGHLIGHT_KEYS[self.view.id()] = max(len(keys), MULTI_HIGHLIGHT_KEYS.get(self.view.id(), 0))
+
+
+    def fold(self, spans):
+        """Normalize ``spans`` and fold them with as few ``view.fold()`` calls as possible."""
+
+        folds = normalize_spans(spans)
+        self.in_batches(self.view.fold, folds)
+
+        self.fold_stats = {'emitted': len(spans), 'folded': len(folds), 'merged': len(spans) - len(folds)}
+        self.log.info("folded %(folded)s spans (%(emitted)s emitted, %(merged)s merged)", self.fold_stats)
+
+        return folds
+
+    def refold_spans(self, folds, spans):
+        """
+        Replace the applied ``folds`` by the normalized ``spans``, unfolding the
+        removed folds and folding the added ones only.
+        """
+
+        new_folds = normalize_spans(spans)
+        removed, added = diff_spans(folds, new_folds)
+
+        # applied folds never touch each other: unfolding one leaves its neighbours folded
+        self.in_batches(self.view.unfold, removed)
+        self.in_batches(self.view.fold, added)
+
+        self.fold_stats = {'emitted': len(spans), 'folded': len(added), 'unfolded': len(removed), 'kept': len(new_folds) - len(added)}
+        self.log.info("refolded %(folded)s spans, unfolded %(unfolded)s, kept %(kept)s", self.fold_stats)
+
+        return new_folds
+
+    def in_batches(self, method, spans):
+        """Call ``view.fold`` or ``view.unfold`` with ``fold_batch_size`` regions at a time."""
+
+        batch_size = SETTINGS.get('fold_batch_size', 0) or len(spans) or 1
+
+        for idx in range(0, len(spans), batch_size):
+            method([sublime.Region(a, b) for a, b in spans[idx:idx + batch_size]])
+
+    def clear(self, unfold_regions=True, remove_highlights=True, center_viewport_on_carret=False):
+
+        self.log_state()
+
+        if unfold_regions == True:
+            self.view.unfold(sublime.Region(0, self.view.size()))
+            
+        if remove_highlights == True:
+            self.erase_highlights()
+
+        #center view at coursor position
+        if center_viewport_on_carret == True:
+            self.view.show_at_center(sublime.Region(0,0) if len(self.view.sel()) == 0 else self.view.sel()[0].begin(), False)
+        
+        self.erase_status_bar()
+        self.view.settings().erase(VIEW_SETTINGS_IS_FILTER_ACTIVE)
+        APPLIED_SCANS.pop(self.view.id(), None)
+        BACKGROUND_SCANS.discard(self.view.id())
+
+    def erase_highlights(self):
+        HIGHLIGHTED_REGIONS.pop(self.view.id(), None)
+
+        if VIEWPORT_WINDOWS.pop(self.view.id(), None) is not None:
+            VIEWPORT_GENERATIONS.cancel(self.view.id())
+
+        self.view.erase_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS)
+
+        for idx in range(MULTI_HIGHLIGHT_KEYS.pop(self.view.id(), 0)):
+            self.view.erase_regions(f"{VIEW_SETTINGS_HIGHLIGHTED_REGIONS}.{idx}")
+
+    def log_state(self, args=None):
+        # get_state() formats the whole state: only pay for it when DEBUG is on
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug(self.get_state(args), stacklevel=2)
+
+    def get_state(self, args=None):
+        pad = 0
+        args = str("" if not args else args)
+        folding_type = str(self.folding_type or "") if not self.folding_type else self.folding_type.name
+        highlight_type = str(self.highlight_type or "") if not self.highlight_type else self.highlight_type.name
+        regex = '\"\"' if self.regex is not None and len(self.regex) == 0 else self.regex
+
+        return f'args: {args:^{pad}}, folding_type: {folding_type:^{pad}}, highlight_type: {highlight_type:^{pad}}, regex: {regex:^{pad}}'
+
+
+    def on_settings_change(self):
+        self.log.debug(f"Settings changed")
+        
+        self.REGEX_OPTIONS_LIST = [[r.description, r.value] for r in ReservedRegexListOptions.all_members()] + SETTINGS.get('regex_list', [])
+        self.log.info(f"Settings changed")
+
+    def set_status_bar(self, regex, total_matches, progress=None, stopped=None):
+
+        status_bar_settings = SETTINGS.get('status_bar', {})
+
+        self.view.set_status(key=VIEW_SETTINGS_STATUS_BAR_REGEX, value=f"File Filter {self.describe_patterns(regex)} ")
+
+        if status_bar_settings.get('show_current_folding_style', True):
+            self.view.set_status(key=VIEW_SETTINGS_STATUS_BAR_FOLDING_STYLE, value=f"Folding Style: '{self.folding_type.value}'")
+
+        if status_bar_settings.get('show_current_highlight_style', True):
+            self.view.set_status(key=VIEW_SETTINGS_STATUS_BAR_HIGHLIGHT_STYLE, value=f"Highlight Style: '{self.highlight_type.description}'")
+
+        if progress is not None:
+            self.view.set_status(key=VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES, value=f"Scanning {progress}%, {total_matches} matches so far")
+
+        elif status_bar_settings.get('show_total_matches', True) and regex:
+            self.view.set_status(
+                key=VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES,
+                value= (f'Total Matches {total_matches}' if total_matches > 0 else f"No Matches Regions with /{regex}/") + (f" (stopped at {stopped})" if stopped else "")
+            )
+
+    def describe_patterns(self, regex):
+        patterns = [p if is_query(p) else f'/{p}/' for p in self.regex_list or ([regex] if regex else [])]
+        if self.exclude_regex:
+            patterns.append(f'-/{self.exclude_regex}/')
+        if self.field_values:
+            patterns.append('{' + ','.join(self.field_values) + '}')
+        if self.time_range:
+            patterns.append('[{} .. {}]'.format(*self.time_range))
+
+        return ' '.join(patterns)
+
+    def erase_status_bar(self):
+        
+        self.view.erase_status(key=VIEW_SETTINGS_STATUS_BAR_REGEX)
         self.view.erase_status(key=VIEW_SETTINGS_STATUS_BAR_FOLDING_STYLE)
         self.view.erase_status(key=VIEW_SETTINGS_STATUS_BAR_HIGHLIGHT_STYLE)
         self.view.erase_status(key=VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES)
@@ -460,10 +1791,79 @@ class FileFilterQuickPanelCommand(FileFilter):
         super().run()
         self.log.debug(self.REGEX_OPTIONS_LIST)
 
-        self.window.show_quick_panel(
-            self.REGEX_OPTIONS_LIST
-            , on_select= lambda idx :self.command_quick_panel(None if idx < 0 else self.REGEX_OPTIONS_LIST[idx][1]) 
-        )
+        view = self.view
+        view_id = view.id()
+        options = list(self.REGEX_OPTIONS_LIST)
+        reserved = len(ReservedRegexListOptions.all_members())
+
+        generation = QUICK_PANEL_GENERATIONS.next(view_id)
+        is_open = lambda: QUICK_PANEL_GENERATIONS.is_current(view_id, generation)
+
+        # counts of the cached matches are shown right away, the others are counted in the background
+        counts = {}
+        for description, regex in options[reserved:]:
+            if pattern_error(regex) is not None:
+                counts[regex] = "invalid query" if is_query(regex) else "invalid regex"
+            elif MATCHES.count(view.buffer_id(), view.change_count(), regex) is not None:
+                counts[regex] = f"{MATCHES.count(view.buffer_id(), view.change_count(), regex)} matches"
+
+        pending = [regex for description, regex in options[reserved:] if regex not in counts]
+        panel = {'shown': 0, 'selected': 0}
+
+        def show():
+            # showing the panel again closes the previous one, whose callbacks are ignored
+            panel['shown'] += 1
+            shown = panel['shown']
+
+            def on_select(idx):
+                if shown != panel['shown']:
+                    return
+
+                QUICK_PANEL_GENERATIONS.cancel(view_id)
+                self.load_view_state(view)
+                self.command_quick_panel(None if idx < 0 else options[idx][1])
+
+            def on_highlight(idx):
+                if shown == panel['shown']:
+                    panel['selected'] = idx
+
+            items = options[:reserved] + [
+                [description, f"{regex}  ({counts.get(regex, 'counting...')})"] for description, regex in options[reserved:]
+            ]
+
+            self.window.show_quick_panel(items, on_select=on_select, selected_index=panel['selected'], on_highlight=on_highlight)
+
+        def on_counted(regex, count):
+            counts[regex] = f"{count} matches"
+
+            if not is_open():
+                return
+
+            # showing the panel again drops the text typed in it: counts go to the
+            # status bar as they come, and the panel is shown again once, with all of them
+            counted = sum(1 for description, regex in options[reserved:] if regex in counts)
+
+            if counted < len(options) - reserved:
+                sublime.status_message(f"File Filter: counted the matches of {counted} of {len(options) - reserved} presets")
+            else:
+                show()
+
+        def count_next(snapshot):
+            if not pending or not is_open():
+                return
+
+            regex = pending.pop(0)
+            matches = snapshot.matches(regex, cancelled=lambda: not is_open())
+
+            if matches is not None:
+                sublime.set_timeout(partial(on_counted, regex, len(matches)), 0)
+                sublime.set_timeout_async(partial(count_next, snapshot), 0)
+
+        show()
+
+        if pending:
+            snapshot = TextSnapshot(view)
+            sublime.set_timeout_async(partial(count_next, snapshot), 0)
 
 
 class FileFilterPromptRegexCommand(FileFilter):
@@ -474,6 +1874,371 @@ class FileFilterPromptRegexCommand(FileFilter):
         self.command_prompt_regex()
 
 
+class FileFilterPromptExcludeRegexCommand(FileFilter):
+
+    def run(self):
+        super().run()
+
+        def on_input_done(regex):
+            self.set_exclude_regex(regex)
+
+            if self.regex or regex:
+                self.apply()
+            else:
+                self.clear()
+
+        self.window.show_input_panel(
+            "Enter regex to exclude:"
+            , self.exclude_regex or ""
+            , on_input_done # on_done
+            , None # on_change
+            , None  # on_cancel
+        )
+
+
+class FileFilterTimeRangeCommand(FileFilter):
+
+    def run(self, since=None, until=None):
+        self.load_view_state(self.window.active_view())
+
+        if since is not None or until is not None:
+            self.on_time_range(since or "", until or "")
+            return
+
+        def on_input_done(text):
+            self.on_time_range(*split_range(text))
+
+        self.window.show_input_panel(
+            "Time range (from .. to):"
+            , "{} .. {}".format(*self.time_range) if self.time_range else ""
+            , on_input_done # on_done
+            , None # on_change
+            , None  # on_cancel
+        )
+
+    def on_time_range(self, since, until):
+        since, until = since.strip(), until.strip()
+
+        # times of day are checked against a placeholder date, the log's one is only known from its index
+        try:
+            parse_bound(since, False, ('0000', '01', '01'))
+            parse_bound(until, True, ('0000', '01', '01'))
+        except ValueError as error:
+            sublime.status_message(f"File Filter: {error}")
+            return
+
+        self.set_time_range(since, until)
+
+        if self.time_range:
+            self.after_indexing(current_time_index, TextSnapshot.time_index, self.reapply)
+        else:
+            self.reapply()
+
+
+class FileFilterFieldValuesCommand(FileFilter):
+
+    def run(self, values=None):
+        self.load_view_state(self.window.active_view())
+
+        try:
+            compile_extractor(field_pattern())
+        except (re.error, ValueError) as error:
+            sublime.status_message(f"File Filter: invalid field_index.pattern: {error}")
+            return
+
+        if values is not None:
+            self.after_indexing(current_field_index, TextSnapshot.field_index, lambda: self.on_field_values(values))
+            return
+
+        self.after_indexing(current_field_index, TextSnapshot.field_index, lambda: self.show_values_panel(list(self.field_values or [])))
+
+    def show_values_panel(self, selected, selected_index=0):
+        """Quick panel toggling field values in and out of the filter, each toggle applied right away."""
+
+        index = current_field_index(self.view)
+
+        if index is None:
+            # edited since the index was built
+            self.after_indexing(current_field_index, TextSnapshot.field_index, lambda: self.show_values_panel(selected, selected_index))
+            return
+
+        values = sorted(set(index.values()).union(selected))
+
+        if not values:
+            sublime.status_message("File Filter: no field values found")
+            return
+
+        items = [[("[x] " if value in selected else "[ ] ") + value, f"{index.line_count(value)} lines"] for value in values]
+
+        def on_select(idx):
+            if idx < 0:
+                return
+
+            if values[idx] in selected:
+                selected.remove(values[idx])
+            else:
+                selected.append(values[idx])
+
+            self.on_field_values(selected)
+            self.show_values_panel(selected, idx)
+
+        self.window.show_quick_panel(items, on_select=on_select, selected_index=selected_index)
+
+    def on_field_values(self, values):
+        self.set_field_values(values)
+        self.reapply()
+
+
+class FileFilterMultiRegexCommand(FileFilter):
+
+    def run(self, patterns=None):
+        super().run()
+
+        if patterns is not None:
+            if self.set_regex_list(patterns):
+                self.apply()
+            return
+
+        self.show_patterns_panel(list(self.regex_list))
+
+    def show_patterns_panel(self, selected, selected_index=0):
+        """Quick panel toggling ``regex_list`` presets, plus prompted patterns, in and out of the filter."""
+
+        presets = [regex for description, regex in SETTINGS.get('regex_list', [])]
+        descriptions = [description for description, regex in SETTINGS.get('regex_list', [])]
+        patterns = presets + [pattern for pattern in selected if pattern not in presets]
+
+        items = [
+            ["Apply", f"{len(selected)} patterns selected"],
+            ["Add pattern...", "prompt for a regex to add"],
+        ] + [
+            [("[x] " if pattern in selected else "[ ] ") + (descriptions[idx] if idx < len(descriptions) else pattern), pattern]
+            for idx, pattern in enumerate(patterns)
+        ]
+
+        def on_add(pattern):
+            if pattern and self.validate_regex(pattern) and pattern not in selected:
+                selected.append(pattern)
+            self.show_patterns_panel(selected)
+
+        def on_select(idx):
+            if idx < 0:
+                return
+
+            if idx == 0:
+                if not selected:
+                    self.clear()
+                elif self.set_regex_list(selected):
+                    self.apply()
+                return
+
+            if idx == 1:
+                self.window.show_input_panel("Add regex:", "", on_add, None, lambda: self.show_patterns_panel(selected))
+                return
+
+            pattern = patterns[idx - 2]
+            if pattern in selected:
+                selected.remove(pattern)
+            else:
+                selected.append(pattern)
+
+            self.show_patterns_panel(selected, idx)
+
+        self.window.show_quick_panel(items, on_select=on_select, selected_index=selected_index)
+
+
+class FileFilterAllViewsCommand(FileFilter):
+
+    def run(self, regex=None, group=False):
+        self.load_view_state(self.window.active_view())
+
+        if regex is not None:
+            self.filter_views(regex, group)
+            return
+
+        self.window.show_input_panel(
+            "Enter regex for all views in the " + ("group:" if group else "window:")
+            , self.regex or ""
+            , lambda regex: self.filter_views(regex, group) # on_done
+            , None # on_change
+            , None  # on_cancel
+        )
+
+    def filter_views(self, regex, group=False):
+        """
+        Filter every view of the window (or of the active group) with ``regex``.
+        The views are scanned concurrently on ``window_filter.max_workers``
+        threads, then the filter is applied to each view from the cached matches
+        and a summary panel lists the matches of each file.
+        """
+
+        self.log_state(regex)
+
+        if not regex or not self.validate_regex(regex):
+            return
+
+        views = self.window.views_in_group(self.window.active_group()) if group else self.window.views()
+
+        # clones share a buffer, and so its matches
+        jobs = {}
+        for view in views:
+            exclude_regex = view.settings().get(VIEW_SETTINGS_CURRENT_EXCLUDE_REGEX, "")
+            if exclude_regex and pattern_error(exclude_regex) is not None:
+                exclude_regex = ""
+            jobs.setdefault((view.buffer_id(), exclude_regex), view)
+
+        max_workers = max(SETTINGS.get('window_filter', {}).get('max_workers', 4), 1)
+        started = time.perf_counter()
+
+        def scan_views():
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                counts = dict(zip(jobs, pool.map(lambda job: prefetch_scan(jobs[job], regex, job[1]), jobs)))
+
+            sublime.set_timeout(lambda: self.apply_views(regex, views, counts, time.perf_counter() - started), 0)
+
+        sublime.set_timeout_async(scan_views, 0)
+
+    def apply_views(self, regex, views, counts, seconds):
+        active_view = self.window.active_view()
+        lines = []
+        total = 0
+
+        for view in views:
+            if not view.is_valid():
+                continue
+
+            self.load_view_state(view)
+            self.set_regex(regex)
+            self.apply()
+
+            applied = APPLIED_SCANS.get(view.id())
+            if applied is not None and applied.regex == regex and view.id() not in BACKGROUND_SCANS:
+                count = len(applied.matches)
+            else:
+                count = counts.get((view.buffer_id(), self.exclude_regex), 0)
+
+            total += count
+            lines.append(f"{count:>10}  {view.file_name() or view.name() or f'untitled ({view.id()})'}")
+
+        self.load_view_state(active_view)
+
+        title = f"File Filter /{regex}/: {total} matches in {len(lines)} views ({seconds * 1000:.0f} ms)"
+
+        panel = self.window.create_output_panel(SUMMARY_PANEL_NAME)
+        panel.run_command('append', {'characters': "\n".join([title, ""] + lines) + "\n"})
+        self.window.run_command('show_panel', {'panel': f"output.{SUMMARY_PANEL_NAME}"})
+
+
+class FileFilterScanFileCommand(FileFilter):
+
+    def run(self, path=None, regex=None):
+        self.load_view_state(self.window.active_view())
+
+        if path is None:
+            self.window.show_input_panel(
+                "File to scan:"
+                , self.view.file_name() or ""
+                , lambda path: self.run(path, regex) # on_done
+                , None # on_change
+                , None  # on_cancel
+            )
+            return
+
+        if regex is not None:
+            self.scan_file(path, regex)
+            return
+
+        presets = SETTINGS.get('regex_list', [])
+        items = [["Enter regex...", "prompt for a regex"]] + [[description, regex] for description, regex in presets]
+
+        def on_select(idx):
+            if idx == 0:
+                self.window.show_input_panel("Enter regex:", self.regex or "", lambda regex: self.scan_file(path, regex), None, None)
+            elif idx > 0:
+                self.scan_file(path, presets[idx - 1][1])
+
+        self.window.show_quick_panel(items, on_select=on_select)
+
+    def scan_file(self, path, regex):
+        """
+        Write the lines of the file at ``path`` matching ``regex`` to a new view,
+        without opening the file in the editor. The file is memory mapped and
+        scanned on the async thread, and lines are appended as they are found.
+        Like Find Results, double clicking a line opens the file at that line.
+        """
+
+        self.log_state(regex)
+
+        path = os.path.expanduser(path.strip())
+
+        if not regex or not os.path.isfile(path):
+            sublime.status_message(f"File Filter: '{path}' is not a file" if regex else "File Filter: no regex to scan with")
+            return
+
+        try:
+            compiled = bytes_pattern(regex, PATTERNS)
+        except re.error as e:
+            sublime.status_message(f"File Filter /{regex}/ invalid regex: {e}")
+            return
+
+        scan_settings = SETTINGS.get('file_scan', {})
+        chunk_size = scan_settings.get('chunk_size', 4194304)
+        max_lines = scan_settings.get('max_lines', 100000)
+
+        output = self.window.new_file()
+        output.set_scratch(True)
+        output.set_read_only(True)
+        output.set_name(f"Scan: {os.path.basename(path)} /{regex}/")
+        output.settings().set('result_file_regex', r'^([^ \t].*):$')
+        output.settings().set('result_line_regex', r'^ +([0-9]+):')
+
+        def append(text):
+            if output.is_valid():
+                output.run_command('append', {'characters': text, 'force': True, 'scroll_to_end': False})
+
+        def run_scan():
+            lines = [f"{path}:"]
+            found = 0
+            stopped = ""
+
+            try:
+                with open(path, 'rb') as file:
+                    size = os.fstat(file.fileno()).st_size
+                    data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+                    try:
+                        for row, line in matching_lines(data, compiled, chunk_size):
+                            line = line.rstrip(b'\r').decode('utf-8', 'replace')
+                            lines.append(f"{row + 1:>8}: {line}")
+                            found += 1
+
+                            if max_lines and found >= max_lines:
+                                stopped = f", stopped at {max_lines} lines"
+                                break
+
+                            if len(lines) >= 1000:
+                                if not output.is_valid():
+                                    return
+                                sublime.set_timeout(partial(append, "\n".join(lines) + "\n"), 0)
+                                lines = []
+                    finally:
+                        if size:
+                            data.close()
+
+            # the file may be gone, unreadable or emptied since it was picked; mmap of 0 bytes raises ValueError
+            except (OSError, ValueError) as e:
+                lines.append(f"\ncannot scan the file: {e}\n")
+                sublime.set_timeout(partial(append, "\n".join(lines)), 0)
+                sublime.status_message(f"File Filter: cannot scan '{path}': {e}")
+                return
+
+            lines.append(f"\n{found} matching lines{stopped}\n")
+            sublime.set_timeout(partial(append, "\n".join(lines)), 0)
+            sublime.status_message(f"File Filter: {found} matching lines in {os.path.basename(path)}{stopped}")
+
+        sublime.set_timeout_async(run_scan, 0)
+
+
 class FileFilterSetFoldingTypeCommand(FileFilter):
 
     def run(self):
@@ -485,6 +2250,39 @@ class FileFilterSetFoldingTypeCommand(FileFilter):
         )
 
 
+class FileFilterSetContextLinesCommand(FileFilter):
+
+    def run(self, before=None, after=None):
+        super().run()
+
+        if before is not None or after is not None:
+            self.on_context_lines(before or 0, after or 0)
+            return
+
+        def on_input_done(text):
+            # "N" for N lines on both sides (grep -C), "B, A" for B before and A after (grep -B/-A)
+            try:
+                values = [int(value) for value in re.split(r'[,\s]+', text.strip()) if value]
+                before, after = (values[0], values[0]) if len(values) == 1 else values
+            except ValueError:
+                self.log.error(f"context lines '{text}' are not valid")
+                return
+
+            self.on_context_lines(before, after)
+
+        self.window.show_input_panel(
+            "Context lines (N or before, after):"
+            , "{}, {}".format(*self.context_lines())
+            , on_input_done # on_done
+            , None # on_change
+            , None  # on_cancel
+        )
+
+    def on_context_lines(self, before, after):
+        self.set_context_lines(max(before, 0), max(after, 0))
+        self.command_set_folding_type(FoldingTypes.context)
+
+
 class FileFilterSetHighlightTypeCommand(FileFilter):
 
     def run(self):
@@ -503,6 +2301,8 @@ class FileFilterClearCommand(FileFilter):
         
         clear_settings = SETTINGS.get('on_clear_command_options', {})
 
+        SCAN_GENERATIONS.cancel(self.view.id())
+
         self.clear(
                 unfold_regions = clear_settings.get('unfold_regions', True),
                 remove_highlights = clear_settings.get('remove_highlights', True),
@@ -510,11 +2310,174 @@ class FileFilterClearCommand(FileFilter):
             )
 
 
+class FileFilterProfileLastRunCommand(FileFilter):
+
+    def run(self):
+        self.view = self.window.active_view()
+        runs = PROFILES.runs(self.view.id())
+
+        if not runs:
+            hint = "" if PROFILING_ENABLED else ", set 'profiling.enabled' to record them"
+            sublime.status_message(f"File Filter: no profiled runs for this view{hint}")
+            return
+
+        title = f"File Filter profile of '{self.view.file_name() or self.view.name() or self.view.id()}', last {len(runs)} runs"
+
+        panel = self.window.create_output_panel(PROFILE_PANEL_NAME)
+        panel.run_command('append', {'characters': format_runs(runs, title)})
+        self.window.run_command('show_panel', {'panel': f"output.{PROFILE_PANEL_NAME}"})
+
+
+class FileFilterExtractCommand(FileFilter):
+
+    def run(self, before=None, after=None):
+        self.load_view_state(self.window.active_view())
+
+        # the context of the folding style, unless given
+        default = self.context_lines() if self.folding_type is FoldingTypes.context else (0, 0)
+
+        self.extract(
+            default[0] if before is None else max(before, 0),
+            default[1] if after is None else max(after, 0),
+        )
+
+
+class FileFilterGoToSourceCommand(FileFilter):
+
+    def run(self):
+        view = self.window.active_view()
+        sources = EXTRACTS.get(view.id())
+        source_id = view.settings().get(VIEW_SETTINGS_EXTRACT_SOURCE)
+
+        if sources is None or source_id is None:
+            sublime.status_message("File Filter: not an extract view")
+            return
+
+        source = sublime.View(source_id)
+
+        if not source.is_valid():
+            sublime.status_message("File Filter: the source view was closed")
+            return
+
+        row, col = view.rowcol(view.sel()[0].begin()) if len(view.sel()) else (0, 0)
+        offset = source_of(sources, row)
+
+        if offset is None:
+            return
+
+        point = min(offset + col, source.line(offset).end())
+
+        source.sel().clear()
+        source.sel().add(sublime.Region(point))
+
+        self.window.focus_view(source)
+        source.show_at_center(point)
+
+
+class FileFilterRefreshCommand(FileFilter):
+
+    def run(self, view_id=None, appended=False, viewport=False):
+        view = sublime.View(view_id) if view_id is not None else self.window.active_view()
+
+        if not view.is_valid() or not view.settings().get(VIEW_SETTINGS_IS_FILTER_ACTIVE, False):
+            return
+
+        self.load_view_state(view)
+
+        if viewport:
+            applied = APPLIED_SCANS.get(view.id())
+            if applied is not None and view.id() in VIEWPORT_WINDOWS:
+                self.highlight_viewport(applied.matches)
+        elif appended:
+            self.apply_appended()
+        else:
+            self.apply()
+
+
+class FileFilterToggleFollowCommand(FileFilter):
+
+    def run(self):
+        super().run()
+
+        view_settings = self.view.settings()
+        follow = not view_settings.get(VIEW_SETTINGS_FOLLOW, SETTINGS.get('follow', {}).get('enabled', False))
+        view_settings.set(VIEW_SETTINGS_FOLLOW, follow)
+
+        sublime.status_message(f"File Filter: follow {'on' if follow else 'off'}")
+
+
 class FileFilterListener(sublime_plugin.EventListener):
 
     def on_query_context(self, view, key, operator, operand, match_all):
         if key == KEY_MAP_CONTEXT_KEY_CLEAR:
             is_file_filter_active = view.settings().get(VIEW_SETTINGS_IS_FILTER_ACTIVE, False)
-            LOGGER.debug(f"key: '{KEY_MAP_CONTEXT_KEY_CLEAR}, returning '{VIEW_SETTINGS_IS_FILTER_ACTIVE} -> {is_file_filter_active }")
+            LOGGER.debug("key: '%s', returning '%s' -> %s", KEY_MAP_CONTEXT_KEY_CLEAR, VIEW_SETTINGS_IS_FILTER_ACTIVE, is_file_filter_active)
             return is_file_filter_active
-        return None
\ No newline at end of file
+        if key == KEY_MAP_CONTEXT_KEY_EXTRACT:
+            return view.id() in EXTRACTS
+        return None
+
+    def on_modified_async(self, view):
+        view_settings = view.settings()
+
+        if not view_settings.get(VIEW_SETTINGS_IS_FILTER_ACTIVE, False):
+            return
+
+        follow_settings = SETTINGS.get('follow', {})
+
+        if not view_settings.get(VIEW_SETTINGS_FOLLOW, follow_settings.get('enabled', False)):
+            return
+
+        view_id = view.id()
+        generation = FOLLOW_GENERATIONS.next(view_id)
+
+        def refresh():
+            window = view.window()
+            if window and FOLLOW_GENERATIONS.is_current(view_id, generation):
+                window.run_command('file_filter_refresh', {'view_id': view_id, 'appended': True})
+
+        sublime.set_timeout(refresh, follow_settings.get('refresh_delay_ms', 500))
+
+    def on_close(self, view):
+        LINE_INDEXES.pop(view.buffer_id(), None)
+        TIME_INDEXES.pop(view.buffer_id(), None)
+        FIELD_INDEXES.pop(view.buffer_id(), None)
+        EDITED_FROM.pop(view.buffer_id(), None)
+        APPLIED_SCANS.pop(view.id(), None)
+        BACKGROUND_SCANS.discard(view.id())
+        MULTI_HIGHLIGHT_KEYS.pop(view.id(), None)
+        HIGHLIGHTED_REGIONS.pop(view.id(), None)
+        SCAN_GENERATIONS.discard(view.id())
+        FOLLOW_GENERATIONS.discard(view.id())
+        PROFILES.discard(view.id())
+        VIEWPORT_WINDOWS.pop(view.id(), None)
+        VIEWPORT_GENERATIONS.discard(view.id())
+        QUICK_PANEL_GENERATIONS.discard(view.id())
+        EXTRACTS.pop(view.id(), None)
+
+        if not view.clones():
+            MATCHES.discard(view.buffer_id())
+
+
+class FileFilterTextChangeListener(sublime_plugin.TextChangeListener):
+
+    @classmethod
+    def is_applicable(cls, buffer):
+        return True
+
+    def on_text_changed(self, changes):
+        buffer_id = self.buffer.id()
+
+        edited_from = min(change.a.pt for change in changes)
+        EDITED_FROM[buffer_id] = min(EDITED_FROM.get(buffer_id, edited_from), edited_from)
+
+        index = LINE_INDEXES.get(buffer_id)
+
+        if index is None:
+            return
+
+        # changes are sequential, each one relative to the text left by the previous
+        for change in changes:
+            index.replace(change.a.pt, change.b.pt, change.str)
+
+        index.change_count = self.buffer.primary_view().change_count()
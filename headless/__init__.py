@@ -0,0 +1,67 @@
+"""
+Run File Filter outside Sublime Text.
+
+``load_plugin()`` installs the ``sublime`` and ``sublime_plugin`` stand-ins of
+this package, imports the plugin the way Sublime does (as ``File Filter.file_filter``)
+and calls its ``plugin_loaded()``::
+
+    from headless import load_plugin, sublime
+
+    file_filter = load_plugin()
+    window = sublime.active_window()
+    view = window.new_file()
+    view.run_command('append', {'characters': open('big.log').read()})
+
+    sublime.reset_calls()
+    view.settings().set(file_filter.VIEW_SETTINGS_CURRENT_REGEX, 'ERROR')
+    window.run_command('file_filter_refresh')
+    print(sublime.CALLS)
+"""
+
+import importlib
+import os
+import sys
+import types
+
+from . import sublime, sublime_plugin
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PACKAGE_NAME = 'File Filter'
+PLUGIN_MODULE = 'file_filter'
+
+
+def install():
+    """Make ``import sublime`` and ``import sublime_plugin`` resolve to the stand-ins."""
+
+    for name, module in (('sublime', sublime), ('sublime_plugin', sublime_plugin)):
+        installed = sys.modules.setdefault(name, module)
+        if installed is not module:
+            raise RuntimeError(f"'{name}' is already imported from {getattr(installed, '__file__', installed)}")
+
+
+def load_plugin(root=ROOT, package_name=PACKAGE_NAME):
+    """Import the plugin of the package under ``root`` and return its module."""
+
+    install()
+
+    package = sys.modules.get(package_name)
+
+    if package is None:
+        package = types.ModuleType(package_name)
+        package.__path__ = [root]
+        sys.modules[package_name] = package
+
+    sublime.add_package(package_name, root)
+
+    module_name = f"{package_name}.{PLUGIN_MODULE}"
+    already_loaded = module_name in sys.modules
+    module = importlib.import_module(module_name)
+
+    if not already_loaded:
+        sublime_plugin.register_module(module)
+
+        if hasattr(module, 'plugin_loaded'):
+            module.plugin_loaded()
+
+    return module
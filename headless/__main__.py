@@ -0,0 +1,28 @@
+"""
+Run the tests of the package on the stand-ins, without Sublime Text::
+
+    python -m headless [-v] [-k PATTERN]
+
+Arguments are passed on to ``unittest``. Tests that need the editor itself
+are skipped.
+"""
+
+import os
+import sys
+import unittest
+
+from . import ROOT, load_plugin
+
+
+def main(argv=None):
+    load_plugin()
+
+    tests_path = os.path.join(ROOT, 'tests')
+    sys.path.insert(0, tests_path)
+
+    argv = sys.argv[1:] if argv is None else argv
+    unittest.main(module=None, argv=['python -m headless', 'discover', '-s', tests_path, '-t', tests_path] + argv)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1139 @@
+"""
+Stand-in for the ``sublime`` module of Sublime Text 4, for running the plugin
+outside the editor.
+
+Only the part of the API used by File Filter is provided, with the same
+signatures and return values. Every call to a view, window or settings method,
+and to the module functions, is counted in ``CALLS`` under ``"Class.method"``
+(``"sublime.function"`` for module functions). Editor round trips are what a
+filter costs inside Sublime, so the counts are the number to watch.
+
+Timeouts do not run by themselves: ``run_timeouts()`` runs the pending
+callbacks in due order against a virtual clock.
+"""
+
+import bisect
+import math
+import heapq
+import itertools
+import json
+import os
+import re
+import tempfile
+from collections import Counter
+from functools import wraps
+
+# tests that need the editor itself skip on this stand-in
+HEADLESS = True
+
+##
+## CONSTANTS
+##
+
+LITERAL = 1
+IGNORECASE = 2
+
+DRAW_EMPTY = 1
+HIDE_ON_MINIMAP = 2
+DRAW_EMPTY_AS_OVERWRITE = 4
+PERSISTENT = 16
+DRAW_OUTLINED = 32
+DRAW_NO_FILL = 32
+HIDDEN = 128
+DRAW_NO_OUTLINE = 256
+DRAW_SOLID_UNDERLINE = 512
+DRAW_STIPPLED_UNDERLINE = 1024
+DRAW_SQUIGGLY_UNDERLINE = 2048
+NO_UNDO = 8192
+
+ENCODED_POSITION = 1
+TRANSIENT = 4
+FORCE_GROUP = 8
+ADD_TO_SELECTION = 32
+REPLACE_MNEMONIC_CHARACTER = 512
+
+MONOSPACE_FONT = 1
+KEEP_OPEN_ON_FOCUS_LOST = 2
+WANT_EVENT = 4
+
+OP_EQUAL = 0
+OP_NOT_EQUAL = 1
+OP_REGEX_MATCH = 2
+OP_NOT_REGEX_MATCH = 3
+OP_REGEX_CONTAINS = 4
+OP_NOT_REGEX_CONTAINS = 5
+
+##
+## CALL COUNTING
+##
+
+CALLS = Counter()
+
+
+def reset_calls():
+    CALLS.clear()
+
+
+def _counted_function(func):
+    name = f"sublime.{func.__name__}"
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        CALLS[name] += 1
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _counted(cls):
+    """Count the calls of the public methods of ``cls``."""
+
+    for attr, func in list(vars(cls).items()):
+        if attr.startswith('_') or not callable(func):
+            continue
+
+        def make_wrapper(func, name=f"{cls.__name__}.{attr}"):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                CALLS[name] += 1
+                return func(*args, **kwargs)
+            return wrapper
+
+        setattr(cls, attr, make_wrapper(func))
+
+    return cls
+
+##
+## TIMEOUTS
+##
+
+_clock = 0
+_timeouts = []
+_timeout_ids = itertools.count()
+
+
+@_counted_function
+def set_timeout(callback, delay=0):
+    heapq.heappush(_timeouts, (_clock + max(delay, 0), next(_timeout_ids), callback))
+
+
+@_counted_function
+def set_timeout_async(callback, delay=0):
+    heapq.heappush(_timeouts, (_clock + max(delay, 0), next(_timeout_ids), callback))
+
+
+def run_timeouts(until=None):
+    """Run pending timeouts, and the ones they schedule, up to the virtual time ``until``."""
+
+    global _clock
+
+    while _timeouts and (until is None or _timeouts[0][0] <= until):
+        due, _, callback = heapq.heappop(_timeouts)
+        _clock = max(_clock, due)
+        callback()
+
+    if until is not None:
+        _clock = max(_clock, until)
+
+
+def pending_timeouts():
+    return len(_timeouts)
+
+
+def clock():
+    """Virtual time, in milliseconds, the timeouts are due against."""
+
+    return _clock
+
+##
+## REGION
+##
+
+class Region:
+
+    __slots__ = ['a', 'b', 'xpos']
+
+    def __init__(self, a, b=None, xpos=-1):
+        if b is None:
+            b = a
+        self.a = a
+        self.b = b
+        self.xpos = xpos
+
+    def __str__(self):
+        return "(" + str(self.a) + ", " + str(self.b) + ")"
+
+    def __repr__(self):
+        return "Region(" + str(self.a) + ", " + str(self.b) + ")"
+
+    def __len__(self):
+        return self.size()
+
+    def __eq__(self, rhs):
+        return isinstance(rhs, Region) and self.a == rhs.a and self.b == rhs.b
+
+    def __hash__(self):
+        return hash((self.a, self.b))
+
+    def __lt__(self, rhs):
+        lhb = self.begin()
+        rhb = rhs.begin()
+
+        if lhb == rhb:
+            return self.end() < rhs.end()
+        else:
+            return lhb < rhb
+
+    def __contains__(self, v):
+        return self.contains(v)
+
+    def __iter__(self):
+        return iter((self.a, self.b))
+
+    def to_tuple(self):
+        return (self.a, self.b)
+
+    def empty(self):
+        return self.a == self.b
+
+    def begin(self):
+        return min(self.a, self.b)
+
+    def end(self):
+        return max(self.a, self.b)
+
+    def size(self):
+        return abs(self.a - self.b)
+
+    def contains(self, x):
+        if isinstance(x, Region):
+            return self.contains(x.a) and self.contains(x.b)
+        return x >= self.begin() and x <= self.end()
+
+    def cover(self, rhs):
+        a = min(self.begin(), rhs.begin())
+        b = max(self.end(), rhs.end())
+
+        if self.a < self.b:
+            return Region(a, b)
+        else:
+            return Region(b, a)
+
+    def intersection(self, rhs):
+        if self.end() <= rhs.begin() or rhs.end() <= self.begin():
+            return Region(0)
+
+        return Region(max(self.begin(), rhs.begin()), min(self.end(), rhs.end()))
+
+    def intersects(self, rhs):
+        lb = self.begin()
+        le = self.end()
+        rb = rhs.begin()
+        re_ = rhs.end()
+
+        return (lb == rb and le == re_) or (rb > lb and rb < le) or (re_ > lb and re_ < le) or (lb > rb and lb < re_) or (le > rb and le < re_)
+
+
+class Selection:
+
+    def __init__(self):
+        self._regions = [Region(0)]
+
+    def __len__(self):
+        return len(self._regions)
+
+    def __getitem__(self, index):
+        return self._regions[index]
+
+    def __iter__(self):
+        return iter(list(self._regions))
+
+    def clear(self):
+        self._regions = []
+
+    def add(self, x):
+        self._regions.append(x if isinstance(x, Region) else Region(x))
+        self._regions.sort()
+
+    def add_all(self, regions):
+        for region in regions:
+            self.add(region)
+
+    def subtract(self, region):
+        self._regions = [r for r in self._regions if not region.contains(r)]
+
+    def contains(self, region):
+        return any(r.contains(region) for r in self._regions)
+
+
+class Edit:
+
+    def __init__(self, edit_token=0):
+        self.edit_token = edit_token
+
+##
+## SETTINGS
+##
+
+_COMMENT_OR_STRING = re.compile(r'"(?:\\.|[^"\\])*"|//[^\n]*|/\*.*?\*/', re.DOTALL)
+_TRAILING_COMMA = re.compile(r'"(?:\\.|[^"\\])*"|,(\s*[}\]])', re.DOTALL)
+
+
+def decode_value(data):
+    """Decode a JSON document with comments and trailing commas, like Sublime resource files."""
+
+    data = _COMMENT_OR_STRING.sub(lambda m: m.group(0) if m.group(0).startswith('"') else '', data)
+    data = _TRAILING_COMMA.sub(lambda m: m.group(1) if m.group(1) is not None else m.group(0), data)
+
+    return json.loads(data) if data.strip() else None
+
+
+def encode_value(value, pretty=False):
+    return json.dumps(value, indent=4 if pretty else None)
+
+
+@_counted
+class Settings:
+
+    def __init__(self, values=None):
+        self._values = dict(values or {})
+        self._on_change = {}
+
+    def get(self, key, default=None):
+        value = self._values.get(key, default)
+        return default if value is None else value
+
+    def has(self, key):
+        return key in self._values
+
+    def set(self, key, value):
+        self._values[key] = value
+        self._changed()
+
+    def erase(self, key):
+        if self._values.pop(key, None) is not None:
+            self._changed()
+
+    def update(self, values=None, **kwargs):
+        self._values.update(values or {}, **kwargs)
+        self._changed()
+
+    def to_dict(self):
+        return dict(self._values)
+
+    def add_on_change(self, tag, callback):
+        self._on_change.setdefault(tag, []).append(callback)
+
+    def clear_on_change(self, tag):
+        self._on_change.pop(tag, None)
+
+    def _changed(self):
+        for callbacks in list(self._on_change.values()):
+            for callback in list(callbacks):
+                callback()
+
+
+_PACKAGES = {}
+_SETTINGS_FILES = {}
+
+
+def add_package(name, path):
+    """Make the resources of the package ``name`` under ``path`` visible to ``load_settings()``."""
+
+    _PACKAGES[name] = path
+    _SETTINGS_FILES.clear()
+
+
+@_counted_function
+def load_settings(base_name):
+    """Settings of every package shipping ``base_name``, merged in package name order."""
+
+    if base_name not in _SETTINGS_FILES:
+        values = {}
+
+        for name in sorted(_PACKAGES):
+            path = os.path.join(_PACKAGES[name], base_name)
+            if os.path.isfile(path):
+                with open(path, encoding='utf-8') as settings_file:
+                    values.update(decode_value(settings_file.read()) or {})
+
+        _SETTINGS_FILES[base_name] = Settings(values)
+
+    return _SETTINGS_FILES[base_name]
+
+
+@_counted_function
+def save_settings(base_name):
+    pass
+
+##
+## MODULE FUNCTIONS
+##
+
+STATUS_MESSAGES = []
+ERROR_MESSAGES = []
+
+_cache_path = None
+
+
+@_counted_function
+def version():
+    return '4180'
+
+
+@_counted_function
+def platform():
+    return 'linux'
+
+
+@_counted_function
+def arch():
+    return 'x64'
+
+
+@_counted_function
+def channel():
+    return 'stable'
+
+
+def _packages_path():
+    return os.path.dirname(next(iter(_PACKAGES.values()))) if _PACKAGES else tempfile.gettempdir()
+
+
+@_counted_function
+def packages_path():
+    return _packages_path()
+
+
+@_counted_function
+def installed_packages_path():
+    return _packages_path()
+
+
+@_counted_function
+def cache_path():
+    global _cache_path
+
+    if _cache_path is None:
+        _cache_path = tempfile.mkdtemp(prefix='sublime-cache-')
+
+    return _cache_path
+
+
+@_counted_function
+def status_message(msg):
+    STATUS_MESSAGES.append(msg)
+
+
+@_counted_function
+def error_message(msg):
+    ERROR_MESSAGES.append(msg)
+
+
+@_counted_function
+def message_dialog(msg):
+    STATUS_MESSAGES.append(msg)
+
+
+@_counted_function
+def ok_cancel_dialog(msg, ok_title=""):
+    return True
+
+
+_clipboard = ""
+
+
+@_counted_function
+def get_clipboard(size_limit=16777216):
+    return _clipboard
+
+
+@_counted_function
+def set_clipboard(text):
+    global _clipboard
+    _clipboard = text
+
+##
+## BUFFERS AND VIEWS
+##
+
+_ids = itertools.count(1)
+_views = {}
+_windows = []
+
+
+class HistoricPosition:
+
+    def __init__(self, pt, row, col, col_utf16, col_utf8):
+        self.pt = pt
+        self.row = row
+        self.col = col
+        self.col_utf16 = col_utf16
+        self.col_utf8 = col_utf8
+
+
+class TextChange:
+
+    def __init__(self, a, b, len_utf16, len_utf8, str):
+        self.a = a
+        self.b = b
+        self.len_utf16 = len_utf16
+        self.len_utf8 = len_utf8
+        self.str = str
+
+
+@_counted
+class Buffer:
+
+    def __init__(self):
+        self.buffer_id = next(_ids)
+        self._views = []
+        self._text = ""
+        self._change_count = 0
+        self._file_name = None
+        self._text_change_listeners = None
+
+    def __eq__(self, other):
+        return isinstance(other, Buffer) and self.buffer_id == other.buffer_id
+
+    def __hash__(self):
+        return self.buffer_id
+
+    def id(self):
+        return self.buffer_id
+
+    def file_name(self):
+        return self._file_name
+
+    def views(self):
+        return list(self._views)
+
+    def primary_view(self):
+        return self._views[0] if self._views else None
+
+    def _position(self, pt):
+        row = self._text.count('\n', 0, pt)
+        col = pt - (self._text.rfind('\n', 0, pt) + 1)
+        return HistoricPosition(pt, row, col, col, col)
+
+    def _replace(self, begin, end, text):
+        change = TextChange(self._position(begin), self._position(end), len(text), len(text.encode('utf-8')), text)
+
+        self._text = self._text[:begin] + text + self._text[end:]
+        self._change_count += 1
+
+        for view in self._views:
+            view._shift(begin, end, len(text))
+
+        if self._text_change_listeners is None:
+            from . import sublime_plugin
+            self._text_change_listeners = sublime_plugin._text_change_listeners_for(self)
+
+        for listener in self._text_change_listeners:
+            listener.on_text_changed([change])
+
+        for view in self._views:
+            from . import sublime_plugin
+            sublime_plugin._on_modified(view)
+
+
+@_counted
+class View:
+
+    def __new__(cls, id=None, *args, **kwargs):
+        # ``sublime.View(view_id)`` gives back the view with that id
+        if id is not None and id in _views:
+            return _views[id]
+        return object.__new__(cls)
+
+    def __init__(self, id=None, window=None, buffer=None):
+        if id is not None and id in _views:
+            return
+
+        self.view_id = next(_ids) if id is None else id
+        self._window = window
+        self._buffer = buffer or Buffer()
+        self._buffer._views.append(self)
+        self._settings = Settings()
+        self._status = {}
+        self._regions = {}
+        self._folds = []
+        self._sel = Selection()
+        self._name = ""
+        self._scratch = False
+        self._read_only = False
+        self._valid = True
+        self._viewport_row = 0
+        self.viewport_lines = 50
+        self.element_name = None
+
+        _views[self.view_id] = self
+
+    def __eq__(self, other):
+        return isinstance(other, View) and other.view_id == self.view_id
+
+    def __hash__(self):
+        return self.view_id
+
+    def __repr__(self):
+        return f"View({self.view_id})"
+
+    # identity
+
+    def id(self):
+        return self.view_id
+
+    def buffer_id(self):
+        return self._buffer.buffer_id
+
+    def buffer(self):
+        return self._buffer
+
+    def is_valid(self):
+        return self._valid
+
+    def is_primary(self):
+        return self._buffer.primary_view() is self
+
+    def window(self):
+        return self._window
+
+    def clones(self):
+        return [view for view in self._buffer._views if view is not self]
+
+    def element(self):
+        return self.element_name
+
+    def file_name(self):
+        return self._buffer._file_name
+
+    def name(self):
+        return self._name
+
+    def set_name(self, name):
+        self._name = name
+
+    def is_loading(self):
+        return False
+
+    def is_dirty(self):
+        return False
+
+    def is_read_only(self):
+        return self._read_only
+
+    def set_read_only(self, read_only):
+        self._read_only = read_only
+
+    def is_scratch(self):
+        return self._scratch
+
+    def set_scratch(self, scratch):
+        self._scratch = scratch
+
+    def assign_syntax(self, syntax):
+        self._settings.set('syntax', syntax)
+
+    def settings(self):
+        return self._settings
+
+    def close(self):
+        if not self._valid:
+            return True
+
+        from . import sublime_plugin
+        sublime_plugin._on_close(self)
+
+        self._valid = False
+        self._buffer._views.remove(self)
+        _views.pop(self.view_id, None)
+
+        if self._window is not None:
+            self._window._remove_view(self)
+
+        return True
+
+    # text
+
+    def size(self):
+        return len(self._buffer._text)
+
+    def change_count(self):
+        return self._buffer._change_count
+
+    def substr(self, x):
+        text = self._buffer._text
+
+        if isinstance(x, Region):
+            return text[x.begin():x.end()]
+
+        return text[x:x + 1] if 0 <= x < len(text) else '\x00'
+
+    def find(self, pattern, start_pt, flags=0):
+        text = self._buffer._text
+
+        if flags & LITERAL:
+            pattern = re.escape(pattern)
+
+        match = re.compile(pattern, re.MULTILINE | (re.IGNORECASE if flags & IGNORECASE else 0)).search(text, start_pt)
+
+        return Region(*match.span()) if match else Region(-1, -1)
+
+    def find_all(self, pattern, flags=0, fmt=None, extractions=None):
+        text = self._buffer._text
+
+        if flags & LITERAL:
+            pattern = re.escape(pattern)
+
+        regions = []
+        for match in re.compile(pattern, re.MULTILINE | (re.IGNORECASE if flags & IGNORECASE else 0)).finditer(text):
+            regions.append(Region(*match.span()))
+            if fmt is not None and extractions is not None:
+                extractions.append(match.expand(fmt))
+
+        return regions
+
+    def _bounds(self, x):
+        if isinstance(x, Region):
+            return x.begin(), x.end()
+        return x, x
+
+    def line(self, x):
+        text = self._buffer._text
+        begin, end = self._bounds(x)
+
+        newline = text.find('\n', end)
+
+        return Region(text.rfind('\n', 0, begin) + 1, len(text) if newline < 0 else newline)
+
+    def full_line(self, x):
+        text = self._buffer._text
+        begin, end = self._bounds(x)
+
+        newline = text.find('\n', end)
+
+        return Region(text.rfind('\n', 0, begin) + 1, len(text) if newline < 0 else newline + 1)
+
+    def lines(self, region):
+        return self._lines(region)
+
+    def _lines(self, region):
+        text = self._buffer._text
+        lines = []
+        begin = text.rfind('\n', 0, region.begin()) + 1
+
+        while True:
+            newline = text.find('\n', begin)
+            end = len(text) if newline < 0 else newline
+            lines.append(Region(begin, end))
+
+            if newline < 0 or newline >= region.end():
+                return lines
+
+            begin = newline + 1
+
+    def split_by_newlines(self, region):
+        return [line.intersection(region) if not line.contains(region) else region for line in self._lines(region)]
+
+    def rowcol(self, tp):
+        return self._rowcol(tp)
+
+    def _rowcol(self, tp):
+        text = self._buffer._text
+        return text.count('\n', 0, tp), tp - (text.rfind('\n', 0, tp) + 1)
+
+    def text_point(self, row, col):
+        return self._text_point(row, col)
+
+    def _text_point(self, row, col):
+        text = self._buffer._text
+        begin = 0
+
+        for _ in range(row):
+            newline = text.find('\n', begin)
+            if newline < 0:
+                return len(text)
+            begin = newline + 1
+
+        return min(begin + col, len(text))
+
+    def run_command(self, cmd, args=None):
+        from . import sublime_plugin
+        sublime_plugin._run_text_command(self, cmd, args or {})
+
+    # selection and viewport
+
+    def sel(self):
+        return self._sel
+
+    def _screen_lines(self):
+        """
+        ``(begin, end)`` of the lines shown on screen, top down. A folded region takes
+        no line: the text after it continues the line the fold starts on.
+        """
+
+        text = self._buffer._text
+        folds = self._folds
+        pos = 0
+
+        while pos <= len(text):
+            begin = pos
+
+            while True:
+                newline = text.find('\n', pos)
+                line_end = len(text) if newline < 0 else newline
+
+                idx = bisect.bisect_left(folds, (pos,))
+                if idx < len(folds) and folds[idx][0] <= line_end:
+                    pos = folds[idx][1]
+                    continue
+
+                break
+
+            yield begin, line_end
+            pos = line_end + 1
+
+    def _screen_row(self, pt):
+        for row, (begin, end) in enumerate(self._screen_lines()):
+            if pt <= end:
+                return row
+
+        return row
+
+    def visible_region(self):
+        return self._visible_region()
+
+    def _visible_region(self):
+        """``viewport_lines`` screen lines from the top of the viewport, ``_viewport_row`` being a screen line."""
+
+        lines = itertools.islice(self._screen_lines(), self._viewport_row, self._viewport_row + self.viewport_lines)
+        first = last = next(lines, None)
+
+        if first is None:
+            return Region(len(self._buffer._text))
+
+        for last in lines:
+            pass
+
+        return Region(first[0], last[1])
+
+    def show(self, x, show_surrounds=True, keep_to_left=False, animate=True):
+        self._show(x, show_surrounds)
+
+    def _show(self, x, show_surrounds=True):
+        pt = self._bounds(x)[0] if not isinstance(x, Selection) else (x[0].begin() if len(x) else 0)
+        if not self._visible_region().contains(pt):
+            row = self._screen_row(pt)
+            self._viewport_row = max(row - self.viewport_lines // 2 if show_surrounds else row, 0)
+
+    def show_at_center(self, x, animate=True):
+        row = self._screen_row(self._bounds(x)[0])
+        self._viewport_row = max(row - self.viewport_lines // 2, 0)
+
+    def set_viewport_position(self, xy, animate=True):
+        self._viewport_row = max(int(xy[1]), 0)
+
+    def viewport_position(self):
+        return (0.0, float(self._viewport_row))
+
+    def viewport_extent(self):
+        return (80.0, float(self.viewport_lines))
+
+    def line_height(self):
+        return 1.0
+
+    # status, regions and folds
+
+    def set_status(self, key, value):
+        self._status[key] = value
+
+    def get_status(self, key):
+        return self._status.get(key, "")
+
+    def erase_status(self, key):
+        self._status.pop(key, None)
+
+    def add_regions(self, key, regions, scope="", icon="", flags=0, annotations=[], annotation_color="", on_navigate=None, on_close=None):
+        self._regions[key] = (sorted(regions), scope, icon, flags)
+
+    def get_regions(self, key):
+        return list(self._regions[key][0]) if key in self._regions else []
+
+    def erase_regions(self, key):
+        self._regions.pop(key, None)
+
+    def fold(self, x):
+        """
+        Fold ``x``, a region or a list of regions. Overlapping and touching folds merge.
+        Like in the editor, the viewport then scrolls to keep the caret in sight.
+        """
+
+        regions = [x] if isinstance(x, Region) else list(x)
+        spans = sorted((r.begin(), r.end()) for r in regions if not r.empty())
+
+        if not spans:
+            return False
+
+        # folds are sorted and apart: only the ones touching the new spans are merged
+        folds = self._folds
+        lo = bisect.bisect_left(folds, (spans[0][0],))
+        if lo and folds[lo - 1][1] >= spans[0][0]:
+            lo -= 1
+        hi = bisect.bisect_right(folds, (max(b for a, b in spans), math.inf))
+
+        merged = []
+        for a, b in sorted(folds[lo:hi] + spans):
+            if merged and a <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(b, merged[-1][1]))
+            else:
+                merged.append((a, b))
+
+        changed = merged != folds[lo:hi]
+        folds[lo:hi] = merged
+
+        if changed and len(self._sel):
+            self._show(self._sel[0].b)
+
+        return changed
+
+    def unfold(self, x):
+        """Unfold the folds intersecting ``x`` and return them."""
+
+        regions = [x] if isinstance(x, Region) else list(x)
+        folds = self._folds
+        removed = set()
+
+        for r in regions:
+            if r.empty():
+                # the folds holding the point, ends included
+                first = bisect.bisect_left(folds, (r.a,))
+                if first and folds[first - 1][1] >= r.a:
+                    first -= 1
+                last = bisect.bisect_right(folds, (r.a, math.inf))
+            else:
+                first = bisect.bisect_left(folds, (r.begin(),))
+                if first and folds[first - 1][1] > r.begin():
+                    first -= 1
+                last = bisect.bisect_left(folds, (r.end(),))
+
+            removed.update(range(first, last))
+
+        if not removed:
+            return []
+
+        lo, hi = min(removed), max(removed) + 1
+        unfolded = [Region(*folds[idx]) for idx in sorted(removed)]
+        folds[lo:hi] = [folds[idx] for idx in range(lo, hi) if idx not in removed]
+
+        return unfolded
+
+    def folded_regions(self):
+        return [Region(a, b) for a, b in self._folds]
+
+    def is_folded(self, sr):
+        return any(a <= sr.begin() and sr.end() <= b for a, b in self._folds)
+
+    def _shift(self, begin, end, inserted):
+        """Move folds and regions after a replacement of ``[begin, end)`` by ``inserted`` characters."""
+
+        delta = inserted - (end - begin)
+
+        def move(pt):
+            if pt >= end:
+                return pt + delta
+            return min(pt, begin + inserted) if pt > begin else pt
+
+        self._folds = [(move(a), move(b)) for a, b in self._folds if move(b) > move(a)]
+
+        for key, (regions, scope, icon, flags) in list(self._regions.items()):
+            self._regions[key] = ([Region(move(r.a), move(r.b)) for r in regions], scope, icon, flags)
+
+##
+## WINDOWS
+##
+
+@_counted
+class Window:
+
+    def __init__(self):
+        self.window_id = next(_ids)
+        self._views = []
+        self._active_view = None
+        self._panels = {}
+        self._active_panel = None
+        self._status = {}
+        # last input and quick panels, so scripts can drive them
+        self.input_panel = None
+        self.quick_panel = None
+        self._commands = {}
+
+        _windows.append(self)
+
+    def __eq__(self, other):
+        return isinstance(other, Window) and other.window_id == self.window_id
+
+    def __hash__(self):
+        return self.window_id
+
+    def id(self):
+        return self.window_id
+
+    def is_valid(self):
+        return self in _windows
+
+    def views(self, include_transient=False):
+        return list(self._views)
+
+    def active_view(self):
+        return self._active_view
+
+    def active_group(self):
+        return 0
+
+    def num_groups(self):
+        return 1
+
+    def views_in_group(self, group):
+        return list(self._views)
+
+    def active_view_in_group(self, group):
+        return self._active_view
+
+    def focus_group(self, group):
+        pass
+
+    def focus_view(self, view):
+        if view in self._views:
+            self._active_view = view
+
+    def get_view_index(self, view):
+        return (0, self._views.index(view)) if view in self._views else (-1, -1)
+
+    def new_file(self, flags=0, syntax=""):
+        return self._new_view(syntax)
+
+    def _new_view(self, syntax=""):
+        view = View(window=self)
+        if syntax:
+            view._settings._values['syntax'] = syntax
+
+        self._views.append(view)
+        self._active_view = view
+
+        return view
+
+    def open_file(self, fname, flags=0, group=-1):
+        path = fname.split(':')[0] if flags & ENCODED_POSITION else fname
+
+        for view in self._views:
+            if view.file_name() == path:
+                self._active_view = view
+                return view
+
+        view = self._new_view()
+        view._buffer._file_name = path
+
+        if os.path.isfile(path):
+            with open(path, encoding='utf-8', errors='replace', newline='') as opened_file:
+                view._buffer._text = opened_file.read()
+
+        return view
+
+    def find_open_file(self, fname):
+        return next((view for view in self._views if view.file_name() == fname), None)
+
+    def _remove_view(self, view):
+        if view in self._views:
+            self._views.remove(view)
+            if self._active_view is view:
+                self._active_view = self._views[-1] if self._views else None
+
+        for name, panel in list(self._panels.items()):
+            if panel is view:
+                del self._panels[name]
+
+    def create_output_panel(self, name, unlisted=False):
+        panel = self._panels.get(name)
+
+        if panel is None:
+            panel = View(window=self)
+            panel.element_name = f"output:{name}"
+            self._panels[name] = panel
+
+        return panel
+
+    def find_output_panel(self, name):
+        return self._panels.get(name)
+
+    def destroy_output_panel(self, name):
+        panel = self._panels.pop(name, None)
+        if panel is not None:
+            panel.close()
+
+    def active_panel(self):
+        return self._active_panel
+
+    def panels(self):
+        return [f"output.{name}" for name in self._panels]
+
+    def show_input_panel(self, caption, initial_text, on_done, on_change, on_cancel):
+        self.input_panel = (caption, initial_text, on_done, on_change, on_cancel)
+
+        panel = View(window=self)
+        panel.element_name = 'input:input'
+        panel._buffer._text = initial_text
+
+        return panel
+
+    def show_quick_panel(self, items, on_select, flags=0, selected_index=-1, on_highlight=None, placeholder=None):
+        self.quick_panel = (items, on_select, flags, selected_index, on_highlight, placeholder)
+
+    def status_message(self, msg):
+        STATUS_MESSAGES.append(msg)
+
+    def run_command(self, cmd, args=None):
+        from . import sublime_plugin
+        sublime_plugin._run_window_command(self, cmd, args or {})
+
+    def extract_variables(self):
+        view = self._active_view
+        file_name = view.file_name() if view else None
+
+        variables = {'packages': _packages_path(), 'platform': 'Linux'}
+        if file_name:
+            variables.update(file=file_name, file_path=os.path.dirname(file_name), file_name=os.path.basename(file_name))
+
+        return variables
+
+    def folders(self):
+        return []
+
+
+@_counted_function
+def active_window():
+    if not _windows:
+        Window()
+    return _windows[0]
+
+
+@_counted_function
+def windows():
+    return list(_windows)
+
+
+def reset():
+    """Close every window and view, and forget pending timeouts and messages."""
+
+    global _clock
+
+    for window in list(_windows):
+        for view in window.views():
+            view.close()
+
+    _windows.clear()
+    _views.clear()
+    _timeouts.clear()
+    _clock = 0
+    STATUS_MESSAGES.clear()
+    ERROR_MESSAGES.clear()
+    reset_calls()
@@ -0,0 +1,198 @@
+"""
+Stand-in for the ``sublime_plugin`` module of Sublime Text 4.
+
+Commands are looked up by the name Sublime derives from the class name
+(``FileFilterClearCommand`` -> ``file_filter_clear``). Like in the editor,
+each window keeps a single instance of every window command, and event
+listeners are instantiated once when their plugin module is registered.
+"""
+
+import re
+
+from . import sublime
+
+_command_classes = {}
+_event_listeners = []
+_text_change_listener_classes = []
+
+_FIRST_CAP = re.compile(r'(.)([A-Z][a-z]+)')
+_ALL_CAP = re.compile(r'([a-z0-9])([A-Z])')
+
+
+def command_name(cls):
+    """Name used to run the command ``cls``, as computed by Sublime."""
+
+    name = cls.__name__
+
+    if name.endswith('Command'):
+        name = name[:-len('Command')]
+
+    return _ALL_CAP.sub(r'\1_\2', _FIRST_CAP.sub(r'\1_\2', name)).lower()
+
+
+class Command:
+
+    def name(self):
+        return command_name(self.__class__)
+
+    def is_enabled(self, *args):
+        return True
+
+    def is_visible(self, *args):
+        return True
+
+
+class ApplicationCommand(Command):
+    pass
+
+
+class WindowCommand(Command):
+
+    def __init__(self, window):
+        self.window = window
+
+    def run_(self, edit_token, args):
+        return self.run(**args)
+
+
+class TextCommand(Command):
+
+    def __init__(self, view):
+        self.view = view
+
+    def run_(self, edit_token, args):
+        return self.run(sublime.Edit(edit_token), **args)
+
+
+class EventListener:
+    pass
+
+
+class ViewEventListener:
+
+    def __init__(self, view):
+        self.view = view
+
+    @classmethod
+    def is_applicable(cls, settings):
+        return True
+
+
+class TextChangeListener:
+
+    def __init__(self):
+        self.buffer = None
+
+    @classmethod
+    def is_applicable(cls, buffer):
+        return True
+
+    def attach(self, buffer):
+        self.buffer = buffer
+
+    def detach(self):
+        self.buffer = None
+
+    def is_attached(self):
+        return self.buffer is not None
+
+
+def register_module(module):
+    """Register the commands and listeners defined in ``module``, like a plugin reload."""
+
+    for value in list(vars(module).values()):
+        if not isinstance(value, type) or value.__module__ != module.__name__:
+            continue
+
+        if issubclass(value, (ApplicationCommand, WindowCommand, TextCommand)):
+            _command_classes[command_name(value)] = value
+        elif issubclass(value, EventListener):
+            _event_listeners.append(value())
+        elif issubclass(value, TextChangeListener):
+            _text_change_listener_classes.append(value)
+
+
+def unregister_all():
+    _command_classes.clear()
+    _event_listeners.clear()
+    _text_change_listener_classes.clear()
+
+
+def _text_change_listeners_for(buffer):
+    listeners = []
+
+    for cls in _text_change_listener_classes:
+        if cls.is_applicable(buffer):
+            listener = cls()
+            listener.attach(buffer)
+            listeners.append(listener)
+
+    return listeners
+
+
+def _notify(callback_name, *args):
+    for listener in list(_event_listeners):
+        callback = getattr(listener, callback_name, None)
+        if callback is not None:
+            callback(*args)
+
+
+def _notify_async(callback_name, *args):
+    for listener in list(_event_listeners):
+        callback = getattr(listener, callback_name, None)
+        if callback is not None:
+            sublime.set_timeout_async(lambda callback=callback: callback(*args))
+
+
+def _on_modified(view):
+    _notify('on_modified', view)
+    _notify_async('on_modified_async', view)
+
+
+def _on_close(view):
+    _notify('on_pre_close', view)
+    _notify('on_close', view)
+
+
+def _run_window_command(window, name, args):
+    cls = _command_classes.get(name)
+
+    if cls is None or not issubclass(cls, WindowCommand):
+        return
+
+    command = window._commands.get(cls)
+    if command is None:
+        command = window._commands[cls] = cls(window)
+
+    command.run_(0, args)
+
+
+def _run_text_command(view, name, args):
+    if name in ('insert', 'append'):
+        text = args.get('characters', '')
+        selection = view._sel
+        begin = len(view._buffer._text) if name == 'append' else (selection[0].begin() if len(selection) else 0)
+        view._buffer._replace(begin, begin, text)
+        return
+
+    cls = _command_classes.get(name)
+
+    if cls is not None and issubclass(cls, TextCommand):
+        cls(view).run_(0, args)
+        return
+
+    if view._window is not None:
+        _run_window_command(view._window, name, args)
+
+
+def on_query_context(view, key, operator, operand, match_all):
+    """Value of the key binding context ``key``, ``None`` when no listener knows it."""
+
+    for listener in _event_listeners:
+        callback = getattr(listener, 'on_query_context', None)
+        if callback is not None:
+            value = callback(view, key, operator, operand, match_all)
+            if value is not None:
+                return value
+
+    return None
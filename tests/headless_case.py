@@ -0,0 +1,78 @@
+"""
+Base case of the tests that step the plugin on the headless stand-ins, whose
+timeouts run on a virtual clock: ``python -m headless``.
+"""
+
+import sys
+
+import sublime
+import unittest
+from unittest import TestCase
+
+file_filter = sys.modules["File Filter.file_filter"]
+
+FileFilter = file_filter.FileFilter
+VIEW_SETTINGS_HIGHLIGHTED_REGIONS = file_filter.VIEW_SETTINGS_HIGHLIGHTED_REGIONS
+VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES = file_filter.VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES
+
+
+def log_lines(begin, end, step=10):
+    """Lines ``begin`` to ``end`` of a log, with an ERROR every ``step`` lines."""
+
+    return "".join(f"line {idx} {'ERROR' if idx % step == 0 else 'INFO'} event\n" for idx in range(begin, end))
+
+
+@unittest.skipUnless(getattr(sublime, 'HEADLESS', False), "timeouts are run by the headless stand-in")
+class HeadlessTestCase(TestCase):
+
+    # package settings set for each test, restored after it
+    settings = {}
+
+    def setUp(self):
+        self.window = sublime.active_window()
+        self.views = []
+        self.saved_settings = {}
+
+        for key, value in self.settings.items():
+            self.set_setting(key, value)
+
+    def tearDown(self):
+        for key, value in self.saved_settings.items():
+            file_filter.SETTINGS.set(key, value)
+
+        # closed views stop their watchers, which poll for as long as they run
+        for view in self.views:
+            view.close()
+
+        sublime.run_timeouts()
+
+    def set_setting(self, key, value):
+        self.saved_settings.setdefault(key, file_filter.SETTINGS.get(key))
+        file_filter.SETTINGS.set(key, value)
+
+    def new_view(self, text, window=None):
+        view = (window or self.window).new_file()
+        view.run_command('append', {'characters': text})
+        self.views.append(view)
+
+        return view
+
+    def wait(self, ms):
+        sublime.run_timeouts(sublime.clock() + ms)
+
+    def filter(self, view, regex, folding_type=None):
+        """Filter ``view`` with ``regex`` by a full ``apply()``, its async work left to the caller."""
+
+        command = FileFilter(view.window())
+        command.load_view_state(view)
+
+        if folding_type is not None:
+            command.set_folding_type(folding_type)
+
+        command.set_regex(regex)
+        command.apply()
+
+        return command
+
+    def state(self, view):
+        return view.folded_regions(), view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS), view.get_status(VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES)
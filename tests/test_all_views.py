@@ -0,0 +1,69 @@
+import sys
+
+import sublime
+
+from headless_case import HeadlessTestCase, log_lines
+
+file_filter = sys.modules["File Filter.file_filter"]
+
+SUMMARY_PANEL_NAME = file_filter.SUMMARY_PANEL_NAME
+VIEW_SETTINGS_CURRENT_EXCLUDE_REGEX = file_filter.VIEW_SETTINGS_CURRENT_EXCLUDE_REGEX
+VIEW_SETTINGS_HIGHLIGHTED_REGIONS = file_filter.VIEW_SETTINGS_HIGHLIGHTED_REGIONS
+
+
+class TestAllViews(HeadlessTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        # a window of its own, so that views left by other tests are not filtered
+        self.window = sublime.Window()
+        self.other_window = sublime.Window()
+
+    def new_view(self, text, window=None, exclude_regex=None):
+        view = super().new_view(text, window)
+
+        if exclude_regex:
+            view.settings().set(VIEW_SETTINGS_CURRENT_EXCLUDE_REGEX, exclude_regex)
+
+        return view
+
+    def applied(self, text, exclude_regex=None):
+        """State of a view filtered with ``ERROR`` by a full ``apply()``."""
+
+        view = self.new_view(text, self.other_window, exclude_regex)
+        self.filter(view, 'ERROR')
+
+        return self.state(view)
+
+    def test_every_view_is_filtered_like_a_full_apply(self):
+        texts = [(log_lines(0, 300, 3), None), (log_lines(0, 500, 7), None), (log_lines(0, 400, 5), 'line 1')]
+        views = [self.new_view(text, exclude_regex=exclude_regex) for text, exclude_regex in texts]
+        active = views[1]
+        self.window.focus_view(active)
+
+        self.window.run_command('file_filter_all_views', {'regex': 'ERROR'})
+        sublime.run_timeouts()
+
+        for view, (text, exclude_regex) in zip(views, texts):
+            with self.subTest(view=view):
+                self.assertEqual(self.state(view), self.applied(text, exclude_regex))
+
+        self.assertIs(self.window.active_view(), active)
+
+        panel = self.window.find_output_panel(SUMMARY_PANEL_NAME)
+        summary = panel.substr(sublime.Region(0, panel.size())).splitlines()
+
+        counts = [len(view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS)) for view in views]
+
+        self.assertTrue(summary[0].startswith(f"File Filter /ERROR/: {sum(counts)} matches in 3 views"), summary[0])
+        self.assertEqual([int(line.split()[0]) for line in summary[2:]], counts)
+
+    def test_invalid_regex_filters_nothing(self):
+        view = self.new_view(log_lines(0, 100, 3))
+
+        self.window.run_command('file_filter_all_views', {'regex': 'ERROR('})
+        sublime.run_timeouts()
+
+        self.assertEqual(view.folded_regions(), [])
+        self.assertIsNone(self.window.find_output_panel(SUMMARY_PANEL_NAME))
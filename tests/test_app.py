@@ -26,17 +26,18 @@ class TestCommandPrompt(TestCase):
         #     self.view.window().run_command("close_file")
  
 
+    @unittest.skipIf(getattr(sublime, 'HEADLESS', False), "the loggers are counted as created by Sublime Text")
     def test_logging_level(self):
         
         self.assertEqual(LOGGING_LEVEL, logging.ERROR, "Loggin Level must be ERROR")
 
         existing_loggers = logging.root.manager.loggerDict
 
-        self.assertEqual(len(existing_loggers), 9)
+        self.assertEqual(len(existing_loggers), 21)
 
         arr = [logging.getLogger(name).level for name in existing_loggers if name.startswith("FileFilter")] 
 
-        self.assertEqual(arr, 7 * [logging.ERROR]) # all loggers have logging level ERROR
+        self.assertEqual(arr, 19 * [logging.ERROR]) # all loggers have logging level ERROR
 
         # arr_names = [logging.getLogger(name).name for name in existing_loggers] 
         # self.assertEqual(arr_names,[]) # has 6 loggers
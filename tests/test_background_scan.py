@@ -0,0 +1,175 @@
+import sys
+import itertools
+
+import sublime
+from unittest.mock import patch
+
+from headless_case import HeadlessTestCase, log_lines
+
+file_filter = sys.modules["File Filter.file_filter"]
+
+FoldingTypes = file_filter.FoldingTypes
+APPLIED_SCANS = file_filter.APPLIED_SCANS
+VIEW_SETTINGS_CURRENT_FOLDING_TYPE = file_filter.VIEW_SETTINGS_CURRENT_FOLDING_TYPE
+VIEW_SETTINGS_FOLLOW = file_filter.VIEW_SETTINGS_FOLLOW
+VIEW_SETTINGS_HIGHLIGHTED_REGIONS = file_filter.VIEW_SETTINGS_HIGHLIGHTED_REGIONS
+VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES = file_filter.VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES
+
+
+class TestBackgroundScan(HeadlessTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.view = self.new_view(log_lines(0, 1000))
+        sublime.run_timeouts()
+
+    def scan(self, view, **scan_settings):
+        self.set_setting('background_scan', dict({'min_size': 1, 'chunk_size': 500, 'max_matches': 0, 'max_seconds': 0}, **scan_settings))
+
+        command = self.filter(view, 'ERROR')
+        sublime.run_timeouts()
+
+        return command
+
+    def state(self, view):
+        return view.folded_regions(), view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS), APPLIED_SCANS[view.id()].scanned_to
+
+    def test_chunked_scan_matches_full_apply(self):
+        self.scan(self.view)
+
+        other = self.new_view(log_lines(0, 1000))
+        self.scan(other, min_size=sys.maxsize)
+
+        self.assertEqual(self.state(self.view), self.state(other))
+        self.assertEqual(len(self.view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS)), 100)
+
+    def test_chunked_scan_with_context_matches_full_apply(self):
+        # folds around the last match of a chunk are planned again with the next chunk
+        self.view.settings().set(VIEW_SETTINGS_CURRENT_FOLDING_TYPE, FoldingTypes.context.name)
+        self.scan(self.view, chunk_size=100)
+
+        other = self.new_view(log_lines(0, 1000))
+        other.settings().set(VIEW_SETTINGS_CURRENT_FOLDING_TYPE, FoldingTypes.context.name)
+        self.scan(other, min_size=sys.maxsize)
+
+        self.assertEqual(self.state(self.view), self.state(other))
+
+    def test_max_matches_stops_after_line_of_last_match(self):
+        self.scan(self.view, max_matches=5)
+
+        applied = APPLIED_SCANS[self.view.id()]
+        text = self.view.substr(sublime.Region(0, self.view.size()))
+
+        self.assertEqual(len(self.view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS)), 5)
+        self.assertEqual(applied.stopped, "5 matches limit")
+        self.assertEqual(applied.scanned_to, text.index("line 41 "))
+        self.assertIn("stopped at 5 matches limit", self.view.get_status(VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES))
+
+    def test_max_seconds_stops_after_chunk(self):
+        # every reading of the clock is 10 seconds later than the previous one
+        with patch.object(file_filter.time, 'perf_counter', side_effect=itertools.count(0, 10)):
+            self.scan(self.view, max_seconds=1)
+
+        applied = APPLIED_SCANS[self.view.id()]
+        text = self.view.substr(sublime.Region(0, self.view.size()))
+
+        self.assertEqual(applied.stopped, "1s time limit")
+        self.assertLess(applied.scanned_to, self.view.size())
+        self.assertEqual(text[applied.scanned_to - 1], "\n")
+        self.assertEqual(len(applied.matches), text.count("ERROR", 0, applied.scanned_to))
+
+    def test_follow_does_not_extend_stopped_scan(self):
+        self.view.settings().set(VIEW_SETTINGS_FOLLOW, True)
+        self.scan(self.view, max_matches=5)
+
+        applied = APPLIED_SCANS[self.view.id()]
+
+        self.view.run_command('append', {'characters': log_lines(1000, 1100)})
+        sublime.run_timeouts()
+
+        self.assertIs(APPLIED_SCANS[self.view.id()], applied)
+        self.assertEqual(len(self.view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS)), 5)
+        self.assertIn("stopped at 5 matches limit", self.view.get_status(VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES))
+
+
+class TestBackgroundLines(HeadlessTestCase):
+
+    settings = {'background_scan': {'min_size': 1, 'chunk_size': 500, 'max_matches': 0, 'max_seconds': 0}}
+
+    def new_view(self, text=log_lines(0, 1000), exclude_regex=""):
+        view = super().new_view(text)
+        view.settings().set(file_filter.VIEW_SETTINGS_CURRENT_EXCLUDE_REGEX, exclude_regex)
+        sublime.run_timeouts()
+
+        return view
+
+    def applied(self, view, regex, folding_type=None):
+        """State of a copy of ``view`` filtered with ``regex`` on the main thread."""
+
+        scan_settings = file_filter.SETTINGS.get('background_scan')
+        file_filter.SETTINGS.set('background_scan', dict(scan_settings, min_size=sys.maxsize))
+
+        expected = self.new_view(view.substr(sublime.Region(0, view.size())), view.settings().get(file_filter.VIEW_SETTINGS_CURRENT_EXCLUDE_REGEX))
+        expected.settings().set(file_filter.VIEW_SETTINGS_FIELD_VALUES, view.settings().get(file_filter.VIEW_SETTINGS_FIELD_VALUES))
+        self.filter(expected, regex, folding_type)
+
+        file_filter.SETTINGS.set('background_scan', scan_settings)
+
+        return self.state(expected)
+
+    def test_lines_are_selected_off_the_main_thread(self):
+        for regex, exclude_regex in (('ERROR', 'line 2'), ('?ERROR AND NOT "line 3"', ''), ('?ERROR', 'line 4')):
+            with self.subTest(regex=regex, exclude_regex=exclude_regex):
+                view = self.new_view(exclude_regex=exclude_regex)
+
+                sublime.reset_calls()
+                self.filter(view, regex)
+
+                self.assertEqual(sublime.CALLS['View.substr'], 0)
+                self.assertEqual(view.folded_regions(), [])
+                self.assertIn("Scanning 0%", view.get_status(VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES))
+
+                sublime.run_timeouts()
+
+                self.assertEqual(self.state(view), self.applied(view, regex))
+
+    def test_clear_drops_selection(self):
+        view = self.new_view(exclude_regex='line 2')
+        self.filter(view, 'ERROR')
+
+        self.window.focus_view(view)
+        self.window.run_command('file_filter_clear')
+        sublime.run_timeouts()
+
+        self.assertEqual(view.folded_regions(), [])
+        self.assertNotIn(view.id(), APPLIED_SCANS)
+
+    def test_field_values_change_keeps_folds_until_selected(self):
+        view = self.new_view()
+        self.filter(view, 'event', FoldingTypes.line)
+        self.window.focus_view(view)
+        self.window.run_command('file_filter_field_values', {'values': ['ERROR']})
+        sublime.run_timeouts()
+
+        folds = view.folded_regions()
+
+        self.window.run_command('file_filter_field_values', {'values': ['ERROR', 'INFO']})
+        self.assertEqual(view.folded_regions(), folds)
+
+        sublime.run_timeouts()
+
+        self.assertEqual(self.state(view), self.applied(view, 'event', FoldingTypes.line))
+        self.assertNotEqual(view.folded_regions(), folds)
+
+    def test_follow_selects_appended_lines_in_background(self):
+        view = self.new_view(exclude_regex='line 2')
+        view.settings().set(VIEW_SETTINGS_FOLLOW, True)
+        self.filter(view, 'ERROR')
+        sublime.run_timeouts()
+
+        with patch.object(file_filter.FileFilter, 'apply', autospec=True, side_effect=file_filter.FileFilter.apply) as apply:
+            view.run_command('append', {'characters': log_lines(1000, 1100)})
+            sublime.run_timeouts()
+
+        apply.assert_not_called()
+        self.assertEqual(self.state(view), self.applied(view, 'ERROR'))
@@ -62,6 +62,7 @@ class TestCommandFilter_Clear(TestCase):
     def test_UnfoldNo_RmvHighlightsNo_CenterOnCarretYes(self):
         self.run_it(False, False, True)
 
+    @unittest.skipIf(getattr(sublime, 'HEADLESS', False), "the size of the viewport is the one of the editor window")
     def test_visible_region(self):
         self.assertEqual(sublime.Region(0,6012), self.view.visible_region())
 
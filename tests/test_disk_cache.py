@@ -0,0 +1,53 @@
+import sys
+import os
+import shutil
+import tempfile
+
+import unittest
+from unittest import TestCase
+
+disk_cache = sys.modules["File Filter.core.disk_cache"]
+
+class TestDiskCache(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = disk_cache.DiskCache(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_round_trip(self):
+        self.assertIsNone(self.cache.get("/logs/a.log", 100, 1, "ERR"))
+
+        self.cache.put("/logs/a.log", 100, 1, "ERR", [(0, 3), (10, 13)])
+        self.assertEqual(self.cache.get("/logs/a.log", 100, 1, "ERR"), ([(0, 3), (10, 13)], {}))
+
+        self.cache.put("/logs/a.log", 100, 1, "ERR", [(0, 3), (10, 13)], plan_key="line", fold_plan=[(4, 9)])
+        self.cache.put("/logs/a.log", 100, 1, "ERR", [(0, 3), (10, 13)], plan_key="match_only", fold_plan=[(3, 10), (13, 100)])
+        self.assertEqual(self.cache.get("/logs/a.log", 100, 1, "ERR")[1], {"line": [(4, 9)], "match_only": [(3, 10), (13, 100)]})
+
+        self.cache.put("/logs/a.log", 100, 1, "a|b", [(0, 1, 0), (5, 6, 1)])
+        self.assertEqual(self.cache.get("/logs/a.log", 100, 1, "a|b")[0], [(0, 1, 0), (5, 6, 1)])
+
+    def test_changed_file(self):
+        self.cache.put("/logs/a.log", 100, 1, "ERR", [(0, 3)])
+        self.cache.put("/logs/a.log", 120, 2, "ERR", [(0, 3), (110, 113)])
+
+        self.assertIsNone(self.cache.get("/logs/a.log", 100, 1, "ERR"))
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+    def test_eviction(self):
+        self.cache.max_bytes = 0
+        self.cache.put("/logs/a.log", 100, 1, "ERR", [(0, 3)])
+
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_corrupted_entry(self):
+        self.cache.put("/logs/a.log", 100, 1, "ERR", [(0, 3)])
+        entry_path = self.cache.entry_path("/logs/a.log", 100, 1, "ERR")
+
+        with open(entry_path, 'r+b') as file:
+            file.truncate(os.path.getsize(entry_path) - 1)
+
+        self.assertIsNone(self.cache.get("/logs/a.log", 100, 1, "ERR"))
@@ -0,0 +1,55 @@
+import sys
+
+import unittest
+from unittest import TestCase
+
+extract = sys.modules["File Filter.core.extract"]
+line_index = sys.modules["File Filter.core.line_index"]
+
+class TestExtract(TestCase):
+
+    def setUp(self):
+        self.text = "[INF] start\n[DBG] heartbeat\n[INF] heartbeat\n[ERR] failed\n[INF] done\n"
+        self.starts = line_index.line_starts(self.text)
+
+    def extract(self, intervals, chunk_size=1 << 20, separator=None):
+        text, sources = "", []
+        for chunk, chunk_sources in extract.extract_chunks(self.text, intervals, self.starts, chunk_size, separator):
+            text += chunk
+            sources.extend(chunk_sources)
+        return text, sources
+
+    def test_extract_rows(self):
+        text, sources = self.extract([(0, 0), (2, 3)])
+
+        self.assertEqual(text, "[INF] start\n[INF] heartbeat\n[ERR] failed\n")
+        self.assertEqual(sources, [0, 28, 44])
+
+    def test_separator_between_blocks(self):
+        text, sources = self.extract([(0, 0), (2, 2), (3, 4)], separator=extract.SEPARATOR)
+
+        self.assertEqual(text, "[INF] start\n--\n[INF] heartbeat\n[ERR] failed\n[INF] done\n")
+        self.assertEqual(sources, [0, extract.NO_SOURCE, 28, 44, 57])
+
+    def test_last_rows(self):
+        # the empty row after the trailing newline is not extracted
+        self.assertEqual(self.extract([(4, 5)]), ("[INF] done\n", [57]))
+
+        self.starts = line_index.line_starts("a\nb")
+        self.text = "a\nb"
+        self.assertEqual(self.extract([(1, 1)]), ("b\n", [2]))
+
+    def test_chunks(self):
+        chunks = list(extract.extract_chunks(self.text, [(0, 0), (2, 2), (4, 4)], self.starts, 1))
+
+        self.assertEqual([len(sources) for chunk, sources in chunks], [1, 1, 1])
+        self.assertEqual(self.extract([(0, 0), (2, 2), (4, 4)], 1), self.extract([(0, 0), (2, 2), (4, 4)]))
+
+    def test_source_of(self):
+        sources = [0, extract.NO_SOURCE, 28, 44, extract.NO_SOURCE]
+
+        self.assertEqual(extract.source_of(sources, 0), 0)
+        self.assertEqual(extract.source_of(sources, 1), 28)
+        self.assertEqual(extract.source_of(sources, 4), 44)
+        self.assertEqual(extract.source_of(sources, 10), 44)
+        self.assertIsNone(extract.source_of([], 0))
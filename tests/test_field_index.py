@@ -0,0 +1,58 @@
+import sys
+
+import unittest
+from unittest import TestCase
+
+field_index = sys.modules["File Filter.core.field_index"]
+line_index = sys.modules["File Filter.core.line_index"]
+
+class TestFieldIndex(TestCase):
+
+    def setUp(self):
+        self.text = (
+            "started\n"
+            "[10:00:00] INFO start\n"
+            "[10:00:01] ERROR failed\n"
+            "    at frame\n"
+            "[10:00:02] ERROR again, INFO ignored\n"
+            "[10:00:03] WARN slow\n"
+            "[10:00:04] INFO done\n"
+        )
+        self.starts = line_index.line_starts(self.text)
+        self.index = field_index.FieldIndex.from_text(self.text, self.starts)
+
+    def test_values(self):
+        self.assertEqual(self.index.values(), ["ERROR", "INFO", "WARN"])
+
+        # the frame line belongs to the error above, the last row is the empty one after the final newline
+        self.assertEqual(list(self.index.intervals["ERROR"]), [2, 4])
+        self.assertEqual(list(self.index.intervals["INFO"]), [1, 1, 6, 7])
+        self.assertEqual(self.index.line_count("INFO"), 3)
+        self.assertEqual(self.index.line_count("FATAL"), 0)
+
+    def test_rows_of(self):
+        self.assertEqual(self.index.rows_of(["ERROR"]), [(2, 4)])
+        self.assertEqual(self.index.rows_of(["INFO", "ERROR"]), [(1, 4), (6, 7)])
+        self.assertEqual(self.index.rows_of(["FATAL"]), [])
+
+    def test_spans_of(self):
+        spans = self.index.spans_of(["ERROR", "WARN"])
+
+        self.assertEqual([self.text[begin:end] for begin, end in spans], ["ERROR", "ERROR", "WARN"])
+        self.assertEqual(spans, sorted(spans))
+
+    def test_custom_pattern(self):
+        index = field_index.FieldIndex.from_text(self.text, self.starts, r"\[\d\d:(\d\d)")
+
+        self.assertEqual(index.values(), ["00"])
+        self.assertEqual(index.rows_of(["00"]), [(1, 7)])
+
+        with self.assertRaises(ValueError):
+            field_index.compile_extractor(r"\[\d\d:\d\d")
+
+    def test_optional_group(self):
+        # the first line matching the extractor has no value
+        index = field_index.FieldIndex.from_text(self.text, self.starts, r"\[[^\]]*\] (ERROR)?")
+
+        self.assertEqual(index.values(), ["ERROR"])
+        self.assertEqual(index.rows_of(["ERROR"]), [(2, 7)])
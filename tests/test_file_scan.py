@@ -0,0 +1,35 @@
+import sys
+
+import unittest
+from unittest import TestCase
+
+file_scan = sys.modules["File Filter.core.file_scan"]
+patterns = sys.modules["File Filter.core.patterns"]
+
+class TestFileScan(TestCase):
+
+    def setUp(self):
+        self.data = b"[INF] start\n[ERR] failed\n[INF] retry\n[ERR] failed [ERR]\n[INF] done"
+        self.cache = patterns.PatternCache()
+
+    def lines(self, pattern, chunk_size=4194304):
+        return list(file_scan.matching_lines(self.data, file_scan.bytes_pattern(pattern, self.cache), chunk_size))
+
+    def test_matching_lines(self):
+        self.assertEqual(self.lines(r"\[ERR]"), [(1, b"[ERR] failed"), (3, b"[ERR] failed [ERR]")])
+        self.assertEqual(self.lines(r"done$"), [(4, b"[INF] done")])
+        self.assertEqual(self.lines(r"missing"), [])
+
+    def test_chunks(self):
+        # rows keep counting across chunks
+        for chunk_size in [1, 7, 30, 1000]:
+            self.assertEqual(self.lines(r"^\[INF]", chunk_size), [(0, b"[INF] start"), (2, b"[INF] retry"), (4, b"[INF] done")])
+
+    def test_multiline_match(self):
+        self.assertEqual(self.lines(r"failed\n\[INF]"), [(1, b"[ERR] failed"), (2, b"[INF] retry")])
+
+    def test_bytes_pattern(self):
+        self.assertEqual(file_scan.bytes_pattern("é", self.cache).pattern, "é".encode('utf-8'))
+
+        with self.assertRaises(patterns.re.error):
+            file_scan.bytes_pattern("(", self.cache)
@@ -0,0 +1,61 @@
+import sys
+import os
+
+import unittest
+from unittest import TestCase
+
+fold_plan = sys.modules["File Filter.core.fold_plan"]
+line_index = sys.modules["File Filter.core.line_index"]
+enums = sys.modules["File Filter.core.enums"]
+
+FoldingTypes = enums.FoldingTypes
+
+class TestFoldPlan(TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        current_package_path = os.path.dirname(__file__)
+        self.file = open(os.path.join(current_package_path, 'fixtures', "example_text_case_1.txt")).read()
+
+        self.starts = line_index.line_starts(self.file)
+        self.size = len(self.file)
+        # matches of r"[0-9]"
+        self.matches = [(5, 6), (13, 14), (21, 22), (23, 24)]
+
+    def plan(self, folding_type, matches=None):
+        return fold_plan.plan_folds(self.matches if matches is None else matches, self.starts, self.size, folding_type)
+
+    def test_line(self):
+        self.assertEqual(self.plan(FoldingTypes.line), [(0, 3), (7, 11), (15, 19)])
+
+    def test_match_only(self):
+        expected_values = [(0, 3), (4, 5), (6, 11), (12, 13), (14, 19), (20, 21), (22, 23), (24, 25)]
+        self.assertEqual(self.plan(FoldingTypes.match_only), expected_values)
+
+    def test_fold_before(self):
+        self.assertEqual(self.plan(FoldingTypes.before_only), [(0, 5), (8, 13), (16, 21)])
+
+    def test_fold_after(self):
+        self.assertEqual(self.plan(FoldingTypes.after_only), [(0, 3) , (6, 11), (14, 19), (24, 25)])
+
+    def test_highlight_only(self):
+        self.assertEqual(self.plan(FoldingTypes.highlight_only), [])
+
+    def test_no_matches(self):
+        for folding_type in FoldingTypes.all_members():
+            self.assertEqual(self.plan(folding_type, matches=[]), [])
+
+    def test_normalize_spans(self):
+        spans = [(7, 11), (0, 7), (3, 7), (15, 15), (20, 19), (15, 19), (16, 18)]
+        self.assertEqual(fold_plan.normalize_spans(spans), [(0, 11), (15, 19)])
+        self.assertEqual(fold_plan.normalize_spans([]), [])
+
+    def test_diff_spans(self):
+        line = fold_plan.normalize_spans(self.plan(FoldingTypes.line))
+        after = fold_plan.normalize_spans(self.plan(FoldingTypes.after_only))
+
+        removed, added = fold_plan.diff_spans(line, after)
+
+        self.assertEqual(removed, [(7, 11), (15, 19)])
+        self.assertEqual(added, [(6, 11), (14, 19), (24, 25)])
+        self.assertEqual(fold_plan.diff_spans(line, line), ([], []))
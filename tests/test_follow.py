@@ -0,0 +1,123 @@
+import sys
+
+import sublime
+from unittest.mock import patch
+
+from headless_case import HeadlessTestCase, log_lines
+
+file_filter = sys.modules["File Filter.file_filter"]
+
+FileFilter = file_filter.FileFilter
+FoldingTypes = file_filter.FoldingTypes
+APPLIED_SCANS = file_filter.APPLIED_SCANS
+VIEW_SETTINGS_FOLLOW = file_filter.VIEW_SETTINGS_FOLLOW
+VIEW_SETTINGS_HIGHLIGHTED_REGIONS = file_filter.VIEW_SETTINGS_HIGHLIGHTED_REGIONS
+
+
+class TestFollow(HeadlessTestCase):
+
+    def follow(self, text, folding_type=FoldingTypes.line, follow=False):
+        view = self.new_view(text)
+        view.settings().set(VIEW_SETTINGS_FOLLOW, follow)
+
+        self.filter(view, 'ERROR', folding_type)
+        sublime.run_timeouts()
+
+        return view
+
+    def state(self, view):
+        return super().state(view) + (APPLIED_SCANS[view.id()].scanned_to,)
+
+    def assertFollows(self, view):
+        """``view`` is filtered as if its whole text was applied at once."""
+
+        sublime.run_timeouts()
+        expected = self.follow(view.substr(sublime.Region(0, view.size())), FoldingTypes[view.settings().get(file_filter.VIEW_SETTINGS_CURRENT_FOLDING_TYPE)])
+
+        self.assertEqual(self.state(view), self.state(expected))
+
+    def test_appended_lines(self):
+        for folding_type in (FoldingTypes.line, FoldingTypes.context, FoldingTypes.highlight_only):
+            with self.subTest(folding_type=folding_type.name):
+                view = self.follow(log_lines(0, 100), folding_type, follow=True)
+
+                with patch.object(FileFilter, 'apply', autospec=True, side_effect=FileFilter.apply) as apply:
+                    view.run_command('append', {'characters': log_lines(100, 150)})
+                    sublime.run_timeouts()
+
+                # the applied scan was extended, not applied again
+                apply.assert_not_called()
+                self.assertFollows(view)
+
+    def test_highlights_of_earlier_matches_are_kept(self):
+        view = self.follow(log_lines(0, 100), follow=True)
+        highlights = view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS)
+
+        view.run_command('append', {'characters': log_lines(100, 150)})
+        sublime.run_timeouts()
+
+        # the regions of the matches highlighted before are not built again
+        extended = view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS)
+
+        self.assertEqual(len(extended), 15)
+        self.assertTrue(all(region is before for region, before in zip(extended, highlights)))
+        self.assertFollows(view)
+
+    def test_appended_lines_per_pattern(self):
+        view = self.new_view(log_lines(0, 100) + "line 100 WARN event\n")
+        view.settings().set(VIEW_SETTINGS_FOLLOW, True)
+
+        command = FileFilter(self.window)
+        command.load_view_state(view)
+        command.set_regex_list(['ERROR', 'WARN'])
+        command.apply()
+        sublime.run_timeouts()
+
+        view.run_command('append', {'characters': log_lines(101, 150)})
+        sublime.run_timeouts()
+
+        keys = [f"{VIEW_SETTINGS_HIGHLIGHTED_REGIONS}.{idx}" for idx in range(2)]
+        highlights = [view.get_regions(key) for key in keys]
+
+        expected = self.new_view(view.substr(sublime.Region(0, view.size())))
+        command.load_view_state(expected)
+        command.set_regex_list(['ERROR', 'WARN'])
+        command.apply()
+
+        self.assertEqual(highlights, [expected.get_regions(key) for key in keys])
+        self.assertEqual([len(regions) for regions in highlights], [14, 1])
+
+    def test_unterminated_last_line(self):
+        view = self.follow(log_lines(0, 20) + "line 20 ERR", follow=True)
+
+        with patch.object(FileFilter, 'apply', autospec=True, side_effect=FileFilter.apply) as apply:
+            view.run_command('append', {'characters': "OR event\nline 21 INFO"})
+            sublime.run_timeouts()
+            view.run_command('append', {'characters': " event\nline 22 ERROR"})
+            sublime.run_timeouts()
+
+        apply.assert_not_called()
+        self.assertFollows(view)
+
+    def test_edit_before_scanned_text_applies_again(self):
+        view = self.follow(log_lines(0, 50), follow=True)
+
+        view.sel().clear()
+        view.sel().add(sublime.Region(0))
+
+        with patch.object(FileFilter, 'apply', autospec=True, side_effect=FileFilter.apply) as apply:
+            view.run_command('insert', {'characters': "line -1 ERROR event\n"})
+            view.run_command('append', {'characters': log_lines(50, 60)})
+            sublime.run_timeouts()
+
+        apply.assert_called_once()
+        self.assertFollows(view)
+
+    def test_without_follow_appended_text_is_not_filtered(self):
+        view = self.follow(log_lines(0, 50))
+        applied = APPLIED_SCANS[view.id()]
+
+        view.run_command('append', {'characters': log_lines(50, 60)})
+        sublime.run_timeouts()
+
+        self.assertIs(APPLIED_SCANS[view.id()], applied)
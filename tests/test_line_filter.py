@@ -0,0 +1,97 @@
+import re
+import sys
+
+import unittest
+from unittest import TestCase
+
+line_filter = sys.modules["File Filter.core.line_filter"]
+line_index = sys.modules["File Filter.core.line_index"]
+fold_plan = sys.modules["File Filter.core.fold_plan"]
+enums = sys.modules["File Filter.core.enums"]
+
+FoldingTypes = enums.FoldingTypes
+
+class TestLineFilter(TestCase):
+
+    def setUp(self):
+        self.text = "[INF] start\n[DBG] heartbeat\n[INF] heartbeat\n[ERR] failed\n[INF] done\n"
+        self.starts = line_index.line_starts(self.text)
+
+    def spans(self, literal):
+        spans = []
+        pos = self.text.find(literal)
+        while pos >= 0:
+            spans.append((pos, pos + len(literal)))
+            pos = self.text.find(literal, pos + 1)
+        return spans
+
+    def test_rows_of_spans(self):
+        self.assertEqual(line_filter.rows_of_spans(self.spans("[INF]"), self.starts), [(0, 0), (2, 2), (4, 4)])
+        self.assertEqual(line_filter.rows_of_spans([(0, 14)], self.starts), [(0, 1)])
+
+    def test_subtract_rows(self):
+        self.assertEqual(line_filter.subtract_rows([(0, 9)], [(2, 3), (5, 5)], 10), [(0, 1), (4, 4), (6, 9)])
+        self.assertEqual(line_filter.subtract_rows(None, [(0, 1)], 4), [(2, 3)])
+
+    def test_clip_rows(self):
+        self.assertEqual(line_filter.clip_rows([(0, 2), (4, 6), (8, 9)], 1, 5), [(1, 2), (4, 5)])
+        self.assertEqual(line_filter.clip_rows([(0, 2)], 3, 5), [])
+        self.assertEqual(line_filter.clip_rows(None, 3, 5), [(3, 5)])
+
+    def test_intersect_rows(self):
+        self.assertEqual(line_filter.intersect_rows([(0, 4), (6, 9)], [(2, 7)], 10), [(2, 4), (6, 7)])
+        self.assertEqual(line_filter.intersect_rows(None, [(2, 3)], 10), [(2, 3)])
+
+    def test_spans_between(self):
+        spans = self.spans("[INF]")
+
+        self.assertEqual(line_filter.spans_between(spans, 12, 57), [(28, 33)])
+        self.assertEqual(line_filter.spans_between(spans, 0, 28), [(0, 5)])
+
+    def test_include_and_exclude(self):
+        intervals, matches = line_filter.select_rows(self.spans("[INF]"), self.spans("heartbeat"), self.starts)
+
+        self.assertEqual(intervals, [(0, 0), (4, 4)])
+        self.assertEqual(matches, [(0, 5), (57, 62)])
+
+    def test_exclude_only(self):
+        intervals, matches = line_filter.select_rows(None, self.spans("heartbeat"), self.starts)
+
+        self.assertEqual(intervals, [(0, 0), (3, 5)])
+        self.assertEqual(matches, [])
+
+    def test_include_rows(self):
+        intervals, matches = line_filter.select_rows(self.spans("[INF]"), self.spans("heartbeat"), self.starts, [(0, 1), (4, 4)])
+
+        self.assertEqual(intervals, [(0, 0), (4, 4)])
+        self.assertEqual(matches, [(0, 5), (57, 62)])
+
+    def test_exclude_rows(self):
+        include_spans = self.spans("[INF]")
+        search = re.compile("heart").search
+
+        for include_rows in (line_filter.rows_of_spans(include_spans, self.starts), [(0, 1), (4, 4)]):
+            with self.subTest(include_rows=include_rows):
+                self.assertEqual(line_filter.exclude_rows(self.text, self.starts, include_rows, include_spans, search), line_filter.select_rows(include_spans, self.spans("heart"), self.starts, include_rows))
+
+        # the line end is the end of the searched text
+        self.assertEqual(line_filter.exclude_rows(self.text, self.starts, [(0, 4)], [], re.compile("beat$").search)[0], [(0, 0), (3, 4)])
+
+    def test_row_folds_match_line_folding(self):
+        include_spans = self.spans("[INF]")
+        intervals, matches = line_filter.select_rows(include_spans, [], self.starts)
+
+        expected_values = fold_plan.normalize_spans(fold_plan.plan_folds(include_spans, self.starts, len(self.text), FoldingTypes.line))
+        actual_values = fold_plan.normalize_spans(fold_plan.plan_row_folds(intervals, self.starts, len(self.text)))
+
+        self.assertEqual(actual_values, expected_values)
+
+    def test_context_rows(self):
+        self.assertEqual(line_filter.rows_of_spans(self.spans("[ERR]"), self.starts, 1, 1), [(2, 4)])
+        self.assertEqual(line_filter.rows_of_spans(self.spans("start"), self.starts, 2, 0), [(0, 0)])
+        self.assertEqual(line_filter.expand_rows([(0, 0), (3, 3)], 1, 1, len(self.starts)), [(0, 4)])
+
+    def test_context_folds(self):
+        actual_values = fold_plan.plan_folds(self.spans("[ERR]"), self.starts, len(self.text), FoldingTypes.context, (1, 0))
+
+        self.assertEqual(actual_values, [(0, 27), (self.starts[4], len(self.text))])
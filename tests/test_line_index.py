@@ -0,0 +1,59 @@
+import sys
+
+import unittest
+from unittest import TestCase
+
+line_index = sys.modules["File Filter.core.line_index"]
+
+LineIndex = line_index.LineIndex
+
+class TestLineIndex(TestCase):
+
+    def setUp(self):
+        self.text = "+++\na1A\n___\nb2B\n...\nc3c4c"
+        self.index = LineIndex.from_text(self.text)
+
+    def assertIndexMatches(self, text):
+        self.assertEqual(list(self.index.starts), list(line_index.line_starts(text)))
+        self.assertEqual(self.index.size, len(text))
+
+    def test_line_starts(self):
+        self.assertEqual(list(self.index.starts), [0, 4, 8, 12, 16, 20])
+        self.assertEqual(list(line_index.line_starts("")), [0])
+        self.assertEqual(list(line_index.line_starts("a\n")), [0, 2])
+
+    def test_full_line(self):
+        self.assertEqual(self.index.full_line(0), (0, 4))
+        self.assertEqual(self.index.full_line(3), (0, 4))
+        self.assertEqual(self.index.full_line(4), (4, 8))
+        self.assertEqual(self.index.full_line(len(self.text)), (20, 25))
+
+    def test_row_of_and_line_region(self):
+        self.assertEqual(self.index.row_of(5), 1)
+        self.assertEqual(self.index.line_region(1), (4, 7))
+        self.assertEqual(self.index.line_region(5), (20, 25))
+
+    def test_append(self):
+        appended = "\nd5d\n"
+        self.index.replace(len(self.text), len(self.text), appended)
+        self.assertIndexMatches(self.text + appended)
+
+    def test_insert_lines(self):
+        text = self.text[:6] + "x\ny\n" + self.text[6:]
+        self.index.replace(6, 6, "x\ny\n")
+        self.assertIndexMatches(text)
+
+    def test_delete_lines(self):
+        text = self.text[:2] + self.text[14:]
+        self.index.replace(2, 14, "")
+        self.assertIndexMatches(text)
+
+    def test_replace_same_size(self):
+        text = self.text[:4] + "zzz" + self.text[7:]
+        self.index.replace(4, 7, "zzz")
+        self.assertIndexMatches(text)
+
+    def test_replace_newline(self):
+        text = self.text[:3] + "-" + self.text[4:]
+        self.index.replace(3, 4, "-")
+        self.assertIndexMatches(text)
@@ -0,0 +1,52 @@
+import sys
+import re
+import random
+
+import unittest
+from unittest import TestCase
+
+literals = sys.modules["File Filter.core.literals"]
+patterns = sys.modules["File Filter.core.patterns"]
+
+class TestLiterals(TestCase):
+
+    def test_literal_patterns(self):
+        self.assertEqual(literals.match_plan(r"\[INF]"), literals.MatchPlan("[INF]", False, None))
+        self.assertEqual(literals.match_plan(r"(?i)error"), literals.MatchPlan("error", True, None))
+        self.assertEqual(literals.match_plan(r"error", re.IGNORECASE), literals.MatchPlan("error", True, None))
+        self.assertEqual(literals.match_plan(r"(?i)érror"), literals.NO_PLAN)
+        self.assertEqual(literals.match_plan(r""), literals.NO_PLAN)
+
+    def test_required_literal(self):
+        self.assertEqual(literals.match_plan(r"\d+ \[ERR\] \w+").required, " [ERR] ")
+        self.assertEqual(literals.match_plan(r"time(out)?=\d+ms").required, "time")
+        self.assertEqual(literals.match_plan(r"(fail)ed: .*").required, "failed: ")
+
+        # a match could span lines, or depends on the text around it
+        self.assertIsNone(literals.match_plan(r"ERR[^x]+").required)
+        self.assertIsNone(literals.match_plan(r"ERR\s+").required)
+        self.assertIsNone(literals.match_plan(r"(?s)ERR.*").required)
+        self.assertIsNone(literals.match_plan(r"^ERR \d").required)
+        self.assertIsNone(literals.match_plan(r"\bERR\d").required)
+        self.assertIsNone(literals.match_plan(r"(?<=x)ERR\d").required)
+        self.assertIsNone(literals.match_plan(r"(?i)ERR\d").required)
+        self.assertIsNone(literals.match_plan(r"a|b").required)
+
+    def test_same_matches_as_regex(self):
+        rng = random.Random(7)
+        words = ["[INF] ", "[ERR] ", "err ", "ERR", "timeout=12ms", "time=3", "x", "\n", "\n", "é ", "İ", "ſ"]
+        expressions = [
+            r"\[INF]", r"ERR", r"(?i)err", r"(?i)timeout", r"x", r"xx",
+            r"\[ERR\] \w+", r"time(out)?=\d+", r"ERR.", r"(?i)ERR\d", r"[a-z]+=\d+ms", r"err|ERR",
+        ]
+
+        for trial in range(300):
+            text = "".join(rng.choice(words) for _ in range(rng.randint(0, 40)))
+            pos = rng.randint(0, len(text))
+            endpos = rng.randint(pos, len(text))
+
+            for expression in expressions:
+                compiled = re.compile(expression, patterns.DEFAULT_FLAGS)
+                expected = [m.span() for m in compiled.finditer(text, pos, endpos)]
+
+                self.assertEqual(patterns.find_spans(compiled, text, pos, endpos), expected, (expression, text, pos, endpos))
@@ -0,0 +1,102 @@
+import sys
+
+import sublime
+from unittest.mock import patch
+
+from headless_case import HeadlessTestCase
+
+file_filter = sys.modules["File Filter.file_filter"]
+
+FileFilter = file_filter.FileFilter
+VIEW_SETTINGS_HIGHLIGHTED_REGIONS = file_filter.VIEW_SETTINGS_HIGHLIGHTED_REGIONS
+
+TEXT = "".join(f"line {idx} {('ERROR', 'ERR', 'INFO')[idx % 3]} event\n" for idx in range(300))
+
+DELAY_MS = 250
+
+
+class TestLivePrompt(HeadlessTestCase):
+
+    settings = {'expression_prompt': {'refresh_on_change': True, 'refresh_delay_ms': DELAY_MS}}
+
+    def open_prompt(self):
+        self.view = self.new_view(TEXT)
+        sublime.run_timeouts()
+        self.window.run_command('file_filter_prompt_regex')
+
+        caption, initial_text, on_done, on_change, on_cancel = self.window.input_panel
+
+        return on_done, on_change
+
+    def applied(self, regex):
+        """State of a new view filtered with ``regex`` by a full ``apply()``."""
+
+        view = self.new_view(TEXT)
+        sublime.run_timeouts()
+        self.filter(view, regex)
+
+        return self.state(view)
+
+    def test_only_last_keystroke_is_applied(self):
+        on_done, on_change = self.open_prompt()
+
+        with patch.object(FileFilter, 'apply_scan', autospec=True, side_effect=FileFilter.apply_scan) as apply_scan:
+            for regex in ("E", "ER", "ERR", "ERRO", "ERROR"):
+                on_change(regex)
+                self.wait(DELAY_MS // 5)
+
+            sublime.run_timeouts()
+
+        self.assertEqual([call[0][1].regex for call in apply_scan.call_args_list], ["ERROR"])
+        self.assertEqual(self.state(self.view), self.applied("ERROR"))
+
+    def test_pauses_apply_each_pattern(self):
+        on_done, on_change = self.open_prompt()
+
+        on_change("ERR")
+        self.wait(DELAY_MS * 2)
+
+        self.assertEqual(self.state(self.view), self.applied("ERR"))
+
+        on_change("ERROR")
+        self.wait(DELAY_MS * 2)
+
+        self.assertEqual(self.state(self.view), self.applied("ERROR"))
+
+    def test_done_discards_pending_live_scan(self):
+        on_done, on_change = self.open_prompt()
+
+        on_change("ERR")
+        on_done("INFO")
+        sublime.run_timeouts()
+
+        self.assertEqual(self.state(self.view), self.applied("INFO"))
+
+    def test_scan_done_after_newer_keystroke_is_dropped(self):
+        on_done, on_change = self.open_prompt()
+        full_scan = FileFilter.scan
+
+        def scan(command, regex, profile=None):
+            # the next keystroke comes while "ERR" is being scanned
+            if regex == "ERR":
+                on_change("ERROR")
+            return full_scan(command, regex, profile)
+
+        with patch.object(FileFilter, 'scan', autospec=True, side_effect=scan), \
+                patch.object(FileFilter, 'apply_scan', autospec=True, side_effect=FileFilter.apply_scan) as apply_scan:
+            on_change("ERR")
+            sublime.run_timeouts()
+
+        self.assertEqual([call[0][1].regex for call in apply_scan.call_args_list], ["ERROR"])
+        self.assertEqual(self.state(self.view), self.applied("ERROR"))
+
+    def test_empty_prompt_clears(self):
+        on_done, on_change = self.open_prompt()
+
+        on_change("ERROR")
+        sublime.run_timeouts()
+        on_change("")
+        sublime.run_timeouts()
+
+        self.assertEqual(self.view.folded_regions(), [])
+        self.assertEqual(self.view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS), [])
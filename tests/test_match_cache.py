@@ -0,0 +1,73 @@
+import sys
+
+import unittest
+from unittest import TestCase
+
+match_cache = sys.modules["File Filter.core.match_cache"]
+
+MatchCache = match_cache.MatchCache
+
+class TestMatchCache(TestCase):
+
+    def setUp(self):
+        self.cache = MatchCache(max_matches=10)
+
+    def test_roundtrip(self):
+        self.cache.put(1, 5, "a", [(0, 1), (4, 6)])
+        self.cache.put(2, 5, "a", [(0, 1, 0), (4, 6, 1)])
+
+        self.assertEqual(self.cache.get(1, 5, "a"), [(0, 1), (4, 6)])
+        self.assertEqual(self.cache.get(2, 5, "a"), [(0, 1, 0), (4, 6, 1)])
+        self.assertIsNone(self.cache.get(1, 6, "a"))
+        self.assertIsNone(self.cache.get(1, 5, "b"))
+
+    def test_rows_roundtrip(self):
+        self.cache.put(1, 5, "?a", [(0, 1), (4, 6)])
+        self.cache.put_rows(1, 5, "?a", [(0, 0), (3, 4)])
+
+        self.assertEqual(self.cache.get_rows(1, 5, "?a"), [(0, 0), (3, 4)])
+        self.assertEqual(self.cache.get(1, 5, "?a"), [(0, 1), (4, 6)])
+        self.assertIsNone(self.cache.get_rows(1, 6, "?a"))
+
+        self.cache.put(1, 6, "?a", [])
+
+        self.assertIsNone(self.cache.get_rows(1, 5, "?a"))
+
+    def test_count(self):
+        self.cache.put(1, 5, "a", [(0, 1), (4, 6)])
+        self.cache.put(2, 5, "a", [(0, 1, 0)])
+
+        self.assertEqual(self.cache.count(1, 5, "a"), 2)
+        self.assertEqual(self.cache.count(2, 5, "a"), 1)
+        self.assertIsNone(self.cache.count(1, 6, "a"))
+
+    def test_get_returns_a_new_list(self):
+        self.cache.put(1, 1, "a", [(0, 1)])
+        self.cache.get(1, 1, "a").append((2, 3))
+
+        self.assertEqual(self.cache.get(1, 1, "a"), [(0, 1)])
+
+    def test_new_change_count_drops_older_entries(self):
+        self.cache.put(1, 1, "a", [(0, 1)])
+        self.cache.put(1, 1, "b", [(0, 1)])
+        self.cache.put(1, 2, "a", [(0, 1)])
+
+        self.assertEqual(len(self.cache), 1)
+        self.assertTrue(self.cache.has(1, 2, "a"))
+
+    def test_bounded_by_match_count(self):
+        self.cache.put(1, 1, "a", [(i, i + 1) for i in range(4)])
+        self.cache.put(2, 1, "a", [(i, i + 1) for i in range(4)])
+        self.cache.put(3, 1, "a", [(i, i + 1) for i in range(4)])
+
+        self.assertFalse(self.cache.has(1, 1, "a"))
+        self.assertTrue(self.cache.has(3, 1, "a"))
+        self.assertLessEqual(self.cache.total, 10)
+
+    def test_discard(self):
+        self.cache.put(1, 1, "a", [(0, 1)])
+        self.cache.put(2, 1, "a", [(0, 1)])
+        self.cache.discard(1)
+
+        self.assertFalse(self.cache.has(1, 1, "a"))
+        self.assertTrue(self.cache.has(2, 1, "a"))
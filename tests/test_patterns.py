@@ -0,0 +1,94 @@
+import sys
+import re
+
+import unittest
+from unittest import TestCase
+
+patterns = sys.modules["File Filter.core.patterns"]
+lru = sys.modules["File Filter.core.lru"]
+
+PatternCache = patterns.PatternCache
+LRUCache = lru.LRUCache
+
+class TestPatternCache(TestCase):
+
+    def setUp(self):
+        self.cache = PatternCache(maxsize=2)
+
+    def test_compile_is_cached(self):
+        compiled = self.cache.compile(r"\[INF]")
+        self.assertIs(self.cache.compile(r"\[INF]"), compiled)
+        self.assertIsNot(self.cache.compile(r"\[INF]", re.IGNORECASE), compiled)
+
+    def test_default_flags_match_line_boundaries(self):
+        compiled = self.cache.compile(r"^b")
+        self.assertEqual(patterns.find_spans(compiled, "a\nb\nb"), [(2, 3), (4, 5)])
+
+    def test_invalid_pattern(self):
+        self.assertIsInstance(self.cache.validate("[0-"), re.error)
+        self.assertIn(("[0-", patterns.DEFAULT_FLAGS), self.cache)
+        self.assertRaises(re.error, self.cache.compile, "[0-")
+        self.assertIsNone(self.cache.validate("[0-9]"))
+
+    def test_eviction(self):
+        self.cache.compile("a")
+        self.cache.compile("b")
+        self.cache.compile("a")
+        self.cache.compile("c")
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertIn(("a", patterns.DEFAULT_FLAGS), self.cache)
+        self.assertNotIn(("b", patterns.DEFAULT_FLAGS), self.cache)
+
+    def test_find_spans_range(self):
+        compiled = self.cache.compile(r"[0-9]")
+        self.assertEqual(patterns.find_spans(compiled, "a1b2c3", 2, 5), [(3, 4)])
+
+
+class TestCombinePatterns(TestCase):
+
+    def test_tagged_matches(self):
+        combined = re.compile(patterns.combine_patterns([r"\[INF]", r"ERR", r"[0-9]+"]), patterns.DEFAULT_FLAGS)
+        actual_values = patterns.find_spans(combined, "[INF] 12 ERR\n[ERR] 3")
+
+        self.assertEqual(actual_values, [(0, 5, 0), (6, 8, 2), (9, 12, 1), (14, 17, 1), (19, 20, 2)])
+
+    def test_offset(self):
+        combined = re.compile(patterns.combine_patterns([r"a", r"b"]))
+        self.assertEqual(patterns.find_spans(combined, "ab", offset=10), [(10, 11, 0), (11, 12, 1)])
+
+    def test_group_references_are_shifted(self):
+        combined = re.compile(patterns.combine_patterns([r"(x)\1", r"(a)(b)\2[\1]"]))
+        self.assertEqual(patterns.find_spans(combined, "xx abb\x01 ab"), [(0, 2, 0), (3, 7, 1)])
+
+    def test_leading_flags_are_scoped(self):
+        combined = re.compile(patterns.combine_patterns([r"(?i)warn", r"ERR"]))
+        self.assertEqual(patterns.find_spans(combined, "WARN err ERR"), [(0, 4, 0), (9, 12, 1)])
+
+    def test_invalid_pattern(self):
+        self.assertRaises(re.error, patterns.combine_patterns, [r"ok", r"[0-"])
+
+
+class TestLRUCache(TestCase):
+
+    def test_resize(self):
+        cache = LRUCache(3)
+        for key in "abc":
+            cache.put(key, key.upper())
+
+        cache.resize(1)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get("c"), "C")
+        self.assertIsNone(cache.get("a"))
+
+    def test_weighted_eviction(self):
+        cache = LRUCache(5, weigh=len)
+        cache.put("a", "xx")
+        cache.put("b", "xxx")
+        cache.put("c", "x")
+
+        self.assertEqual(cache.total, 4)
+        self.assertNotIn("a", cache)
+
+        cache.put("b", "x")
+        self.assertEqual(cache.total, 2)
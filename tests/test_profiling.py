@@ -0,0 +1,70 @@
+import sys
+
+import unittest
+from unittest import TestCase
+
+profiling = sys.modules["File Filter.core.profiling"]
+
+class TestRunProfile(TestCase):
+
+    def test_phases_add_up(self):
+        profile = profiling.RunProfile('apply', '/x/')
+
+        with profile.phase('match'):
+            pass
+        with profile.phase('match'):
+            pass
+
+        profile.count('matches', 2)
+        profile.count('matches', 3)
+        profile.finish()
+
+        self.assertEqual(list(profile.phases), ['match'])
+        self.assertGreaterEqual(profile.phases['match'], 0)
+        self.assertEqual(profile.counts, {'matches': 5})
+        self.assertIsNotNone(profile.total)
+
+    def test_null_profile(self):
+        profile = profiling.NULL_PROFILE
+
+        with profile.phase('match'):
+            profile.count('matches', 1)
+
+        self.assertFalse(profile.enabled)
+
+    def test_history(self):
+        history = profiling.ProfileHistory(2)
+
+        for kind in ['a', 'b', 'c']:
+            history.add(1, profiling.RunProfile(kind))
+
+        self.assertEqual([profile.kind for profile in history.runs(1)], ['c', 'b'])
+
+        history.resize(1)
+        self.assertEqual([profile.kind for profile in history.runs(1)], ['c'])
+
+        history.discard(1)
+        self.assertEqual(history.runs(1), [])
+
+    def test_counting_proxy(self):
+        profile = profiling.RunProfile('apply')
+        proxy = profiling.CountingProxy([3, 1, 2], profile.api_calls)
+
+        proxy.sort()
+        proxy.count(1)
+        proxy.sort()
+
+        self.assertEqual(profile.api_calls, {'list.sort': 2, 'list.count': 1})
+
+    def test_format_runs(self):
+        profile = profiling.RunProfile('apply', '/x/')
+        with profile.phase('fold'):
+            pass
+        profile.api_calls['View.fold'] += 1
+        profile.finish()
+
+        text = profiling.format_runs([profile], "title")
+
+        self.assertIn("apply /x/", text)
+        self.assertIn("fold", text)
+        self.assertIn("View.fold 1", text)
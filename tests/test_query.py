@@ -0,0 +1,72 @@
+import sys
+import re
+import random
+
+import unittest
+from unittest import TestCase
+
+query = sys.modules["File Filter.core.query"]
+line_index = sys.modules["File Filter.core.line_index"]
+
+class TestQuery(TestCase):
+
+    def test_parse(self):
+        self.assertEqual(
+            query.parse_query('?ERROR AND (db OR cache) AND NOT retry'),
+            ('and', [('literal', 'ERROR'), ('or', [('literal', 'db'), ('literal', 'cache')]), ('not', ('literal', 'retry'))]))
+
+        self.assertEqual(
+            query.parse_query('?ERROR "time out" /d[b]\\/x/'),
+            ('and', [('literal', 'ERROR'), ('literal', 'time out'), ('regex', 'd[b]/x')]))
+
+        self.assertEqual(query.parse_query('?a OR b c'), ('or', [('literal', 'a'), ('and', [('literal', 'b'), ('literal', 'c')])]))
+
+    def test_parse_errors(self):
+        for text in ['?', '?(a', '?a OR', '?a )', '?AND b', '?"a']:
+            with self.assertRaises(query.QueryError, msg=text):
+                query.parse_query(text)
+
+    def test_anchor(self):
+        self.assertEqual(query.Query('?ERROR AND (db OR cache) AND NOT retry').anchor, 'ERROR')
+        self.assertEqual(query.Query('?/timeout=\\d+/ AND db').anchor, 'timeout=')
+        self.assertIsNone(query.Query('?a OR b').anchor)
+        self.assertIsNone(query.Query('?NOT a').anchor)
+
+    def test_select(self):
+        text = "ERROR db down\nINFO db up\nERROR cache retry\nERROR cache miss\n"
+        starts = line_index.line_starts(text)
+
+        intervals, spans = query.Query('?ERROR AND (db OR cache) AND NOT retry').select(text, starts)
+
+        self.assertEqual(intervals, [(0, 0), (3, 3)])
+        self.assertEqual(spans, [(0, 5), (6, 8), (43, 48), (49, 54)])
+
+    def test_same_lines_as_line_by_line_evaluation(self):
+        rng = random.Random(5)
+        words = ['ERROR', 'db', 'cache', 'retry', 'INFO', 'x']
+        queries = ['?ERROR AND (db OR cache) AND NOT retry', '?NOT ERROR', '?db cache', '?/d[b]/ OR retry', '?(x OR INFO) NOT /c.che/', '?/ERROR/ retry']
+
+        def evaluate(node, line):
+            kind = node[0]
+            if kind == 'literal':
+                return node[1] in line
+            if kind == 'regex':
+                return re.search(node[1], line) is not None
+            if kind == 'not':
+                return not evaluate(node[1], line)
+            if kind == 'and':
+                return all(evaluate(child, line) for child in node[1])
+            return any(evaluate(child, line) for child in node[1])
+
+        for trial in range(200):
+            text = "\n".join(" ".join(rng.choice(words) for _ in range(rng.randint(0, 4))) for _ in range(rng.randint(0, 20)))
+            starts = line_index.line_starts(text)
+
+            for text_query in queries:
+                compiled = query.Query(text_query)
+                intervals, spans = compiled.select(text, starts)
+
+                rows = [row for first, last in intervals for row in range(first, last + 1)]
+                expected = [row for row, line in enumerate(text.split("\n")) if evaluate(compiled.tree, line)]
+
+                self.assertEqual(rows, expected, (text_query, text))
@@ -0,0 +1,56 @@
+import sys
+
+import sublime
+
+from headless_case import HeadlessTestCase
+
+file_filter = sys.modules["File Filter.file_filter"]
+
+PRESETS = [["errors", "ERROR"], ["warnings", "WARN"], ["query", "?ERROR AND NOT disk"]]
+
+
+class TestQuickPanelCounts(HeadlessTestCase):
+
+    settings = {'regex_list': PRESETS}
+
+    def setUp(self):
+        super().setUp()
+        self.view = self.new_view("ERROR disk\nWARN cpu\nERROR net\nINFO ok\n")
+        sublime.run_timeouts()
+
+    def open_panel(self):
+        sublime.reset_calls()
+        self.window.focus_view(self.view)
+        self.window.run_command('file_filter_quick_panel')
+
+        return self.window.quick_panel
+
+    def test_panel_is_shown_again_once_with_all_counts(self):
+        items, on_select, flags, selected_index, on_highlight, placeholder = self.open_panel()
+
+        self.assertEqual([item[1] for item in items[-3:]], ["ERROR  (counting...)", "WARN  (counting...)", "?ERROR AND NOT disk  (counting...)"])
+
+        # the row highlighted while counting stays highlighted
+        on_highlight(3)
+        sublime.run_timeouts()
+
+        items, on_select, flags, selected_index, on_highlight, placeholder = self.window.quick_panel
+
+        self.assertEqual(sublime.CALLS['Window.show_quick_panel'], 2)
+        self.assertEqual([item[1] for item in items[-3:]], ["ERROR  (2 matches)", "WARN  (1 matches)", "?ERROR AND NOT disk  (1 matches)"])
+        self.assertEqual(selected_index, 3)
+
+        # counts coming in before the last one go to the status bar
+        self.assertIn("File Filter: counted the matches of 1 of 3 presets", sublime.STATUS_MESSAGES)
+        self.assertIn("File Filter: counted the matches of 2 of 3 presets", sublime.STATUS_MESSAGES)
+
+    def test_cached_counts_show_panel_once(self):
+        self.open_panel()
+        sublime.run_timeouts()
+        self.window.quick_panel[1](-1)
+
+        items = self.open_panel()[0]
+        sublime.run_timeouts()
+
+        self.assertEqual(sublime.CALLS['Window.show_quick_panel'], 1)
+        self.assertEqual([item[1] for item in items[-3:]], ["ERROR  (2 matches)", "WARN  (1 matches)", "?ERROR AND NOT disk  (1 matches)"])
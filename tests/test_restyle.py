@@ -0,0 +1,105 @@
+import sys
+
+import sublime
+from unittest.mock import patch
+
+from headless_case import HeadlessTestCase, log_lines
+
+file_filter = sys.modules["File Filter.file_filter"]
+
+FoldingTypes = file_filter.FoldingTypes
+HighlightTypes = file_filter.HighlightTypes
+APPLIED_SCANS = file_filter.APPLIED_SCANS
+VIEW_SETTINGS_HIGHLIGHTED_REGIONS = file_filter.VIEW_SETTINGS_HIGHLIGHTED_REGIONS
+VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES = file_filter.VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES
+
+
+class TestRestyle(HeadlessTestCase):
+
+    def scan(self, folding_type=FoldingTypes.line, regex='ERROR', **scan_settings):
+        self.set_setting('background_scan', dict({'min_size': sys.maxsize, 'chunk_size': 500, 'max_matches': 0, 'max_seconds': 0}, **scan_settings))
+
+        view = self.new_view(log_lines(0, 1000))
+        command = self.filter(view, regex, folding_type)
+        sublime.run_timeouts()
+
+        return command, view
+
+    def test_folding_style_switch_matches_full_apply(self):
+        command, view = self.scan()
+        command.command_set_folding_type(FoldingTypes.context)
+        sublime.run_timeouts()
+
+        expected_command, expected = self.scan(FoldingTypes.context)
+
+        self.assertEqual(view.folded_regions(), expected.folded_regions())
+        self.assertEqual(APPLIED_SCANS[view.id()].fold_plan, APPLIED_SCANS[expected.id()].fold_plan)
+
+    def test_folding_style_switch_does_not_match_again(self):
+        # the matches are too many to stay in the match cache
+        file_filter.MATCHES.resize(50)
+        self.addCleanup(file_filter.MATCHES.resize, file_filter.SETTINGS.get('match_cache_size', 2000000))
+
+        for exclude_regex in ('', 'line 2'):
+            with self.subTest(exclude_regex=exclude_regex):
+                view = self.new_view(log_lines(0, 1000))
+                view.settings().set(file_filter.VIEW_SETTINGS_CURRENT_EXCLUDE_REGEX, exclude_regex)
+
+                self.set_setting('background_scan', {'min_size': 1, 'chunk_size': 500, 'max_matches': 0, 'max_seconds': 0})
+                command = self.filter(view, 'ERROR')
+                sublime.run_timeouts()
+
+                sublime.reset_calls()
+
+                with patch.object(file_filter.TextSnapshot, 'matches', autospec=True, side_effect=file_filter.TextSnapshot.matches) as matches:
+                    command.command_set_folding_type(FoldingTypes.context)
+                    sublime.run_timeouts()
+
+                matches.assert_not_called()
+                self.assertEqual(sublime.CALLS['View.substr'], 0)
+
+                expected = self.new_view(log_lines(0, 1000))
+                expected.settings().set(file_filter.VIEW_SETTINGS_CURRENT_EXCLUDE_REGEX, exclude_regex)
+                self.filter(expected, 'ERROR', FoldingTypes.context)
+                sublime.run_timeouts()
+
+                self.assertEqual(self.state(view), self.state(expected))
+
+    def test_folding_style_switch_keeps_match_limit(self):
+        command, view = self.scan(min_size=1, max_matches=5)
+        command.command_set_folding_type(FoldingTypes.context)
+        sublime.run_timeouts()
+
+        expected_command, expected = self.scan(FoldingTypes.context, min_size=1, max_matches=5)
+
+        self.assertEqual(len(view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS)), 5)
+        self.assertIn("stopped at 5 matches limit", view.get_status(VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES))
+        self.assertEqual(view.folded_regions(), expected.folded_regions())
+
+    def test_highlight_style_switch_keeps_match_limit(self):
+        command, view = self.scan(min_size=1, max_matches=5)
+        command.command_set_highlight_type(HighlightTypes.outline)
+        sublime.run_timeouts()
+
+        self.assertEqual(len(view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS)), 5)
+        self.assertIn("stopped at 5 matches limit", view.get_status(VIEW_SETTINGS_STATUS_BAR_TOTAL_MATCHES))
+
+    def test_query_is_evaluated_once(self):
+        query = '?ERROR AND NOT "line 10 "'
+
+        with patch.object(file_filter.Query, 'select', autospec=True, side_effect=file_filter.Query.select) as select:
+            command, view = self.scan(regex=query)
+            command.command_set_folding_type(FoldingTypes.context)
+            command.command_set_highlight_type(HighlightTypes.outline)
+            command.set_exclude_regex('line 20 ')
+            command.reapply()
+
+        self.assertEqual(select.call_count, 1)
+
+        expected_command, expected = self.scan(FoldingTypes.context)
+        expected_command.set_regex(query)
+        expected_command.set_exclude_regex('line 20 ')
+        expected_command.apply()
+
+        self.assertEqual(view.folded_regions(), expected.folded_regions())
+        self.assertEqual(view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS), expected.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS))
@@ -0,0 +1,63 @@
+import sys
+import os
+import tempfile
+
+import sublime
+
+from headless_case import HeadlessTestCase
+
+file_filter = sys.modules["File Filter.file_filter"]
+
+FileFilterScanFileCommand = file_filter.FileFilterScanFileCommand
+
+
+class TestScanFileCommand(HeadlessTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.view = self.new_view("")
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'scanned.log')
+
+        with open(self.path, 'w') as scanned:
+            scanned.write("INFO start\nERROR failed\nINFO done\n")
+
+    def tearDown(self):
+        super().tearDown()
+        self.directory.cleanup()
+
+    def start_scan(self):
+        """The output view of a scan of the file, before the async thread runs it."""
+
+        self.window.focus_view(self.view)
+        FileFilterScanFileCommand(self.window).run(self.path, 'ERROR')
+        output = self.window.active_view()
+        self.views.append(output)
+
+        return output
+
+    def scan(self):
+        output = self.start_scan()
+        sublime.run_timeouts()
+
+        return output.substr(sublime.Region(0, output.size()))
+
+    def test_matching_lines(self):
+        self.assertEqual(self.scan(), f"{self.path}:\n       2: ERROR failed\n\n1 matching lines\n")
+
+    def test_empty_file(self):
+        open(self.path, 'w').close()
+
+        self.assertEqual(self.scan(), f"{self.path}:\n\n0 matching lines\n")
+
+    def test_file_removed_before_scan(self):
+        output = self.start_scan()
+
+        # the file goes away before the async thread opens it
+        os.remove(self.path)
+        sublime.run_timeouts()
+
+        text = output.substr(sublime.Region(0, output.size()))
+
+        self.assertTrue(text.startswith(f"{self.path}:\n\ncannot scan the file: "), text)
+        self.assertTrue(sublime.STATUS_MESSAGES[-1].startswith(f"File Filter: cannot scan '{self.path}': "))
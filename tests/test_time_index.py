@@ -0,0 +1,58 @@
+import sys
+
+import unittest
+from unittest import TestCase
+
+time_index = sys.modules["File Filter.core.time_index"]
+
+class TestTimeIndex(TestCase):
+
+    def setUp(self):
+        self.text = (
+            "started\n"
+            "[2010-04-24 10:00:00,500] INFO a\n"
+            "    at continuation\n"
+            "2010-04-24T10:00:02 INFO b\n"
+            "2010-04-24 09:59:59.000 WARN late\n"
+            "2010-04-24 10:00:03,123456 ERROR c\n"
+        )
+        self.index = time_index.TimeIndex.from_text(self.text)
+
+    def row_offset(self, prefix):
+        return self.text.index(prefix)
+
+    def test_index(self):
+        self.assertEqual(list(self.index.offsets), [self.row_offset("[2010"), self.row_offset("2010-04-24T"), self.row_offset("2010-04-24 09"), self.row_offset("2010-04-24 10:00:03")])
+
+        # the late line keeps the time of the line before it
+        self.assertEqual(list(self.index.times), [20100424100000500, 20100424100002000, 20100424100002000, 20100424100003123])
+
+    def test_parse_bound(self):
+        self.assertEqual(time_index.parse_bound("2010-04-24 10"), 20100424100000000)
+        self.assertEqual(time_index.parse_bound("2010-04-24 10", upper=True), 20100424105959999)
+        self.assertEqual(time_index.parse_bound("[2010-04-24 10:00:01,5]", upper=True), 20100424100001599)
+        self.assertEqual(time_index.parse_bound("10:00", date=("2010", "04", "24")), 20100424100000000)
+        self.assertIsNone(time_index.parse_bound(" "))
+
+        for text in ["10:00", "yesterday", "2010-4-24"]:
+            with self.assertRaises(ValueError, msg=text):
+                time_index.parse_bound(text)
+
+    def test_split_range(self):
+        self.assertEqual(time_index.split_range("10:00 .. 10:05"), ("10:00", "10:05"))
+        self.assertEqual(time_index.split_range("2010-04-24 10:00 - 2010-04-24 11:00"), ("2010-04-24 10:00", "2010-04-24 11:00"))
+        self.assertEqual(time_index.split_range(".. 10:05"), ("", "10:05"))
+        self.assertEqual(time_index.split_range("10:00"), ("10:00", "10:00"))
+
+    def test_window(self):
+        window = self.index.window(*self.index.bounds("10:00:01", "10:00:02"))
+        self.assertEqual(window, (self.row_offset("2010-04-24T"), self.row_offset("2010-04-24 10:00:03")))
+
+        # lines before the first timestamp are only in windows open on the left
+        self.assertEqual(self.index.window(*self.index.bounds("", "10:00:00")), (0, self.row_offset("2010-04-24T")))
+        self.assertEqual(self.index.window(*self.index.bounds("10:00", "")), (self.row_offset("[2010"), len(self.text)))
+
+        self.assertIsNone(self.index.window(*self.index.bounds("11:00", "")))
+
+        no_timestamps = time_index.TimeIndex.from_text("no timestamps\n")
+        self.assertIsNone(no_timestamps.window(*no_timestamps.bounds("10:00", "")))
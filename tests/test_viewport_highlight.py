@@ -0,0 +1,95 @@
+import sys
+
+import sublime
+
+from headless_case import HeadlessTestCase, log_lines
+
+file_filter = sys.modules["File Filter.file_filter"]
+
+FoldingTypes = file_filter.FoldingTypes
+VIEWPORT_WINDOWS = file_filter.VIEWPORT_WINDOWS
+VIEW_SETTINGS_HIGHLIGHTED_REGIONS = file_filter.VIEW_SETTINGS_HIGHLIGHTED_REGIONS
+
+TEXT = log_lines(0, 2000, 2)
+
+DELAY_MS = 100
+MARGIN_LINES = 20
+
+
+class TestViewportHighlight(HeadlessTestCase):
+
+    settings = {'viewport_highlight': {'min_matches': 100, 'margin_lines': MARGIN_LINES, 'refresh_delay_ms': DELAY_MS}}
+
+    def highlight(self, text=TEXT):
+        view = self.new_view(text)
+        self.wait(0)
+
+        # viewport watchers poll for as long as they run: never run all timeouts
+        command = self.filter(view, 'ERROR', FoldingTypes.highlight_only)
+
+        return command, view
+
+    def all_highlights(self):
+        """Highlights of a full ``apply()``, drawn for every match."""
+
+        viewport_settings = file_filter.SETTINGS.get('viewport_highlight')
+        file_filter.SETTINGS.set('viewport_highlight', dict(viewport_settings, min_matches=0))
+        command, view = self.highlight()
+        file_filter.SETTINGS.set('viewport_highlight', viewport_settings)
+
+        return view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS)
+
+    def visible_highlights(self, view, highlights):
+        """``highlights`` of the visible lines of ``view`` and ``MARGIN_LINES`` around them."""
+
+        visible = view.visible_region()
+        first_row = max(view.rowcol(visible.begin())[0] - MARGIN_LINES, 0)
+        last_row = view.rowcol(visible.end())[0] + MARGIN_LINES
+
+        return [region for region in highlights if first_row <= view.rowcol(region.begin())[0] <= last_row]
+
+    def test_only_visible_matches_are_highlighted(self):
+        command, view = self.highlight()
+        highlights = view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS)
+
+        self.assertLess(len(highlights), 1000)
+        self.assertEqual(highlights, self.visible_highlights(view, self.all_highlights()))
+
+    def test_scrolling_redraws_highlights(self):
+        command, view = self.highlight()
+        expected = self.all_highlights()
+
+        view.set_viewport_position((0, 900))
+        self.wait(DELAY_MS)
+
+        highlights = view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS)
+
+        self.assertIn(view.visible_region().begin(), range(highlights[0].begin(), highlights[-1].end()))
+        self.assertEqual(highlights, self.visible_highlights(view, expected))
+
+    def test_scrolling_within_margin_keeps_highlights(self):
+        command, view = self.highlight()
+        highlights = view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS)
+
+        sublime.reset_calls()
+        view.set_viewport_position((0, MARGIN_LINES // 2))
+        self.wait(DELAY_MS * 3)
+
+        self.assertEqual(sublime.CALLS['View.add_regions'], 0)
+        self.assertEqual(view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS), highlights)
+
+    def test_clear_stops_watching(self):
+        command, view = self.highlight()
+        command.clear()
+        self.wait(DELAY_MS * 2)
+
+        self.assertNotIn(view.id(), VIEWPORT_WINDOWS)
+        self.assertEqual(sublime.pending_timeouts(), 0)
+
+    def test_few_matches_are_all_highlighted(self):
+        command, view = self.highlight(TEXT[:TEXT.index("line 100 ")])
+        self.wait(DELAY_MS * 2)
+
+        self.assertEqual(len(view.get_regions(VIEW_SETTINGS_HIGHLIGHTED_REGIONS)), 50)
+        self.assertNotIn(view.id(), VIEWPORT_WINDOWS)
+        self.assertEqual(sublime.pending_timeouts(), 0)